@@ -0,0 +1,105 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from multiprocessing.connection import wait
+from os import cpu_count
+from time import perf_counter
+from Instance import Instance
+from Heuristic import Heuristic
+from Portfolio import isProvenOptimal
+from Workers import formulations, getPoolContext
+
+if __name__ == '__main__':
+    exit(0)
+
+def getRecord(fileName):
+    return {'file': fileName, 'status': 'error', 'termination': None, 'objective': None, 'bound': None, 'schedule': [], 'timings': {}, 'warnings': [], 'error': None}
+
+def getErrorRecord(fileName, error):
+    # for the failures outside solveFile, e.g. a worker that died
+    record = getRecord(fileName)
+    record['error'] = type(error).__name__ + ': ' + str(error)
+    return record
+
+def getStatus(isSolved, termination, objective, bound):
+    # a solve that stopped without a schedule is not a schedule with no exams
+    if not isSolved:
+        return 'nosolution'
+    if termination == 'optimal' or isProvenOptimal(objective, bound):
+        return 'optimal'
+    return 'feasible'
+
+# Solves one instance file and returns its record; any failure is recorded
+# in the record instead of being raised, so that the batch goes on.
+def solveFile(fileName, solverName='glpk', formulation='bigm', timeLimit=None):
+    record = getRecord(fileName)
+    startTime = perf_counter()
+    output = StringIO()
+    try:
+        # the solvers print, but the records are the only output
+        with redirect_stdout(output):
+            instance = Instance()
+            instance.loadFromJSONFile(fileName, warnings='skip')
+            record['warnings'] = instance.warnings
+            loadTime = perf_counter()
+            record['timings']['load'] = loadTime - startTime
+
+            if solverName == 'heuristic':
+                problem = Heuristic(instance)
+                record['timings']['build'] = 0.0
+                problem.solve()
+                schedule = problem.schedule
+            else:
+                problem = formulations[formulation](instance)
+                buildTime = perf_counter()
+                record['timings']['build'] = buildTime - loadTime
+                problem.solve(solverName, timeLimit=timeLimit)
+                schedule = problem.getSchedule() if problem.isSolved else {}
+                record['termination'] = problem.statistics['termination']
+                bound = problem.statistics['bound']
+                record['bound'] = bound if isinstance(bound, (int, float)) else None
+            record['timings']['solve'] = perf_counter() - startTime - record['timings']['load'] - record['timings']['build']
+
+        if problem.isSolved:
+            record['objective'] = len(schedule)
+        record['schedule'] = [{'patient': patient, 'exam': exam, 'operator': operator, 'start': start}
+            for (patient, exam), (operator, start) in schedule.items()]
+        record['status'] = getStatus(problem.isSolved, record['termination'], record['objective'], record['bound'])
+    except Exception as e:
+        record['error'] = type(e).__name__ + ': ' + str(e)
+    record['timings']['total'] = perf_counter() - startTime
+    return record
+
+def sendRecord(connection, fileName, solverName, formulation, timeLimit):
+    connection.send(solveFile(fileName, solverName, formulation, timeLimit))
+    connection.close()
+
+# Solves the files in separate processes, at most workers at a time, and yields
+# their records as they finish. Every file has its own process, forked after
+# pyomo is imported: a process that dies (out of memory, a crashing solver)
+# loses only its own file, whose record reports the exit code.
+def solveFiles(fileNames, solverName='glpk', formulation='bigm', timeLimit=None, workers=None):
+    context = getPoolContext()
+    if workers is None:
+        workers = cpu_count() or 1
+    waiting = list(reversed(fileNames))
+    running = {}
+    while len(waiting) > 0 or len(running) > 0:
+        while len(waiting) > 0 and len(running) < workers:
+            fileName = waiting.pop()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=sendRecord, args=(sender, fileName, solverName, formulation, timeLimit), daemon=True)
+            process.start()
+            # the pipe reaches the end of file as soon as the process dies
+            sender.close()
+            running[receiver] = (process, fileName)
+        for receiver in wait(list(running)):
+            process, fileName = running.pop(receiver)
+            try:
+                record = receiver.recv()
+            except EOFError:
+                record = None
+            receiver.close()
+            process.join()
+            if record is None:
+                record = getErrorRecord(fileName, ChildProcessError('the process solving the file exited with code ' + str(process.exitcode)))
+            yield record
@@ -0,0 +1,101 @@
+from concurrent.futures import ProcessPoolExecutor
+from warnings import warn
+from Workers import formulations, getPoolContext
+from Solution import Solution
+
+if __name__ == '__main__':
+    exit(0)
+
+def solveComponent(instance, formulation, solverName, timeLimit):
+    problem = formulations[formulation](instance)
+    problem.solve(solverName, timeLimit=timeLimit)
+    # a component without a schedule is not a component with no exams
+    return problem.getSchedule() if problem.isSolved else None, problem.statistics
+
+# Splits the instance in the connected components of the compatibility graph:
+# two requests interact only if they belong to the same patient or can be
+# done by a common operator. Every component is an independent Problem.
+class Decomposition:
+    def __init__(self, instance):
+        self.instance = instance
+        self.components = self.__findComponents()
+        self.schedule = {}
+        self.statistics = []
+        self.failures = []
+        self.objective = 0
+        self.isSolved = False
+
+    def solve(self, solverName='glpk', formulation='bigm', workers=None, timeLimit=None):
+        subInstances = []
+        for requests, operators in self.components:
+            # requests that nobody can do stay unscheduled without building a model
+            if len(operators) > 0:
+                subInstances.append(self.instance.getSubInstance(requests, operators))
+
+        # largest components first, so that they do not end up last in the queue
+        subInstances.sort(key=lambda subInstance: -len(subInstance.index['eligibleOperators']))
+        self.schedule = {}
+        self.statistics = []
+        self.failures = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=getPoolContext()) as executor:
+            futures = [executor.submit(solveComponent, subInstance, formulation, solverName, timeLimit) for subInstance in subInstances]
+            for subInstance, future in zip(subInstances, futures):
+                try:
+                    schedule, statistics = future.result()
+                except Exception as e:
+                    # a worker that raised or died: the component is solved again here,
+                    # and if it fails here too the error reaches the caller
+                    self.__addFailure(subInstance, type(e).__name__ + ': ' + str(e) + ', solved again in this process')
+                    schedule, statistics = solveComponent(subInstance, formulation, solverName, timeLimit)
+                if schedule is None:
+                    self.__addFailure(subInstance, 'no schedule found (' + str(statistics['termination']) + '), its requests stay unscheduled')
+                    schedule = {}
+                self.schedule.update(schedule)
+                self.statistics.append(statistics)
+        self.objective = len(self.schedule)
+        self.isSolved = True
+
+    def getSolution(self):
+        return Solution(self.instance, self.schedule)
+
+    def printResults(self):
+        if not self.isSolved:
+            return
+        self.getSolution().printResults()
+
+    def __addFailure(self, subInstance, reason):
+        failure = {'requests': len(subInstance.index['eligibleOperators']), 'reason': reason}
+        self.failures.append(failure)
+        warn('component with ' + str(failure['requests']) + ' requests: ' + reason)
+
+    def __findComponents(self):
+        parent = {request: request for request in self.instance.index['eligibleOperators']}
+        def find(request):
+            while parent[request] != request:
+                parent[request] = parent[parent[request]]
+                request = parent[request]
+            return request
+        def union(first, second):
+            parent[find(first)] = find(second)
+
+        firstOfPatient = {}
+        firstOfOperator = {}
+        for request, operators in self.instance.index['eligibleOperators'].items():
+            patient = request[0]
+            if patient in firstOfPatient:
+                union(request, firstOfPatient[patient])
+            else:
+                firstOfPatient[patient] = request
+            for operator in operators:
+                if operator in firstOfOperator:
+                    union(request, firstOfOperator[operator])
+                else:
+                    firstOfOperator[operator] = request
+
+        components = {}
+        for request, operators in self.instance.index['eligibleOperators'].items():
+            requests, componentOperators = components.setdefault(find(request), ([], set()))
+            requests.append(request)
+            componentOperators.update(operators)
+        return [(requests, [operator for operator in self.instance.operators if operator in operators])
+            for requests, operators in components.values()]
@@ -0,0 +1,110 @@
+from bisect import bisect_right, insort
+from Solution import Solution
+
+if __name__ == '__main__':
+    exit(0)
+
+class Heuristic:
+    def __init__(self, instance):
+        self.instance = instance
+        self.schedule = {}
+        self.objective = 0
+        self.isSolved = False
+
+    def solve(self):
+        self.schedule = {}
+        self.operatorBusy = {operator: [] for operator in self.instance.operators}
+        self.patientBusy = {patient: [] for patient in self.instance.patients}
+
+        for patient, exams in self.__getUnits():
+            placed = []
+            for exam in exams:
+                assignment = self.__findEarliestAssignment(patient, exam)
+                if assignment is None:
+                    break
+                self.__place(patient, exam, *assignment)
+                placed.append(exam)
+            # packets are all-or-nothing: undo the partial placement
+            if len(placed) < len(exams):
+                for exam in placed:
+                    self.__remove(patient, exam)
+
+        self.objective = len(self.schedule)
+        self.isSolved = True
+
+    def getSolution(self):
+        return Solution(self.instance, self.schedule)
+
+    def printResults(self):
+        if not self.isSolved:
+            return
+        self.getSolution().printResults()
+
+    def __getUnits(self):
+        # a unit is a packet, or a single request when packets are not used
+        units = []
+        if self.instance.options['usePackets']:
+            for patient in self.instance.patients:
+                for packet in self.instance.packets.get(patient, []):
+                    units.append((patient, list(packet)))
+        else:
+            for patient in self.instance.patients:
+                for exam in self.instance.requests[patient]:
+                    units.append((patient, [exam]))
+
+        eligibleOperators = self.instance.index['eligibleOperators']
+        for patient, exams in units:
+            # most constrained exams first, longest first among equals
+            exams.sort(key=lambda exam: (len(eligibleOperators[patient, exam]), -self.instance.requests[patient][exam]))
+
+        # priority rule: units that schedule more exams per unit of time come first
+        def priority(unit):
+            patient, exams = unit
+            totalDuration = sum(self.instance.requests[patient][exam] for exam in exams)
+            return (totalDuration / len(exams), totalDuration)
+        units.sort(key=priority)
+        return units
+
+    def __findEarliestAssignment(self, patient, exam):
+        duration = self.instance.requests[patient][exam]
+        best = None
+        for operator in self.instance.index['eligibleOperators'][patient, exam]:
+            start = self.__findEarliestStart(operator, patient, duration)
+            if start is not None and (best is None or start < best[1]):
+                best = (operator, start)
+        return best
+
+    def __findEarliestStart(self, operator, patient, duration):
+        # the model forces t >= 1 for every scheduled exam
+        lower = max(self.instance.operatorData[operator]['startTime'], 1)
+        upper = self.instance.operatorData[operator]['endTime']
+        candidates = [lower]
+        for busy in (self.operatorBusy[operator], self.patientBusy[patient]):
+            candidates.extend(end for _, end in busy if end > lower)
+        for start in sorted(candidates):
+            if start + duration > upper:
+                return None
+            if self.__isFree(self.operatorBusy[operator], start, duration) and self.__isFree(self.patientBusy[patient], start, duration):
+                return start
+        return None
+
+    def __isFree(self, busy, start, duration):
+        # busy is a sorted list of non-overlapping (start, end) intervals
+        i = bisect_right(busy, (start, float('inf')))
+        if i > 0 and busy[i - 1][1] > start:
+            return False
+        if i < len(busy) and busy[i][0] < start + duration:
+            return False
+        return True
+
+    def __place(self, patient, exam, operator, start):
+        interval = (start, start + self.instance.requests[patient][exam])
+        insort(self.operatorBusy[operator], interval)
+        insort(self.patientBusy[patient], interval)
+        self.schedule[patient, exam] = (operator, start)
+
+    def __remove(self, patient, exam):
+        operator, start = self.schedule.pop((patient, exam))
+        interval = (start, start + self.instance.requests[patient][exam])
+        self.operatorBusy[operator].remove(interval)
+        self.patientBusy[patient].remove(interval)
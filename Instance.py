@@ -1,4 +1,5 @@
 import json
+from InstanceMatrix import InstanceMatrix
 from random import seed, random, randint, shuffle
 
 if __name__ == '__main__':
@@ -24,6 +25,22 @@ operatorNames = [
     'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z'
 ]
 
+# how the entries that the changes modify in place are copied, see getCopy
+entryCopies = {
+    'requests': dict,
+    'operatorData': lambda operatorData: dict(operatorData, canDo=list(operatorData['canDo'])),
+    'packets': lambda packets: [list(packet) for packet in packets],
+    'canDo': set,
+    'examOperators': list,
+    'examRequests': dict
+}
+
+def getNames(names, prefix, count):
+    # past the end of the name list every item gets a synthetic id
+    if count <= len(names):
+        return names[:count]
+    return [prefix + str(i) for i in range(count)]
+
 class Instance:
     def __init__(self):
         self.options = {
@@ -43,6 +60,11 @@ class Instance:
         self.requests = {}
         self.operatorData = {}
         self.packets = {}
+        self.index = {}
+        self.matrix = None
+        self.warnings = []
+        # None unless the instance is a copy that still shares entries with its original
+        self.copiedEntries = None
 
         self.isIstantiated = False
 
@@ -67,9 +89,10 @@ class Instance:
             self.__generateRandomPackets()
         else:
             self.packets = {}
+        self.__buildIndex()
         self.isIstantiated = True
 
-    def printToJSONFile(self, fileName):
+    def printToJSONFile(self, fileName, indent=4):
         if not self.isIstantiated:
             raise Exception('trying to write to file, but istance not istantiated')
         with open(fileName, 'w') as f:
@@ -77,18 +100,207 @@ class Instance:
                 'requests': self.requests,
                 'operatorData': self.operatorData,
                 'packets': self.packets
-            }, indent=4))
+            }, indent=indent))
 
-    def loadFromJSONFile(self, fileName):
+    def loadFromJSONFile(self, fileName, warnings='print'):
+        # warnings can be printed one by one, aggregated in a single line or skipped;
+        # they are always kept in self.warnings
         data = None
         with open(fileName, 'r') as f:
-            data = json.loads(f.read())
+            data = json.load(f)
+        self.__loadFromData(data, warnings)
+
+    def loadFromBinaryFile(self, fileName, warnings='print'):
+        matrix = InstanceMatrix()
+        matrix.loadFromBinaryFile(fileName)
+        self.loadFromMatrix(matrix, warnings)
+        # the matrix holds the same requests and operators, so the models do not rebuild it;
+        # its arrays stay views on the mapped file as long as the instance keeps it
+        self.matrix = matrix
+
+    def printToBinaryFile(self, fileName):
+        if not self.isIstantiated:
+            raise Exception('trying to write to file, but istance not istantiated')
+        self.getMatrix().printToBinaryFile(fileName)
+
+    def loadFromMatrix(self, matrix, warnings='print'):
+        self.__loadFromData(matrix.toDicts(), warnings)
+
+    def getMatrix(self):
+        if not self.isIstantiated:
+            raise Exception('trying to get the matrix of a non-instantiated instance')
+        if self.matrix is None:
+            self.matrix = InstanceMatrix(self)
+        return self.matrix
+
+    def getSubInstance(self, requests, operators=None, operatorWindows=None):
+        # operatorWindows maps operators to a (startTime, endTime) that replaces their own
+        if not self.isIstantiated:
+            raise Exception('trying to restrict a non-instantiated instance')
+        if operators is None:
+            operators = self.operators
+        requests = set(requests)
+        exams = set(examName for _, examName in requests)
+
+        data = {
+            'requests': {},
+            'operatorData': {},
+            'packets': {}
+        }
+        for patientName in self.patients:
+            patientRequests = {examName: duration
+                for examName, duration in self.requests[patientName].items()
+                if (patientName, examName) in requests}
+            if len(patientRequests) > 0:
+                data['requests'][patientName] = patientRequests
+        if operatorWindows is None:
+            operatorWindows = {}
+        for operatorName in operators:
+            startTime, endTime = operatorWindows.get(operatorName, (self.operatorData[operatorName]['startTime'], self.operatorData[operatorName]['endTime']))
+            data['operatorData'][operatorName] = {
+                'startTime': startTime,
+                'endTime': endTime,
+                'canDo': [examName for examName in self.operatorData[operatorName]['canDo'] if examName in exams]
+            }
+        if self.options['usePackets']:
+            for patientName in data['requests']:
+                packets = [[examName for examName in packet if (patientName, examName) in requests]
+                    for packet in self.packets.get(patientName, [])]
+                data['packets'][patientName] = [packet for packet in packets if len(packet) > 0]
+
+        instance = Instance()
+        instance.__loadFromData(data)
+        return instance
+
+    def getCopy(self):
+        # copies the containers but shares their entries: the changes copy an entry
+        # before modifying it, so the first change does not copy the whole instance
+        if not self.isIstantiated:
+            raise Exception('trying to copy a non-instantiated instance')
+        instance = Instance()
+        instance.options = dict(self.options)
+        instance.patients = list(self.patients)
+        instance.exams = list(self.exams)
+        instance.operators = list(self.operators)
+        instance.requests = dict(self.requests)
+        instance.operatorData = dict(self.operatorData)
+        instance.packets = dict(self.packets)
+        instance.index = {name: dict(container) for name, container in self.index.items()}
+        instance.warnings = list(self.warnings)
+        instance.copiedEntries = set()
+        instance.isIstantiated = True
+        return instance
+
+    def addRequest(self, patientName, examName, duration):
+        if not self.isIstantiated:
+            raise Exception('trying to change a non-instantiated instance')
+        if not isinstance(duration, int) or duration <= 0:
+            raise Exception('duration must be a positive int')
+        if examName in self.requests.get(patientName, {}):
+            raise Exception('patient \'' + patientName + '\' already requests exam \'' + examName + '\'')
+        if patientName not in self.requests:
+            self.patients.append(patientName)
+            self.requests[patientName] = {}
+            self.index['patientIds'][patientName] = len(self.patients) - 1
+        if examName not in self.index['examIds']:
+            self.exams.append(examName)
+            self.index['examIds'][examName] = len(self.exams) - 1
+        self.__copyEntry(self.requests, 'requests', patientName)
+        self.requests[patientName][examName] = duration
+        self.__copyEntry(self.index['examRequests'], 'examRequests', examName)
+        self.index['examRequests'].setdefault(examName, {})[patientName] = None
+        if self.options['usePackets']:
+            # a new request is a packet on its own
+            self.__copyEntry(self.packets, 'packets', patientName)
+            self.packets.setdefault(patientName, []).append([examName])
+            self.index['packetLeaders'][(patientName, examName)] = examName
+        self.options['patientNumber'] = len(self.patients)
+        self.options['examNumber'] = len(self.exams)
+        self.options['maxTime'] = max(self.options['maxTime'], duration)
+        return self.__updateEligibleOperators([(patientName, examName)])
+
+    def removeRequest(self, patientName, examName):
+        if not self.isIstantiated:
+            raise Exception('trying to change a non-instantiated instance')
+        if examName not in self.requests.get(patientName, {}):
+            raise Exception('patient \'' + patientName + '\' does not request exam \'' + examName + '\'')
+        self.__copyEntry(self.requests, 'requests', patientName)
+        del self.requests[patientName][examName]
+        del self.index['eligibleOperators'][(patientName, examName)]
+        self.__copyEntry(self.index['examRequests'], 'examRequests', examName)
+        del self.index['examRequests'][examName][patientName]
+        if self.options['usePackets']:
+            self.__copyEntry(self.packets, 'packets', patientName)
+            del self.index['packetLeaders'][(patientName, examName)]
+            for packet in self.packets[patientName]:
+                if examName in packet:
+                    packet.remove(examName)
+                    for otherExam in packet:
+                        self.index['packetLeaders'][(patientName, otherExam)] = packet[0]
+            self.packets[patientName] = [packet for packet in self.packets[patientName] if len(packet) > 0]
+        self.matrix = None
+        return [(patientName, examName)]
+
+    def setOperatorWindow(self, operatorName, startTime, endTime):
+        if not self.isIstantiated:
+            raise Exception('trying to change a non-instantiated instance')
+        if operatorName not in self.operatorData:
+            raise Exception('operator \'' + operatorName + '\' does not exist')
+        if startTime >= endTime:
+            raise Exception('start time must be less than end time (operator \'' + operatorName + '\')')
+        self.__copyEntry(self.operatorData, 'operatorData', operatorName)
+        self.operatorData[operatorName]['startTime'] = startTime
+        self.operatorData[operatorName]['endTime'] = endTime
+        self.index['windowLength'][operatorName] = endTime - startTime
+        self.options['maxTime'] = max(self.options['maxTime'], endTime)
+        return self.__updateEligibleOperators(self.__getRequestsOfExams(self.index['canDo'][operatorName]))
+
+    def addCanDo(self, operatorName, examName):
+        if not self.isIstantiated:
+            raise Exception('trying to change a non-instantiated instance')
+        if operatorName not in self.operatorData:
+            raise Exception('operator \'' + operatorName + '\' does not exist')
+        if examName in self.index['canDo'][operatorName]:
+            raise Exception('operator \'' + operatorName + '\' can already do exam \'' + examName + '\'')
+        self.__copyEntry(self.operatorData, 'operatorData', operatorName)
+        self.operatorData[operatorName]['canDo'].append(examName)
+        self.__copyEntry(self.index['canDo'], 'canDo', operatorName)
+        self.index['canDo'][operatorName].add(examName)
+        self.__copyEntry(self.index['examOperators'], 'examOperators', examName)
+        examOperators = self.index['examOperators'].setdefault(examName, [])
+        examOperators.append(operatorName)
+        examOperators.sort(key=self.index['operatorIds'].get)
+        return self.__updateEligibleOperators(self.__getRequestsOfExams([examName]))
+
+    def removeCanDo(self, operatorName, examName):
+        if not self.isIstantiated:
+            raise Exception('trying to change a non-instantiated instance')
+        if examName not in self.index['canDo'].get(operatorName, set()):
+            raise Exception('operator \'' + operatorName + '\' cannot do exam \'' + examName + '\'')
+        self.__copyEntry(self.operatorData, 'operatorData', operatorName)
+        self.operatorData[operatorName]['canDo'].remove(examName)
+        self.__copyEntry(self.index['canDo'], 'canDo', operatorName)
+        self.index['canDo'][operatorName].remove(examName)
+        self.__copyEntry(self.index['examOperators'], 'examOperators', examName)
+        self.index['examOperators'][examName].remove(operatorName)
+        return self.__updateEligibleOperators(self.__getRequestsOfExams([examName]))
+
+    def __loadFromData(self, data, warnings='print'):
         if 'requests' not in data or 'operatorData' not in data or 'packets' not in data:
             raise Exception('data don\'t have the correct shape')
+        if warnings not in ['print', 'aggregate', 'skip']:
+            raise Exception('warnings must be \'print\', \'aggregate\' or \'skip\'')
+        self.warnings = []
         self.__decodeRequests(data['requests'])
-        self.__decodeOperatorData(data['operatorData'])
+        unrequestedExams = self.__decodeOperatorData(data['operatorData'], warnings)
         self.__decodePackets(data['packets'])
+        if warnings == 'aggregate' and len(unrequestedExams) > 0:
+            # an exam listed by several operators, or twice by the same one, is counted once
+            pairNumber = sum(len(operators) for operators in unrequestedExams.values())
+            print('found ' + str(len(unrequestedExams)) + ' exams done by operators, but non requested by anyone (' +
+                str(pairNumber) + ' operator and exam pairs)')
         self.options['seed'] = -1
+        self.__buildIndex()
         self.isIstantiated = True
 
     def __processOptions(self, options):
@@ -99,18 +311,12 @@ class Instance:
 
         if not isinstance(self.options['patientNumber'], int):
             raise Exception('patientNumber is not an int')
-        if self.options['patientNumber'] > len(patientNames):
-            raise Exception('patientNumber is too large (max ' + len(patientNames) + ')')
 
         if not isinstance(self.options['examNumber'], int):
             raise Exception('examNumber is not an int')
-        if self.options['examNumber'] > len(examNames):
-            raise Exception('examNumber is too large (max ' + len(examNames) + ')')
         
         if not isinstance(self.options['operatorNumber'], int):
             raise Exception('operatorNumber is not an int')
-        if self.options['operatorNumber'] > len(operatorNames):
-            raise Exception('operatorNumber is too large (max ' + len(operatorNames) + ')')
 
         if not isinstance(self.options['maxTime'], int):
             raise Exception('maxTime is not an int')
@@ -131,13 +337,13 @@ class Instance:
             raise Exception('operatorFullness must lie between 0.0 and 1.0')
 
     def __generateRandomPatients(self):
-        self.patients = patientNames[:self.options['patientNumber']]
+        self.patients = getNames(patientNames, 'patient', self.options['patientNumber'])
 
     def __generateRandomExams(self):
-        self.exams = examNames[:self.options['examNumber']]
+        self.exams = getNames(examNames, 'exam', self.options['examNumber'])
     
     def __generateRandomOperators(self):
-        self.operators = operatorNames[:self.options['operatorNumber']]
+        self.operators = getNames(operatorNames, 'operator', self.options['operatorNumber'])
 
     def __generateRandomRequests(self):
         self.requests = {}
@@ -145,16 +351,16 @@ class Instance:
             self.requests[patientName] = {}
             for examName in self.exams:
                 if random() < self.options['requestFullness']:
-                    duration = randint(1, self.options['maxTime'] / 2)
+                    duration = randint(1, self.options['maxTime'] // 2)
                     self.requests[patientName][examName] = duration
 
     def __generateRandomOperatorData(self):
         self.operatorData = {}
         for operatorName in self.operators:
-            startTime = randint(1, self.options['maxTime'] / 2)
+            startTime = randint(1, self.options['maxTime'] // 2)
             self.operatorData[operatorName] = {
                 'startTime': startTime,
-                'endTime': startTime + randint(1, self.options['maxTime'] / 2),
+                'endTime': startTime + randint(1, self.options['maxTime'] // 2),
                 'canDo': []
             }
             for examName in self.exams:
@@ -173,39 +379,38 @@ class Instance:
                 exams = exams[packetSize:]
 
     def __decodeRequests(self, requests):
-        self.patients = []
-        self.exams = []
+        # dicts work as ordered sets, so every lookup is constant time
+        patients = {}
+        exams = {}
         self.requests = {}
         maxTime = 0
         requestFullness = 0
 
-        for patientName in requests:
-            if patientName not in self.patients:
-                self.patients.append(patientName)
-            self.requests[patientName] = {}
-            for examName in requests[patientName]:
-                examDuration = requests[patientName][examName]
-                if examName not in self.exams:
-                    self.exams.append(examName)
-                self.requests[patientName][examName] = examDuration
-                requestFullness += 1
-                if examDuration > maxTime:
-                    maxTime = examDuration
+        for patientName, patientRequests in requests.items():
+            patients[patientName] = None
+            self.requests[patientName] = dict(patientRequests)
+            exams.update(dict.fromkeys(patientRequests))
+            requestFullness += len(patientRequests)
+            maxTime = max(maxTime, max(patientRequests.values(), default=0))
 
+        self.patients = list(patients)
+        self.exams = list(exams)
         self.options['patientNumber'] = len(self.patients)
         self.options['examNumber'] = len(self.exams)
         self.options['maxTime'] = maxTime
-        self.options['requestFullness'] = requestFullness / (len(self.patients) * len(self.exams))
+        self.options['requestFullness'] = requestFullness / max(1, len(self.patients) * len(self.exams))
 
-    def __decodeOperatorData(self, operatorData):
-        self.operators = []
+    def __decodeOperatorData(self, operatorData, warnings='print'):
+        # names in lists are separate strings for the JSON decoder, this makes them the same object
+        exams = {examName: examName for examName in self.exams}
+        operators = {}
+        unrequestedExams = {}
         self.operatorData = {}
         maxTime = self.options['maxTime']
         operatorFullness = 0
 
         for operatorName in operatorData:
-            if operatorName not in self.operators:
-                self.operators.append(operatorName)
+            operators[operatorName] = None
             startTime = operatorData[operatorName]['startTime']
             endTime = operatorData[operatorName]['endTime']
             if startTime >= endTime:
@@ -218,14 +423,20 @@ class Instance:
                 'canDo': []
             }
             for examName in operatorData[operatorName]['canDo']:
-                if examName not in self.exams:
-                    print('found exam \'' + examName + '\' done by operator \'' + operatorName + '\', but non requested by anyone')
-                self.operatorData[operatorName]['canDo'].append(examName)
+                if examName not in exams:
+                    unrequestedExams.setdefault(examName, {})[operatorName] = None
+                    warning = 'found exam \'' + examName + '\' done by operator \'' + operatorName + '\', but non requested by anyone'
+                    self.warnings.append(warning)
+                    if warnings == 'print':
+                        print(warning)
+                self.operatorData[operatorName]['canDo'].append(exams.get(examName, examName))
                 operatorFullness += 1
 
+        self.operators = list(operators)
         self.options['operatorNumber'] = len(self.operators)
         self.options['maxTime'] = maxTime
-        self.options['operatorFullness'] = operatorFullness / (len(self.operators) * len(self.exams))
+        self.options['operatorFullness'] = operatorFullness / max(1, len(self.operators) * len(self.exams))
+        return unrequestedExams
     
     def __decodePackets(self, packets):
         self.packets = {}
@@ -234,14 +445,95 @@ class Instance:
             return
         self.options['usePackets'] = True
 
+        exams = {examName: examName for examName in self.exams}
         for patientName in packets:
-            if not patientName in self.patients:
+            if not patientName in self.requests:
                 raise Exception('found patient \'' + patientName + '\' in a packet but not in requests')
             self.packets[patientName] = []
             for packet in packets[patientName]:
                 p = []
                 for examName in packet:
-                    if not examName in self.exams:
+                    if not examName in exams:
                         raise Exception('found exam \'' + examName + '\' in a packet but not in requests')
-                    p.append(examName)
-                self.packets[patientName].append(p)
\ No newline at end of file
+                    p.append(exams[examName])
+                self.packets[patientName].append(p)
+
+    def __copyEntry(self, container, name, key):
+        # the first change to an entry shared with the original works on a copy
+        if self.copiedEntries is None or (name, key) in self.copiedEntries:
+            return
+        self.copiedEntries.add((name, key))
+        if key in container:
+            container[key] = entryCopies[name](container[key])
+
+    def __getRequestsOfExams(self, examNames):
+        return [(patientName, examName)
+            for examName in examNames
+            for patientName in self.index['examRequests'].get(examName, {})]
+
+    def __updateEligibleOperators(self, requests):
+        # returns the requests whose eligible operators changed
+        changed = []
+        for patientName, examName in requests:
+            eligibleOperators = [operatorName
+                for operatorName in self.index['examOperators'].get(examName, [])
+                if self.index['windowLength'][operatorName] >= self.requests[patientName][examName]]
+            if eligibleOperators != self.index['eligibleOperators'].get((patientName, examName)):
+                self.index['eligibleOperators'][(patientName, examName)] = eligibleOperators
+                changed.append((patientName, examName))
+        self.matrix = None
+        return changed
+
+    def __buildIndex(self):
+        canDo = {}
+        windowLength = {}
+        for operatorName in self.operators:
+            canDo[operatorName] = set(self.operatorData[operatorName]['canDo'])
+            windowLength[operatorName] = self.operatorData[operatorName]['endTime'] - self.operatorData[operatorName]['startTime']
+
+        # operators that can do every exam, so that each request looks only at those
+        examOperators = {examName: [] for examName in self.exams}
+        for operatorName in self.operators:
+            for examName in canDo[operatorName]:
+                examOperators.setdefault(examName, []).append(operatorName)
+        operatorIds = {operatorName: i for i, operatorName in enumerate(self.operators)}
+        for operators in examOperators.values():
+            operators.sort(key=operatorIds.get)
+
+        # requests with the same exam and duration share the same list, which is never changed in place
+        eligibleOperators = {}
+        sharedLists = {}
+        examIds = {examName: i for i, examName in enumerate(self.exams)}
+        for patientName in self.patients:
+            for examName in sorted(self.requests[patientName], key=examIds.get):
+                duration = self.requests[patientName][examName]
+                if (examName, duration) not in sharedLists:
+                    sharedLists[examName, duration] = [operatorName
+                        for operatorName in examOperators[examName]
+                        if windowLength[operatorName] >= duration]
+                eligibleOperators[(patientName, examName)] = sharedLists[examName, duration]
+
+        # patients requesting every exam, so that a change to an exam does not look at every patient
+        examRequests = {examName: {} for examName in self.exams}
+        for patientName in self.patients:
+            for examName in self.requests[patientName]:
+                examRequests[examName][patientName] = None
+
+        packetLeaders = {}
+        for patientName in self.packets:
+            for packet in self.packets[patientName]:
+                for examName in packet:
+                    packetLeaders[(patientName, examName)] = packet[0]
+
+        self.index = {
+            'patientIds': {patientName: i for i, patientName in enumerate(self.patients)},
+            'examIds': examIds,
+            'operatorIds': operatorIds,
+            'canDo': canDo,
+            'windowLength': windowLength,
+            'examOperators': examOperators,
+            'examRequests': examRequests,
+            'eligibleOperators': eligibleOperators,
+            'packetLeaders': packetLeaders
+        }
+        self.matrix = None
@@ -0,0 +1,95 @@
+import json
+from random import Random
+from Instance import patientNames, examNames, operatorNames, getNames
+
+if __name__ == '__main__':
+    exit(0)
+
+# Generates large random instances straight to a JSON file, one patient at a
+# time, so that memory does not grow with the number of patients. The draws
+# are the ones of Instance.istantiateWithRandomValues in the same order, so
+# with the same options the file is the one Instance.printToJSONFile writes.
+# The packets are drawn after the operators from the requests of the same
+# patient, which a second generator draws again instead of keeping them all.
+class InstanceGenerator:
+    def __init__(self, options):
+        for keyword in ['patientNumber', 'examNumber', 'operatorNumber', 'maxTime', 'usePackets', 'requestFullness', 'operatorFullness', 'seed']:
+            if keyword not in options:
+                raise Exception(keyword + ' not provided')
+        if options['maxTime'] < 2:
+            raise Exception('maxTime must be at least 2')
+        self.options = dict(options)
+        self.exams = getNames(examNames, 'exam', options['examNumber'])
+        self.operators = getNames(operatorNames, 'operator', options['operatorNumber'])
+
+    def writeJSONFile(self, fileName, indent=None):
+        random = Random(self.options['seed'])
+        requestRandom = Random(self.options['seed'])
+        sections = [
+            ('requests', self.__generateRequests(random)),
+            ('operatorData', self.__generateOperatorData(random)),
+            ('packets', self.__generatePackets(random, requestRandom) if self.options['usePackets'] else iter([]))
+        ]
+        with open(fileName, 'w') as f:
+            self.__writeObject(f, sections, indent, 0)
+
+    def __writeObject(self, f, items, indent, depth):
+        # writes the items as json.dumps would; dicts and lists are written
+        # whole, the sections are written one item at a time
+        f.write('{')
+        isEmpty = True
+        for key, value in items:
+            if indent is None:
+                f.write('' if isEmpty else ', ')
+            else:
+                f.write(('' if isEmpty else ',') + '\n' + ' ' * (indent * (depth + 1)))
+            f.write(json.dumps(key) + ': ')
+            if isinstance(value, (dict, list)):
+                text = json.dumps(value, indent=indent)
+                f.write(text if indent is None else text.replace('\n', '\n' + ' ' * (indent * (depth + 1))))
+            else:
+                self.__writeObject(f, value, indent, depth + 1)
+            isEmpty = False
+        if indent is not None and not isEmpty:
+            f.write('\n' + ' ' * (indent * depth))
+        f.write('}')
+
+    def __getPatients(self):
+        if self.options['patientNumber'] <= len(patientNames):
+            return iter(patientNames[:self.options['patientNumber']])
+        return ('patient' + str(i) for i in range(self.options['patientNumber']))
+
+    def __drawRequests(self, random):
+        requests = {}
+        for exam in self.exams:
+            if random.random() < self.options['requestFullness']:
+                requests[exam] = random.randint(1, self.options['maxTime'] // 2)
+        return requests
+
+    def __generateRequests(self, random):
+        for patient in self.__getPatients():
+            yield patient, self.__drawRequests(random)
+
+    def __generateOperatorData(self, random):
+        for operator in self.operators:
+            startTime = random.randint(1, self.options['maxTime'] // 2)
+            operatorData = {
+                'startTime': startTime,
+                'endTime': startTime + random.randint(1, self.options['maxTime'] // 2),
+                'canDo': []
+            }
+            for exam in self.exams:
+                if random.random() < self.options['operatorFullness']:
+                    operatorData['canDo'].append(exam)
+            yield operator, operatorData
+
+    def __generatePackets(self, random, requestRandom):
+        for patient in self.__getPatients():
+            exams = list(self.__drawRequests(requestRandom))
+            packets = []
+            while len(exams) > 0:
+                random.shuffle(exams)
+                packetSize = random.randint(1, len(exams))
+                packets.append(exams[:packetSize])
+                exams = exams[packetSize:]
+            yield patient, packets
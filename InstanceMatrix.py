@@ -0,0 +1,313 @@
+import mmap
+import numpy as np
+
+if __name__ == '__main__':
+    exit(0)
+
+# Binary layout (little endian): the header with the magic, the version and
+# the counts of patients, exams, exams only in canDo, operators and requests,
+# then the string table (offsets and UTF-8 names) and the arrays, each one
+# aligned to 8 bytes: patients, exams, durations, packetIds and packetPositions
+# (one entry per request), startTimes, endTimes and capabilities (operator x
+# every exam).
+binaryMagic = b'OSPB'
+binaryVersion = 3
+binaryHeader = np.dtype([('magic', 'S4'), ('version', '<u4'), ('patients', '<u4'), ('exams', '<u4'),
+    ('extraExams', '<u4'), ('operators', '<u4'), ('usePackets', '<u4'), ('requests', '<u4')])
+
+class InstanceMatrix:
+    def __init__(self, instance=None):
+        self.patients = []
+        self.exams = []
+        self.operators = []
+        self.usePackets = False
+        # the file mapped by loadFromBinaryFile, the arrays are views on it
+        self.buffer = None
+        self.__clearArrays()
+        if instance is not None:
+            self.__loadFromInstance(instance)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def close(self):
+        # the arrays are emptied first: the mapping cannot be closed while a view
+        # on it is alive, so one kept outside the matrix raises BufferError
+        self.__clearArrays()
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+    def __clearArrays(self):
+        # one entry per request, sorted by patient and exam
+        self.requestPatients = np.zeros(0, dtype=np.int64)
+        self.requestExams = np.zeros(0, dtype=np.int64)
+        self.requestDurations = np.zeros(0, dtype=np.int64)
+        # packets are numbered per patient, -1 means no packet; the positions keep the order of the exams in the packet
+        self.requestPacketIds = np.zeros(0, dtype=np.int64)
+        self.requestPacketPositions = np.zeros(0, dtype=np.int64)
+        self.capabilities = np.zeros((0, 0), dtype=bool)
+        self.startTimes = np.zeros(0, dtype=np.int64)
+        self.endTimes = np.zeros(0, dtype=np.int64)
+        self.extraCanDo = {}
+        # computed once, every index set of a model is built from them
+        self.chiIds = None
+        self.chiIndexes = None
+
+    def __loadFromInstance(self, instance):
+        if not instance.isIstantiated:
+            raise Exception('trying to build the matrix view of a non-instantiated instance')
+        self.patients = list(instance.patients)
+        self.exams = list(instance.exams)
+        self.operators = list(instance.operators)
+        self.usePackets = instance.options['usePackets']
+
+        patientIds = instance.index['patientIds']
+        examIds = instance.index['examIds']
+        operatorIds = instance.index['operatorIds']
+
+        packetIds = {}
+        packetPositions = {}
+        for patientName in instance.packets:
+            for packetId, packet in enumerate(instance.packets[patientName]):
+                for position, examName in enumerate(packet):
+                    packetIds[(patientName, examName)] = packetId
+                    packetPositions[(patientName, examName)] = position
+        requests = [(patientIds[patientName], examIds[examName], duration,
+                packetIds.get((patientName, examName), -1), packetPositions.get((patientName, examName), 0))
+            for patientName in instance.requests
+            for examName, duration in instance.requests[patientName].items()]
+        columns = np.array(requests, dtype=np.int64).reshape(len(requests), 5)
+        columns = columns[np.lexsort((columns[:, 1], columns[:, 0]))]
+        self.requestPatients, self.requestExams, self.requestDurations, self.requestPacketIds, self.requestPacketPositions = (
+            np.ascontiguousarray(column) for column in columns.T)
+
+        self.capabilities = np.zeros((len(self.operators), len(self.exams)), dtype=bool)
+        self.startTimes = np.zeros(len(self.operators), dtype=np.int64)
+        self.endTimes = np.zeros(len(self.operators), dtype=np.int64)
+        for operatorName in instance.operatorData:
+            operatorId = operatorIds[operatorName]
+            self.startTimes[operatorId] = instance.operatorData[operatorName]['startTime']
+            self.endTimes[operatorId] = instance.operatorData[operatorName]['endTime']
+            for examName in instance.operatorData[operatorName]['canDo']:
+                # exams nobody requested cannot be represented, like in the index
+                if examName in examIds:
+                    self.capabilities[operatorId, examIds[examName]] = True
+        self.extraCanDo = {operatorName: [examName
+                for examName in instance.operatorData[operatorName]['canDo']
+                if examName not in examIds]
+            for operatorName in instance.operatorData}
+
+    def loadFromBinaryFile(self, fileName):
+        # the arrays are read-only views on the mapped file, nothing but the names is
+        # copied; the mapping stays open until close() or until the matrix is dropped
+        self.close()
+        with open(fileName, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__loadFromBuffer(self.buffer, fileName)
+
+    def __loadFromBuffer(self, buffer, fileName):
+        header = np.frombuffer(buffer, dtype=binaryHeader, count=1).copy()[0]
+        if header['magic'] != binaryMagic or header['version'] != binaryVersion:
+            raise Exception('file \'' + fileName + '\' is not a binary instance')
+        patientNumber, examNumber, extraNumber, operatorNumber, requestNumber = (int(header[key])
+            for key in ['patients', 'exams', 'extraExams', 'operators', 'requests'])
+        nameNumber = patientNumber + examNumber + extraNumber + operatorNumber
+
+        offset = binaryHeader.itemsize
+        def read(dtype, count):
+            nonlocal offset
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset += -(-array.nbytes // 8) * 8
+            return array
+        nameOffsets = read('<u8', nameNumber + 1)
+        blob = read('u1', int(nameOffsets[-1])).tobytes()
+        names = [blob[begin:end].decode('utf-8') for begin, end in zip(nameOffsets[:-1].tolist(), nameOffsets[1:].tolist())]
+
+        self.patients = names[:patientNumber]
+        self.exams = names[patientNumber:patientNumber + examNumber]
+        extraExams = names[patientNumber + examNumber:patientNumber + examNumber + extraNumber]
+        self.operators = names[patientNumber + examNumber + extraNumber:]
+        self.usePackets = bool(header['usePackets'])
+        self.requestPatients = read('<i8', requestNumber)
+        self.requestExams = read('<i8', requestNumber)
+        self.requestDurations = read('<i8', requestNumber)
+        self.requestPacketIds = read('<i8', requestNumber)
+        self.requestPacketPositions = read('<i8', requestNumber)
+        self.startTimes = read('<i8', operatorNumber)
+        self.endTimes = read('<i8', operatorNumber)
+        allCapabilities = read('?', operatorNumber * (examNumber + extraNumber)).reshape(operatorNumber, examNumber + extraNumber)
+        self.capabilities = allCapabilities[:, :examNumber]
+        self.extraCanDo = {operatorName: [extraExams[e] for e in np.flatnonzero(allCapabilities[o, examNumber:]).tolist()]
+            for o, operatorName in enumerate(self.operators)}
+
+    def printToBinaryFile(self, fileName):
+        extraExams = list(dict.fromkeys(examName for examNames in self.extraCanDo.values() for examName in examNames))
+        extraIds = {examName: e for e, examName in enumerate(extraExams)}
+        extraCapabilities = np.zeros((len(self.operators), len(extraExams)), dtype=bool)
+        for o, operatorName in enumerate(self.operators):
+            for examName in self.extraCanDo.get(operatorName, []):
+                extraCapabilities[o, extraIds[examName]] = True
+
+        encoded = [name.encode('utf-8') for name in self.patients + self.exams + extraExams + self.operators]
+        nameOffsets = np.zeros(len(encoded) + 1, dtype='<u8')
+        nameOffsets[1:] = np.cumsum([len(name) for name in encoded])
+        header = np.zeros(1, dtype=binaryHeader)
+        header[0] = (binaryMagic, binaryVersion, len(self.patients), len(self.exams), len(extraExams), len(self.operators), int(self.usePackets), len(self.requestPatients))
+
+        # read before the file is truncated, it can be the one the arrays are mapped from
+        blocks = [np.ascontiguousarray(array).tobytes() for array in [header, nameOffsets, np.frombuffer(b''.join(encoded), dtype='u1'),
+            self.requestPatients.astype('<i8'), self.requestExams.astype('<i8'), self.requestDurations.astype('<i8'),
+            self.requestPacketIds.astype('<i8'), self.requestPacketPositions.astype('<i8'),
+            self.startTimes.astype('<i8'), self.endTimes.astype('<i8'),
+            np.concatenate((self.capabilities, extraCapabilities), axis=1)]]
+        with open(fileName, 'wb') as f:
+            for data in blocks:
+                f.write(data)
+                f.write(bytes(-len(data) % 8))
+
+    def toDicts(self):
+        # one conversion to lists instead of a numpy call per request
+        requestPatients = self.requestPatients.tolist()
+        requestExams = self.requestExams.tolist()
+        requests = {patientName: {} for patientName in self.patients}
+        for patientId, examId, duration in zip(requestPatients, requestExams, self.requestDurations.tolist()):
+            requests[self.patients[patientId]][self.exams[examId]] = duration
+
+        operatorData = {}
+        for operatorId, operatorName in enumerate(self.operators):
+            operatorData[operatorName] = {
+                'startTime': int(self.startTimes[operatorId]),
+                'endTime': int(self.endTimes[operatorId]),
+                'canDo': [self.exams[examId] for examId in np.flatnonzero(self.capabilities[operatorId])] + self.extraCanDo.get(operatorName, [])
+            }
+
+        packets = {}
+        if self.usePackets:
+            packets = {patientName: [] for patientName in self.patients}
+            order = np.lexsort((self.requestPacketPositions, self.requestPacketIds, self.requestPatients)).tolist()
+            packetIds = self.requestPacketIds.tolist()
+            for r in order:
+                if packetIds[r] >= 0:
+                    patientPackets = packets[self.patients[requestPatients[r]]]
+                    while len(patientPackets) <= packetIds[r]:
+                        patientPackets.append([])
+                    patientPackets[packetIds[r]].append(self.exams[requestExams[r]])
+
+        return {
+            'requests': requests,
+            'operatorData': operatorData,
+            'packets': packets
+        }
+
+    def getWindowLengths(self):
+        return self.endTimes - self.startTimes
+
+    def getChiIds(self):
+        # patient, exam and operator ids of every chi variable, sorted by patient, exam and operator
+        if self.chiIds is None:
+            self.chiIds = self.__findChiIds()
+        return self.chiIds
+
+    def getPatientConflictPairs(self):
+        # positions in getChiIds() of the pairs of assignments of the same patient that can overlap,
+        # the one with the smaller exam first
+        patientIds, examIds, operatorIds = self.getChiIds()
+        startTimes = self.startTimes[operatorIds]
+        endTimes = self.endTimes[operatorIds]
+        # sorted by patient and start time, every assignment can overlap only the ones that follow
+        # it and start before its end
+        span = int(self.endTimes.max(initial=0)) + 1
+        keys = patientIds * span + startTimes
+        order = np.argsort(keys, kind='stable')
+        ends = np.searchsorted(keys[order], (patientIds * span + endTimes)[order], side='left')
+        first, second = self.__windowPairs(order, np.arange(1, len(order) + 1), ends)
+        different = examIds[first] != examIds[second]
+        first, second = first[different], second[different]
+        swap = examIds[first] > examIds[second]
+        first, second = np.where(swap, second, first), np.where(swap, first, second)
+        return self.__sortPairs(first, second)
+
+    def getOperatorConflictPairs(self):
+        # positions in getChiIds() of the pairs of assignments of different patients on the same operator
+        patientIds, examIds, operatorIds = self.getChiIds()
+        # sorted by operator and patient, every assignment is paired with the ones of the
+        # following patients of its operator
+        order = np.lexsort((patientIds, operatorIds))
+        patientEnds = self.__runEnds(operatorIds[order] * (len(self.patients) + 1) + patientIds[order])
+        operatorEnds = self.__runEnds(operatorIds[order])
+        first, second = self.__windowPairs(order, patientEnds, operatorEnds)
+        return first, second
+
+    def getChiIndexes(self):
+        if self.chiIndexes is None:
+            patientIds, examIds, operatorIds = self.getChiIds()
+            self.chiIndexes = [(self.patients[p], self.exams[e], self.operators[o])
+                for p, e, o in zip(patientIds.tolist(), examIds.tolist(), operatorIds.tolist())]
+        return self.chiIndexes
+
+    def getPatientConflictIndexes(self):
+        chiIndexes = self.getChiIndexes()
+        first, second = self.getPatientConflictPairs()
+        return [chiIndexes[i] + chiIndexes[j][1:] for i, j in zip(first.tolist(), second.tolist())]
+
+    def getOperatorConflictIndexes(self):
+        chiIndexes = self.getChiIndexes()
+        first, second = self.getOperatorConflictPairs()
+        return [chiIndexes[i][:2] + chiIndexes[j] for i, j in zip(first.tolist(), second.tolist())]
+
+    def __findChiIds(self):
+        # the requests of every exam are compared only with the operators that can do it
+        windowLengths = self.getWindowLengths()
+        patientIds, examIds, durations = self.requestPatients, self.requestExams, self.requestDurations
+        chiRequests = []
+        chiOperators = []
+        order = np.argsort(examIds, kind='stable')
+        for begin, end in self.__groupBounds(examIds[order]):
+            requests = order[begin:end]
+            operators = np.flatnonzero(self.capabilities[:, examIds[requests[0]]])
+            request, operator = np.nonzero(windowLengths[operators][np.newaxis, :] >= durations[requests][:, np.newaxis])
+            chiRequests.append(requests[request])
+            chiOperators.append(operators[operator])
+        chiRequests, chiOperators = self.__concatenatePairs(chiRequests, chiOperators)
+        order = np.lexsort((chiOperators, chiRequests))
+        chiRequests, chiOperators = chiRequests[order], chiOperators[order]
+        return patientIds[chiRequests], examIds[chiRequests], chiOperators
+
+    def __windowPairs(self, order, begins, ends):
+        # pairs of order[i] with order[begins[i]:ends[i]], without building a dense mask
+        counts = np.maximum(ends - begins, 0)
+        total = int(counts.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        firsts = np.repeat(np.arange(len(order)), counts)
+        offsets = np.cumsum(counts) - counts
+        seconds = np.arange(total) - np.repeat(offsets, counts) + np.repeat(begins, counts)
+        return order[firsts], order[seconds]
+
+    def __sortPairs(self, first, second):
+        order = np.lexsort((second, first))
+        return first[order], second[order]
+
+    def __runEnds(self, sortedIds):
+        # for every position, the end of the run of equal values that contains it
+        cuts = np.flatnonzero(np.diff(sortedIds)) + 1
+        ends = np.concatenate((cuts, [len(sortedIds)]))
+        return np.repeat(ends, np.diff(np.concatenate(([0], ends))))
+
+    def __concatenatePairs(self, firsts, seconds):
+        if len(firsts) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(firsts), np.concatenate(seconds)
+
+    def __groupBounds(self, sortedIds):
+        # [begin, end) slices of the runs of equal values of a sorted array
+        if len(sortedIds) == 0:
+            return []
+        cuts = np.flatnonzero(np.diff(sortedIds)) + 1
+        begins = np.concatenate(([0], cuts))
+        ends = np.concatenate((cuts, [len(sortedIds)]))
+        return zip(begins.tolist(), ends.tolist())
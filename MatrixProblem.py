@@ -0,0 +1,265 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import numpy as np
+from Solution import Solution
+
+if __name__ == '__main__':
+    exit(0)
+
+# lines of the MPS file formatted at once, big enough to amortize the formatting call
+linesPerChunk = 100000
+
+# the solvers the matrix backend can run
+matrixSolvers = ['glpk', 'highs']
+
+glpkStatuses = {
+    'o': 'optimal',
+    'f': 'feasible',
+}
+
+# Same MILP as Problem, written straight into sparse arrays: columns are
+# laid out as [t | x | chi | aux1 | aux2] and rows follow the constraint
+# order of Problem. The objective is stored as a minimization of -sum(x).
+class MatrixProblem:
+    def __init__(self, instance):
+        self.instance = instance
+        self.matrix = instance.getMatrix()
+        self.maxTime = instance.options['maxTime']
+        self.usePackets = instance.options['usePackets']
+
+        self.rowLower = []
+        self.rowUpper = []
+        self.rowEntries = []
+        self.rowCount = 0
+
+        self.__addColumns()
+        self.__addConstraints()
+        self.__buildCSR()
+
+        self.solution = None
+        self.objective = None
+        self.termination = None
+        self.isSolved = False
+
+    def solve(self, solverName='glpk', timeLimit=None):
+        # a run that ends without a schedule (time limit, infeasible, error) raises,
+        # termination tells an optimal schedule from a feasible one
+        if solverName == 'glpk':
+            self.solution, self.termination = self.__solveWithGLPK(timeLimit)
+        elif solverName == 'highs':
+            self.solution, self.termination = self.__solveWithHiGHS(timeLimit)
+        else:
+            raise Exception('solver \'' + solverName + '\' is not supported by the matrix backend')
+        self.objective = int(round(-self.cost @ self.solution))
+        self.isSolved = True
+
+    def writeMPSFile(self, fileName):
+        # free MPS, since generated names can be longer than 8 characters; the lines are
+        # formatted a chunk at a time by the % operator, without a Python loop per entry.
+        # The objective is the row after the constraints, so that every row is r<number>
+        objectiveRow = self.rowCount
+        rowTypes = self.__getRowTypes()
+
+        # the entries of every column must be contiguous, the objective first
+        costColumns = np.flatnonzero(self.cost)
+        entryColumns = np.concatenate((costColumns, self.indices))
+        entryRows = np.concatenate((np.full(len(costColumns), objectiveRow), np.repeat(np.arange(self.rowCount), np.diff(self.indptr))))
+        entryValues = np.concatenate((self.cost[costColumns], self.data))
+        order = np.argsort(entryColumns, kind='stable')
+
+        # the bounds of the rows are integers, apart from the infinite ones
+        rhs = np.where(rowTypes == 'L', self.rowUpper, self.rowLower)
+        rhsRows = np.flatnonzero(rhs != 0)
+
+        with open(fileName, 'w') as f:
+            f.write('NAME hospital\n')
+            f.write('ROWS\n')
+            f.write(' N r' + str(objectiveRow) + '\n')
+            self.__writeLines(f, ' %s r%d\n', rowTypes, np.arange(self.rowCount))
+            f.write('COLUMNS\n')
+            f.write(' m0 \'MARKER\' \'INTORG\'\n')
+            self.__writeLines(f, ' c%d r%d %d\n', entryColumns[order], entryRows[order], entryValues[order])
+            f.write(' m1 \'MARKER\' \'INTEND\'\n')
+            f.write('RHS\n')
+            self.__writeLines(f, ' rhs r%d %d\n', rhsRows, rhs[rhsRows].astype(np.int64))
+            f.write('BOUNDS\n')
+            self.__writeLines(f, ' UP bnd c%d %d\n', np.arange(self.columnCount), self.columnUpper)
+            f.write('ENDATA\n')
+
+    def getSchedule(self):
+        chi = np.round(self.solution[self.chiOffset:self.chiOffset + self.chiCount]).astype(bool)
+        t = np.round(self.solution[:self.requestCount]).astype(np.int64)
+        patients, exams, operators = self.matrix.patients, self.matrix.exams, self.matrix.operators
+        return {(patients[self.chiPatients[k]], exams[self.chiExams[k]]): (operators[self.chiOperators[k]], int(t[self.chiRequests[k]]))
+            for k in np.flatnonzero(chi).tolist()}
+
+    def getSolution(self):
+        return Solution(self.instance, self.getSchedule())
+
+    def printResults(self):
+        if not self.isSolved:
+            return
+        self.getSolution().printResults()
+
+    def __addColumns(self):
+        self.requestPatients = self.matrix.requestPatients
+        self.requestExams = self.matrix.requestExams
+        self.requestDurations = self.matrix.requestDurations
+        self.requestCount = len(self.requestPatients)
+
+        # the requests are sorted by patient and exam, so every chi finds its request by binary search
+        self.chiPatients, self.chiExams, self.chiOperators = self.matrix.getChiIds()
+        examNumber = len(self.matrix.exams)
+        self.chiRequests = np.searchsorted(self.requestPatients * examNumber + self.requestExams, self.chiPatients * examNumber + self.chiExams)
+        self.chiCount = len(self.chiPatients)
+
+        # aux1 is shared by all the operator pairs of the same two requests, aux2 by all the operators
+        self.patientFirst, self.patientSecond = self.matrix.getPatientConflictPairs()
+        aux1Keys, self.patientAux = self.__uniqueRequestPairs(self.patientFirst, self.patientSecond)
+        self.operatorFirst, self.operatorSecond = self.matrix.getOperatorConflictPairs()
+        aux2Keys, self.operatorAux = self.__uniqueRequestPairs(self.operatorFirst, self.operatorSecond)
+
+        self.xOffset = self.requestCount
+        self.chiOffset = 2 * self.requestCount
+        self.aux1Offset = self.chiOffset + self.chiCount
+        self.aux2Offset = self.aux1Offset + len(aux1Keys)
+        self.columnCount = self.aux2Offset + len(aux2Keys)
+
+        self.columnUpper = np.ones(self.columnCount, dtype=np.int64)
+        self.columnUpper[:self.requestCount] = self.maxTime
+        self.cost = np.zeros(self.columnCount, dtype=np.int64)
+        self.cost[self.xOffset:self.chiOffset] = -1
+
+    def __addConstraints(self):
+        M = self.maxTime
+        requests = np.arange(self.requestCount)
+        t = requests
+        x = self.xOffset + requests
+        chi = self.chiOffset + np.arange(self.chiCount)
+        chiT = self.chiRequests
+        inf = np.inf
+
+        # xAndT, tAndX
+        self.__addRows([t, x], [1, -1], 0, inf)
+        self.__addRows([t, x], [1, -M], -inf, 0)
+
+        # xAndChi, rows of variable length
+        order = np.argsort(self.chiRequests, kind='stable')
+        chiPerRequest = np.bincount(self.chiRequests, minlength=self.requestCount)
+        self.__addVariableRows(x, chi[order], chiPerRequest)
+
+        # respectStart, respectEnd
+        self.__addRows([chiT, chi], [1, -M], self.matrix.startTimes[self.chiOperators] - M, inf)
+        self.__addRows([chiT, chi], [1, M], -inf, self.matrix.endTimes[self.chiOperators] + M - self.requestDurations[self.chiRequests])
+
+        # patientNotOverlap1/2, operatorNotOverlap1/2
+        for first, second, aux in [(self.patientFirst, self.patientSecond, self.aux1Offset + self.patientAux),
+                (self.operatorFirst, self.operatorSecond, self.aux2Offset + self.operatorAux)]:
+            t1 = self.chiRequests[first]
+            t2 = self.chiRequests[second]
+            self.__addRows([t1, t2, chi[first], chi[second], aux], [1, -1, M, M, -M], -inf, 2 * M - self.requestDurations[t1])
+            self.__addRows([t2, t1, chi[first], chi[second], aux], [1, -1, M, M, M], -inf, 3 * M - self.requestDurations[t2])
+
+        # forcePacketExams
+        if self.usePackets:
+            packetIds = self.matrix.requestPacketIds
+            inPacket = np.flatnonzero(packetIds >= 0)
+            keys = self.requestPatients[inPacket] * (packetIds.max(initial=0) + 1) + packetIds[inPacket]
+            _, leaders, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            leaders = inPacket[leaders[inverse]]
+            followers = np.flatnonzero(leaders != inPacket)
+            self.__addRows([x[inPacket[followers]], x[leaders[followers]]], [1, -1], 0, 0)
+
+    def __addRows(self, columns, coefficients, lower, upper):
+        count = len(columns[0])
+        if count == 0:
+            return
+        self.rowEntries.append((
+            np.stack(columns, axis=1).ravel(),
+            np.tile(np.array(coefficients, dtype=np.int64), count),
+            np.full(count, len(columns), dtype=np.int64)
+        ))
+        self.rowLower.append(np.broadcast_to(np.asarray(lower, dtype=float), (count,)))
+        self.rowUpper.append(np.broadcast_to(np.asarray(upper, dtype=float), (count,)))
+        self.rowCount += count
+
+    def __addVariableRows(self, x, chi, chiPerRequest):
+        # sum(chi) - x == 0, one row per request
+        count = len(x)
+        starts = np.concatenate(([0], np.cumsum(chiPerRequest)))
+        indices = np.empty(count + len(chi), dtype=np.int64)
+        values = np.ones(count + len(chi), dtype=np.int64)
+        xPositions = starts[:-1] + np.arange(count)
+        indices[xPositions] = x
+        values[xPositions] = -1
+        chiPositions = np.setdiff1d(np.arange(count + len(chi)), xPositions, assume_unique=True)
+        indices[chiPositions] = chi
+        self.rowEntries.append((indices, values, chiPerRequest + 1))
+        self.rowLower.append(np.zeros(count))
+        self.rowUpper.append(np.zeros(count))
+        self.rowCount += count
+
+    def __buildCSR(self):
+        self.indices = np.concatenate([entries[0] for entries in self.rowEntries])
+        self.data = np.concatenate([entries[1] for entries in self.rowEntries])
+        self.indptr = np.concatenate(([0], np.cumsum(np.concatenate([entries[2] for entries in self.rowEntries]))))
+        self.rowLower = np.concatenate(self.rowLower)
+        self.rowUpper = np.concatenate(self.rowUpper)
+        del self.rowEntries
+
+    def __uniqueRequestPairs(self, first, second):
+        keys = self.chiRequests[first] * self.requestCount + self.chiRequests[second]
+        return np.unique(keys, return_inverse=True)
+
+    def __getRowTypes(self):
+        return np.where(self.rowLower == self.rowUpper, 'E', np.where(self.rowLower == -np.inf, 'L', 'G'))
+
+    def __writeLines(self, f, line, *columns):
+        # one line per element of the arrays, the values of a line interleaved for the % operator
+        count = len(columns[0])
+        for begin in range(0, count, linesPerChunk):
+            end = min(begin + linesPerChunk, count)
+            values = [None] * ((end - begin) * len(columns))
+            for k, column in enumerate(columns):
+                values[k::len(columns)] = column[begin:end].tolist()
+            f.write((line * (end - begin)) % tuple(values))
+
+    def __solveWithGLPK(self, timeLimit):
+        if shutil.which('glpsol') is None:
+            raise Exception('glpsol not found, install GLPK or use the highs solver')
+        with tempfile.TemporaryDirectory() as directory:
+            modelFile = os.path.join(directory, 'model.mps')
+            solutionFile = os.path.join(directory, 'solution.txt')
+            self.writeMPSFile(modelFile)
+            command = ['glpsol', '--freemps', modelFile, '--min', '-w', solutionFile]
+            if timeLimit is not None:
+                # glpsol only accepts whole seconds
+                command += ['--tmlim', str(max(1, int(timeLimit)))]
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            # the line 's mip ROWS COLUMNS STATUS OBJECTIVE' has o for optimal and f for feasible
+            status = None
+            solution = np.zeros(self.columnCount)
+            with open(solutionFile, 'r') as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) >= 5 and fields[0] == 's':
+                        status = fields[4]
+                    elif len(fields) == 3 and fields[0] == 'j':
+                        solution[int(fields[1]) - 1] = float(fields[2])
+        if status not in glpkStatuses:
+            raise Exception('GLPK did not find a solution (status \'' + str(status) + '\')')
+        return solution, glpkStatuses[status]
+
+    def __solveWithHiGHS(self, timeLimit):
+        from scipy.optimize import milp, LinearConstraint, Bounds
+        from scipy.sparse import csr_array
+        A = csr_array((self.data, self.indices, self.indptr), shape=(self.rowCount, self.columnCount))
+        options = {} if timeLimit is None else {'time_limit': timeLimit}
+        result = milp(self.cost, constraints=LinearConstraint(A, self.rowLower, self.rowUpper),
+            integrality=np.ones(self.columnCount), bounds=Bounds(0, self.columnUpper), options=options)
+        # status 0 is optimal, 1 a limit reached with or without a solution
+        if result.status not in [0, 1] or result.x is None:
+            raise Exception('HiGHS did not find a solution: ' + result.message)
+        return result.x, 'optimal' if result.status == 0 else 'feasible'
@@ -0,0 +1,168 @@
+from random import Random
+from time import perf_counter
+from Heuristic import Heuristic
+from Problem import Problem
+from Solution import Solution
+
+if __name__ == '__main__':
+    exit(0)
+
+neighbourhoodKinds = ['time', 'operators', 'patients']
+
+# Large neighbourhood search: starting from a feasible schedule, every round
+# frees a small set of packets and re-optimizes them with a sub-Problem in
+# which the requests they can interact with are kept fixed.
+class NeighbourhoodSearch:
+    def __init__(self, instance):
+        self.instance = instance
+        self.schedule = {}
+        self.objective = 0
+        self.history = []
+        self.isSolved = False
+
+        self.units = {}
+        for patient in instance.patients:
+            for exam in instance.requests[patient]:
+                if instance.options['usePackets']:
+                    leader = instance.index['packetLeaders'][patient, exam]
+                    self.units.setdefault((patient, leader), []).append((patient, exam))
+                else:
+                    self.units[patient, exam] = [(patient, exam)]
+        # units with a request that no operator can do are never worth freeing
+        self.units = {unit: requests for unit, requests in self.units.items()
+            if all(len(instance.index['eligibleOperators'][request]) > 0 for request in requests)}
+        self.unitOf = {request: unit for unit in self.units for request in self.units[unit]}
+
+    def solve(self, solverName='glpk', timeBudget=60, neighbourhoodSize=10, roundTimeLimit=10, seed=0, initialSchedule=None, verbose=True):
+        startTime = perf_counter()
+        self.random = Random(seed)
+        self.verbose = verbose
+
+        if initialSchedule is None:
+            heuristic = Heuristic(self.instance)
+            heuristic.solve()
+            initialSchedule = heuristic.schedule
+        self.schedule = dict(initialSchedule)
+        self.history = []
+        self.__log(perf_counter() - startTime, 'initial')
+
+        roundNumber = 0
+        while len(self.unitOf) > 0:
+            kind = neighbourhoodKinds[roundNumber % len(neighbourhoodKinds)]
+            roundNumber += 1
+            freed, operators = self.__selectNeighbourhood(kind, neighbourhoodSize)
+            # the last round gets only what is left of the budget
+            remaining = timeBudget - (perf_counter() - startTime)
+            if remaining <= 0:
+                break
+            if len(freed) == 0:
+                continue
+            candidate = self.__reoptimize(freed, operators, solverName, min(roundTimeLimit, remaining))
+            # accepting ties lets the search move, the objective never decreases
+            if len(candidate) >= len(self.schedule):
+                improved = len(candidate) > len(self.schedule)
+                self.schedule = candidate
+                if improved:
+                    self.__log(perf_counter() - startTime, kind)
+
+        self.objective = len(self.schedule)
+        self.isSolved = True
+
+    def getSolution(self):
+        return Solution(self.instance, self.schedule)
+
+    def printResults(self):
+        if not self.isSolved:
+            return
+        self.getSolution().printResults()
+
+    def __log(self, time, kind):
+        self.history.append((time, len(self.schedule)))
+        if self.verbose:
+            print('time ' + format(time, '.2f') + 's: ' + str(len(self.schedule)) + ' exams scheduled (' + kind + ')')
+
+    def __selectNeighbourhood(self, kind, size):
+        # frees about size scheduled requests plus as many unscheduled ones that
+        # could take their place; returns them with the operators they can use
+        requests = list(self.unitOf)
+        operators = list(self.instance.operators)
+        if kind == 'patients':
+            patients = list(self.instance.patients)
+            self.random.shuffle(patients)
+            rank = {patient: i for i, patient in enumerate(patients)}
+            requests.sort(key=lambda request: rank[request[0]])
+        elif kind == 'operators':
+            self.random.shuffle(operators)
+            rank = {operator: i for i, operator in enumerate(operators)}
+            requests.sort(key=lambda request: self.__getOperatorRank(request, rank))
+        else:
+            center = self.random.uniform(0, self.instance.options['maxTime'])
+            requests.sort(key=lambda request: abs(self.__getTime(request) - center))
+
+        freed = set()
+        for request in requests:
+            if request in self.schedule and len(freed) < size:
+                freed.update(self.units[self.unitOf[request]])
+
+        if kind == 'operators':
+            last = max([self.__getOperatorRank(request, rank) for request in freed], default=0)
+            operators = operators[:last + 1]
+        elif kind == 'time':
+            operators = [operator for operator in operators
+                if self.instance.operatorData[operator]['startTime'] <= center <= self.instance.operatorData[operator]['endTime']]
+        else:
+            operators = []
+        # freed requests can always stay where they are
+        operators = set(operators) | set(self.schedule[request][0] for request in freed)
+
+        added = 0
+        for request in requests:
+            if added >= size:
+                break
+            unit = self.units[self.unitOf[request]]
+            if request in self.schedule or request in freed:
+                continue
+            if kind != 'patients' and not all(set(self.instance.index['eligibleOperators'][other]) & operators for other in unit):
+                continue
+            freed.update(unit)
+            added += len(unit)
+        if kind == 'patients':
+            for request in freed:
+                operators.update(self.instance.index['eligibleOperators'][request])
+        return freed, operators
+
+    def __getOperatorRank(self, request, rank):
+        # a scheduled request belongs to its operator, an unscheduled one to all the eligible operators
+        if request in self.schedule:
+            return rank[self.schedule[request][0]]
+        return min([rank[operator] for operator in self.instance.index['eligibleOperators'][request]], default=len(rank))
+
+    def __getTime(self, request):
+        if request in self.schedule:
+            return self.schedule[request][1]
+        windows = [(self.instance.operatorData[operator]['startTime'] + self.instance.operatorData[operator]['endTime']) / 2
+            for operator in self.instance.index['eligibleOperators'][request]]
+        return min(windows, default=float('inf'))
+
+    def __reoptimize(self, freed, operators, solverName, timeLimit):
+        patients = set(patient for patient, _ in freed)
+
+        # fixed requests that share a patient or an operator with the freed ones
+        context = {request: assignment
+            for request, assignment in self.schedule.items()
+            if request not in freed and (request[0] in patients or assignment[0] in operators)}
+        contextOperators = set(operator for operator, _ in context.values())
+
+        subInstance = self.instance.getSubInstance(freed | set(context), [operator for operator in self.instance.operators if operator in operators | contextOperators])
+        problem = Problem(subInstance)
+        problem.setInitialSchedule({request: assignment for request, assignment in self.schedule.items() if request in freed or request in context})
+        problem.fixSchedule(context)
+        # the operators of the context are there only to hold the fixed requests
+        for patient, exam, operator in problem.model.chiIndexes:
+            if (patient, exam) in freed and operator not in operators:
+                problem.model.chi[patient, exam, operator].fix(0)
+        problem.solve(solverName, timeLimit=timeLimit)
+
+        candidate = {request: assignment for request, assignment in self.schedule.items() if request not in freed}
+        candidate.update(problem.getSchedule())
+        return candidate
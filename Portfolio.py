@@ -0,0 +1,149 @@
+import os
+import signal
+from queue import Empty
+from time import perf_counter, time
+from pyomo.environ import SolverFactory
+from Heuristic import Heuristic
+from Workers import formulations, getPoolContext
+from Solution import Solution
+
+if __name__ == '__main__':
+    exit(0)
+
+portfolioSolvers = ['glpk', 'cbc', 'appsi_highs']
+
+def getDefaultConfigurations():
+    configurations = ['heuristic']
+    for solverName in portfolioSolvers:
+        if SolverFactory(solverName).available(exception_flag=False):
+            configurations += [formulation + ':' + solverName for formulation in formulations]
+    return configurations
+
+def parseConfiguration(configuration):
+    if configuration == 'heuristic':
+        return 'heuristic', None
+    formulation, _, solverName = configuration.partition(':')
+    if formulation not in formulations or solverName == '':
+        raise Exception('configuration \'' + configuration + '\' is not \'heuristic\' or FORMULATION:SOLVER')
+    return formulation, solverName
+
+def isProvenOptimal(objective, bound):
+    # the objective is a count of exams, so a bound below the next integer closes the gap
+    return bound is not None and bound < objective + 1 - 1e-6
+
+def startProcessGroup():
+    # the solvers run as programs (glpsol, cbc) are children of the worker:
+    # in a process group of their own they can be stopped together with it
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+
+def terminateProcessGroup(process):
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            # the worker has not made its group yet, or it is already gone
+            pass
+    if process.is_alive():
+        process.terminate()
+
+def runConfiguration(instance, configuration, deadline, queue):
+    startProcessGroup()
+    startTime = perf_counter()
+    result = {'configuration': configuration, 'schedule': {}, 'objective': None, 'bound': None, 'optimal': False, 'error': None}
+    try:
+        formulation, solverName = parseConfiguration(configuration)
+        if formulation == 'heuristic':
+            heuristic = Heuristic(instance)
+            heuristic.solve()
+            result['schedule'] = heuristic.schedule
+            # every request that some operator can do is a trivial upper bound
+            result['bound'] = sum(1 for operators in instance.index['eligibleOperators'].values() if len(operators) > 0)
+        else:
+            problem = formulations[formulation](instance)
+            # the model build is part of the shared time limit
+            problem.solve(solverName, timeLimit=max(deadline - time(), 1))
+            result['schedule'] = problem.getSchedule()
+            bound = problem.statistics['bound']
+            result['bound'] = bound if isinstance(bound, (int, float)) else None
+        result['objective'] = len(result['schedule'])
+        result['optimal'] = isProvenOptimal(result['objective'], result['bound'])
+    except Exception as e:
+        result['error'] = str(e)
+    result['time'] = perf_counter() - startTime
+    queue.put(result)
+
+# Runs several solver and formulation configurations in separate processes on
+# the same instance. The first proven optimal schedule stops the race, otherwise
+# the best schedule reported within the time limit wins.
+class Portfolio:
+    def __init__(self, instance):
+        self.instance = instance
+        self.schedule = {}
+        self.objective = 0
+        self.winner = None
+        self.results = []
+        self.isSolved = False
+
+    def solve(self, configurations=None, timeLimit=60, grace=5):
+        if configurations is None:
+            configurations = getDefaultConfigurations()
+        for configuration in configurations:
+            parseConfiguration(configuration)
+
+        context = getPoolContext()
+        queue = context.Queue()
+        deadline = time() + timeLimit
+        processes = [context.Process(target=runConfiguration, args=(self.instance, configuration, deadline, queue), daemon=True)
+            for configuration in configurations]
+        for process in processes:
+            process.start()
+
+        # solvers overrun their time limit a little, and return only at the end
+        self.results = []
+        while len(self.results) < len(processes):
+            try:
+                result = queue.get(timeout=max(deadline + grace - time(), 0))
+            except Empty:
+                break
+            self.results.append(result)
+            if result['optimal']:
+                break
+
+        # the workers that lost are stopped with the solvers they started
+        for process in processes:
+            terminateProcessGroup(process)
+        for process in processes:
+            process.join()
+
+        self.winner = None
+        for result in self.results:
+            if result['error'] is not None:
+                continue
+            if self.winner is None or result['objective'] > self.winner['objective'] or result['optimal'] and not self.winner['optimal']:
+                self.winner = result
+        if self.winner is None:
+            raise Exception('no portfolio configuration returned a schedule')
+        self.schedule = self.winner['schedule']
+        self.objective = self.winner['objective']
+        self.isSolved = True
+
+    def getSolution(self):
+        return Solution(self.instance, self.schedule)
+
+    def printResults(self):
+        if not self.isSolved:
+            return
+        self.getSolution().printResults()
+
+    def printStatistics(self):
+        if not self.isSolved:
+            return
+        print('')
+        for result in self.results:
+            if result['error'] is not None:
+                print(result['configuration'] + ': error \'' + result['error'] + '\'')
+            else:
+                print(result['configuration'] + ': objective ' + str(result['objective']) + ', bound ' + str(result['bound']) +
+                    (' (optimal)' if result['optimal'] else '') + ' in ' + format(result['time'], '.2f') + 's')
+        print('winner: ' + self.winner['configuration'])
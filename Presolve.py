@@ -0,0 +1,83 @@
+from Solution import Solution
+
+if __name__ == '__main__':
+    exit(0)
+
+# Reduces the instance before the model is built: requests that no operator
+# can do, packets that contain one of them or that do not fit in the windows
+# of their operators, and then the operators, exams and patients left without
+# requests are dropped. The names do not change, so a schedule of the reduced
+# instance is also a schedule of the original one.
+class Presolve:
+    def __init__(self, instance):
+        self.original = instance
+        self.droppedRequests = []
+        self.droppedOperators = []
+        self.reductions = {}
+        self.instance = self.__reduce()
+        self.timeBounds = self.__getTimeBounds()
+
+    def mapSchedule(self, schedule):
+        # the dropped requests stay unscheduled
+        return dict(schedule)
+
+    def getSolution(self, schedule):
+        return Solution(self.original, self.mapSchedule(schedule))
+
+    def printReductions(self):
+        print('presolve: ' + ', '.join(str(count) + ' ' + name for name, count in self.reductions.items()))
+
+    def __reduce(self):
+        instance = self.original
+        eligibleOperators = instance.index['eligibleOperators']
+
+        infeasible = set(request for request, operators in eligibleOperators.items() if len(operators) == 0)
+        dropped = set(infeasible)
+        packets = 0
+        if instance.options['usePackets']:
+            for patient in instance.packets:
+                for packet in instance.packets[patient]:
+                    requests = [(patient, exam) for exam in packet]
+                    if not any(request in infeasible for request in requests) and self.__fits(requests):
+                        continue
+                    dropped.update(requests)
+                    packets += 1
+
+        requests = [(patient, exam) for patient in instance.patients for exam in instance.requests[patient] if (patient, exam) not in dropped]
+        usedOperators = set(operator for request in requests for operator in eligibleOperators[request])
+        operators = [operator for operator in instance.operators if operator in usedOperators]
+        reduced = instance.getSubInstance(requests, operators)
+
+        self.droppedRequests = [(patient, exam) for patient in instance.patients for exam in instance.requests[patient] if (patient, exam) in dropped]
+        self.droppedOperators = [operator for operator in instance.operators if operator not in usedOperators]
+        self.reductions = {
+            'requests nobody can do': len(infeasible),
+            'infeasible packets': packets,
+            'requests dropped with their packet': len(dropped) - len(infeasible),
+            'operators': len(self.droppedOperators),
+            'exams': len(instance.exams) - len(reduced.exams),
+            'patients': len(instance.patients) - len(reduced.patients),
+            'maxTime': instance.options['maxTime'] - reduced.options['maxTime']
+        }
+        return reduced
+
+    def __fits(self, requests):
+        # the exams of a patient cannot overlap, so together they must fit
+        # between the first start and the last end of their operators
+        operatorData = self.original.operatorData
+        operators = set(operator for request in requests for operator in self.original.index['eligibleOperators'][request])
+        startTime = min(operatorData[operator]['startTime'] for operator in operators)
+        endTime = max(operatorData[operator]['endTime'] for operator in operators)
+        return sum(self.original.requests[patient][exam] for patient, exam in requests) <= endTime - startTime
+
+    def __getTimeBounds(self):
+        # earliest and latest start of every request over its eligible operators
+        operatorData = self.instance.operatorData
+        timeBounds = {}
+        for (patient, exam), operators in self.instance.index['eligibleOperators'].items():
+            duration = self.instance.requests[patient][exam]
+            timeBounds[patient, exam] = (min(operatorData[operator]['startTime'] for operator in operators),
+                max(operatorData[operator]['endTime'] - duration for operator in operators))
+        self.reductions['tightened time bounds'] = sum(1 for (patient, exam), (earliest, latest) in timeBounds.items()
+            if earliest > 1 or latest < self.instance.options['maxTime'])
+        return timeBounds
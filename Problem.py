@@ -1,60 +1,344 @@
 from pyomo.environ import ConcreteModel, Set, Param, Var, Constraint, Objective
 from pyomo.environ import NonNegativeIntegers, PositiveIntegers, Binary
 from pyomo.environ import SolverFactory, maximize, value
+from pyomo.core.expr import SumExpression
+from pyomo.opt import SolutionStatus, TerminationCondition
+from contextlib import nullcontext, redirect_stdout
+from math import isfinite
+from time import perf_counter
+from warnings import warn
+from SolverLog import SolverLog
+from Solution import Solution
 
 if __name__ == '__main__':
     exit(0)
 
+timeLimitOptions = {
+    'glpk': 'tmlim',
+    'cbc': 'seconds',
+    'highs': 'time_limit',
+    'appsi_highs': 'time_limit',
+    'gurobi': 'TimeLimit',
+    'cplex': 'timelimit',
+}
+
+mipGapOptions = {
+    'glpk': 'mipgap',
+    'cbc': 'ratioGap',
+    'highs': 'mip_rel_gap',
+    'appsi_highs': 'mip_rel_gap',
+    'gurobi': 'MIPGap',
+    'cplex': 'mip_tolerances_mipgap',
+}
+
+# glpk is single threaded
+threadOptions = {
+    'cbc': 'threads',
+    'highs': 'threads',
+    'appsi_highs': 'threads',
+    'gurobi': 'Threads',
+    'cplex': 'threads',
+}
+
+def setSolverOption(opt, solverName, options, name, optionValue):
+    if optionValue is None:
+        return
+    if solverName not in options:
+        raise Exception(name + ' not supported for solver \'' + solverName + '\'')
+    opt.options[options[solverName]] = optionValue
+
+def subscribeInterrupt(opt, model, log):
+    # HiGHS can be stopped as soon as the callback asks for it. Pyomo has no public
+    # hook for this: the model is passed in advance and the highspy object is reached
+    # through a private attribute, so a version without it only loses the early stop
+    opt.set_instance(model)
+    interruptCallbacks = getattr(getattr(opt, '_solver_model', None), 'cbMipInterrupt', None)
+    if interruptCallbacks is None or not hasattr(interruptCallbacks, 'subscribe'):
+        warn('this version of pyomo or highspy cannot stop HiGHS from the callback, the solve runs to its own limits')
+        return False
+    def interrupt(event):
+        if log.stopRequested:
+            log.isInterrupted = True
+            event.interrupt()
+    interruptCallbacks.subscribe(interrupt)
+    return True
+
+def runSolver(model, solverName, timeLimit=None, initialSchedule=None, reportTiming=False, mipGap=None, threads=None, callback=None):
+    opt = SolverFactory(solverName)
+    # glpk only accepts whole seconds
+    setSolverOption(opt, solverName, timeLimitOptions, 'time limit', timeLimit if timeLimit is None or solverName != 'glpk' else max(1, int(timeLimit)))
+    setSolverOption(opt, solverName, mipGapOptions, 'MIP gap', mipGap)
+    setSolverOption(opt, solverName, threadOptions, 'threads', threads)
+    warmStart = initialSchedule is not None and opt.warm_start_capable()
+    log = SolverLog(callback)
+    if callback is not None and solverName == 'appsi_highs':
+        subscribeInterrupt(opt, model, log)
+    if warmStart:
+        # the solver starts from this incumbent, even if it does not print it
+        log.addIncumbent(len(initialSchedule))
+    # with report_timing pyomo prints how long writing, solving and reading took
+    keywords = {'report_timing': True} if reportTiming else {}
+    # the solution is loaded only if there is one: a solve that fails or stops
+    # before the first incumbent must not leave stale values in the model
+    with redirect_stdout(log):
+        if warmStart:
+            results = opt.solve(model, tee=True, warmstart=True, load_solutions=False, **keywords)
+        else:
+            results = opt.solve(model, tee=True, load_solutions=False, **keywords)
+    hasSolution = len(results.solution) > 0 and results.solution(0).status not in [SolutionStatus.infeasible, SolutionStatus.unbounded, SolutionStatus.error]
+    if hasSolution:
+        model.solutions.load_from(results)
+    if log.isInterrupted:
+        results.solver.termination_condition = TerminationCondition.userInterrupt
+        # pyomo does not return the incumbent of an interrupted HiGHS, but it can still load it
+        if not hasSolution:
+            try:
+                opt.load_vars()
+                hasSolution = True
+            except RuntimeError:
+                pass
+    return results, log, warmStart, hasSolution
+
+def getSolverInfo(results, log):
+    # the times are reported only by some solvers, the phases only by the ones run as programs
+    info = {
+        'status': str(results.solver.status),
+        'terminationCondition': str(results.solver.termination_condition),
+        'phases': dict(log.timings)
+    }
+    for key, name in [('time', 'time'), ('wallclock_time', 'wallclockTime'), ('user_time', 'userTime'), ('system_time', 'systemTime')]:
+        time = getattr(results.solver, key, None)
+        info[name] = time if isinstance(time, (int, float)) else None
+    return info
+
+def getStatistics(solverName, results, log, warmStart, initialSchedule, objective):
+    bound = results.problem[0].upper_bound
+    gap = None
+    if objective is not None and isinstance(bound, (int, float)) and isfinite(bound):
+        gap = abs(bound - objective) / max(abs(objective), 1)
+    return {
+        'solver': solverName,
+        'termination': str(results.solver.termination_condition),
+        'warmStart': warmStart,
+        'initialObjective': None if initialSchedule is None else len(initialSchedule),
+        'objective': objective,
+        'bound': bound,
+        'gap': gap,
+        'solveTime': perf_counter() - log.startTime,
+        'timeToFirstIncumbent': log.getFirstIncumbentTime(),
+        'incumbents': log.incumbents
+    }
+
 class Problem:
-    def __init__(self, instance):
+    def __init__(self, instance, profiler=None, timeBounds=None, symmetryBreaking=False):
+        # timeBounds maps every request to its earliest and latest start, as found by Presolve
+        self.instance = instance
+        self.profiler = profiler
+        self.timeBounds = timeBounds
+        self.symmetryBreaking = symmetryBreaking
+        self.operatorClasses = []
+        self.patientClasses = []
+        self.operatorRequests = {}
         self.model = ConcreteModel()
-        self.__addIndexes(instance)
-        self.__addParameters(instance)
-        self.__addVariables()
-        self.__addConstraints(instance)
-        self.__addObjective()
+        if symmetryBreaking:
+            with self.__stage('symmetries'):
+                self.__findSymmetries(instance)
+        with self.__stage('indexes'):
+            self.__addIndexes(instance)
+        with self.__stage('parameters'):
+            self.__addParameters(instance)
+        with self.__stage('variables'):
+            self.__addVariables()
+        with self.__stage('constraints'):
+            self.__addConstraints(instance)
+        if profiler is not None:
+            self.__countRows()
+        with self.__stage('objective'):
+            self.__addObjective()
+        self.initialSchedule = None
+        self.statistics = {}
         self.isSolved = False
+        self.isChanged = False
+        self.isScheduleInModel = False
+        self.changeIndex = None
     
-    def solve(self):
-        opt = SolverFactory('glpk')
-        opt.solve(self.model)
-        self.isSolved = True
+    def setInitialSchedule(self, schedule):
+        # schedule maps (patient, exam) to (operator, startTime)
+        self.initialSchedule = dict(schedule)
+        if self.symmetryBreaking:
+            self.initialSchedule = self.__sortSymmetricSchedules(self.initialSchedule)
+        self.__loadSchedule(self.initialSchedule)
+
+    def fixSchedule(self, schedule):
+        # the requests in schedule keep their operator and start time
+        self.__loadSchedule(schedule, onlyScheduled=True)
+        for patient, exam in schedule:
+            self.model.x[patient, exam].fix()
+            self.model.t[patient, exam].fix()
+        for patient, exam, operator in self.model.chiIndexes:
+            if (patient, exam) in schedule:
+                self.model.chi[patient, exam, operator].fix()
+
+    # The following methods change the model in place, touching only the
+    # variables and constraints of the affected requests, and a copy of the
+    # instance made at the first change (self.instance), so the instance given
+    # to the constructor is never changed. The copy shares the entries of the
+    # instance and copies only the ones that change. The first change also
+    # builds the reverse index of the model, one pass over its members (a few
+    # percent of the build time), which problems that never change do not pay.
+    # The next solve starts from the previous schedule, without the assignments
+    # that the change made invalid.
+    def addRequest(self, patient, exam, duration):
+        self.__startChange()
+        if patient not in self.model.patients:
+            self.model.patients.add(patient)
+        if exam not in self.model.exams:
+            self.model.exams.add(exam)
+        changed = self.instance.addRequest(patient, exam, duration)
+        self.__addRequest(patient, exam)
+        self.__syncRequests(changed)
+        self.__syncPackets(patient)
+        self.__syncMaxTime()
+
+    def removeRequest(self, patient, exam):
+        self.__startChange()
+        changed = self.instance.removeRequest(patient, exam)
+        self.__syncRequests(changed)
+        self.__removeRequest(patient, exam)
+        self.__syncPackets(patient)
+
+    def setOperatorWindow(self, operator, startTime, endTime):
+        self.__startChange()
+        changed = self.instance.setOperatorWindow(operator, startTime, endTime)
+        self.model.startTimes[operator] = startTime
+        self.model.endTimes[operator] = endTime
+        self.__syncMaxTime()
+        self.__syncRequests(changed)
+        # the other assignments of the operator can now overlap with different windows
+        for patient, exam in list(self.changeIndex['operatorRequests'][operator]):
+            self.__syncPatientConflicts((patient, exam, operator))
+
+    def addCanDo(self, operator, exam):
+        self.__startChange()
+        self.__syncRequests(self.instance.addCanDo(operator, exam))
+
+    def removeCanDo(self, operator, exam):
+        self.__startChange()
+        self.__syncRequests(self.instance.removeCanDo(operator, exam))
+
+    def solve(self, solverName='glpk', timeLimit=None, mipGap=None, threads=None, callback=None):
+        # callback(time, incumbent, bound) is called at every improving incumbent
+        # found in the solver log, returning True asks the solver to stop
+        if self.isChanged:
+            # the previous schedule is read only now, so that the changes do not depend on the model size
+            if self.isScheduleInModel:
+                self.initialSchedule = self.getSchedule()
+                self.isScheduleInModel = False
+            self.__keepValidSchedule()
+            self.isChanged = False
+        with self.__stage('solver'):
+            results, log, warmStart, hasSolution = runSolver(self.model, solverName, timeLimit, self.initialSchedule, self.profiler is not None, mipGap, threads, callback)
+        if self.profiler is not None:
+            self.profiler.setInfo('solver', getSolverInfo(results, log))
+
+        objective = value(self.model.objective) if hasSolution else None
+        # solvers may give no solution for a model without variables, e.g. after a presolve that dropped everything
+        if objective is None and len(self.model.requestIndexes) == 0:
+            objective = 0
+        # solvers that cannot take a warm start must still not lose the initial schedule
+        if self.initialSchedule is not None and (objective is None or objective < len(self.initialSchedule)):
+            self.__loadSchedule(self.initialSchedule)
+            objective = len(self.initialSchedule)
+
+        self.statistics = getStatistics(solverName, results, log, warmStart, self.initialSchedule, objective)
+        # a solve that fails or stops before the first incumbent leaves no schedule
+        self.isSolved = objective is not None
+
+    def getSchedule(self):
+        schedule = {}
+        for (patient, exam, operator), chi in self.model.chi.items():
+            if chi.value is not None and chi.value > 0.5:
+                schedule[patient, exam] = (operator, int(round(self.model.t[patient, exam].value)))
+        return schedule
     
+    def getSolution(self):
+        return Solution(self.instance, self.getSchedule())
+
     def printResults(self):
         # self.model.display() # for complete info
         # self.model.pprint() # for succint info
+        if not self.isSolved:
+            return
+        self.getSolution().printResults()
+
+    def printStatistics(self):
         if not self.isSolved:
             return
         print('')
-        self.__printRequestsDone()
-        print('')
-        self.__printExamsNotDone()
-        print('')
-        self.__printOperatorUnused()
+        for key in ['solver', 'termination', 'warmStart', 'initialObjective', 'objective', 'bound', 'gap', 'solveTime', 'timeToFirstIncumbent']:
+            print(key + ': ' + str(self.statistics[key]))
+
+    def __stage(self, name):
+        # without a profiler the stages cost nothing
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name)
+
+    def __countRows(self):
+        # rows generated by every constraint, grouped by the index set they are built on
+        for constraint in self.model.component_objects(Constraint):
+            self.profiler.count(constraint.index_set().name, constraint.name, len(constraint))
 
     def __addIndexes(self, instance):
-        self.__addPatientIndexes(instance)
-        self.__addExamIndexes(instance)
-        self.__addOperatorIndexes(instance)
-        self.__addRequestIndexes(instance)
-        self.__addChiIndexes(instance)
-        self.__addAux1Indexes(instance)
-        self.__addAux2Indexes(instance)
+        with self.__stage('patientIndexes'):
+            self.__addPatientIndexes(instance)
+        with self.__stage('examIndexes'):
+            self.__addExamIndexes(instance)
+        with self.__stage('operatorIndexes'):
+            self.__addOperatorIndexes(instance)
+        with self.__stage('requestIndexes'):
+            self.__addRequestIndexes(instance)
+        with self.__stage('chiIndexes'):
+            self.__addChiIndexes(instance)
+        with self.__stage('patientConflictIndexes'):
+            self.__addPatientConflictIndexes(instance)
+        with self.__stage('operatorConflictIndexes'):
+            self.__addOperatorConflictIndexes(instance)
+        with self.__stage('aux1Indexes'):
+            self.__addAux1Indexes()
+        with self.__stage('aux2Indexes'):
+            self.__addAux2Indexes()
+        if self.symmetryBreaking:
+            with self.__stage('symmetryIndexes'):
+                self.__addSymmetryIndexes()
 
     def __addParameters(self, instance):
-        self.__addMaxTimeParameter(instance)
-        self.__addRequestParameters(instance)
-        self.__addStartTimeParametrs(instance)
-        self.__addEndTimeParameters(instance)
+        with self.__stage('maxTimeParameter'):
+            self.__addMaxTimeParameter(instance)
+        with self.__stage('requestParameters'):
+            self.__addRequestParameters(instance)
+        with self.__stage('startTimeParameters'):
+            self.__addStartTimeParametrs(instance)
+        with self.__stage('endTimeParameters'):
+            self.__addEndTimeParameters(instance)
     
     def __addConstraints(self, instance):
-        self.__addXAndTConstraints()
-        self.__addXAndChiConstraints(instance)
-        self.__addRespectTimeConstraints()
-        self.__addNotOverlappingPatientConstraints(instance)
-        self.__addNotOverlappingOperatorConstraints(instance)
+        with self.__stage('xAndTConstraints'):
+            self.__addXAndTConstraints()
+        with self.__stage('xAndChiConstraints'):
+            self.__addXAndChiConstraints()
+        with self.__stage('respectTimeConstraints'):
+            self.__addRespectTimeConstraints()
+        with self.__stage('notOverlappingPatientConstraints'):
+            self.__addNotOverlappingPatientConstraints()
+        with self.__stage('notOverlappingOperatorConstraints'):
+            self.__addNotOverlappingOperatorConstraints()
         if instance.options['usePackets']:
-            self.__addPacketConsistencyConstraints(instance)
+            with self.__stage('packetConsistencyConstraints'):
+                self.__addPacketConsistencyConstraints()
+        if self.symmetryBreaking:
+            with self.__stage('symmetryBreakingConstraints'):
+                self.__addSymmetryBreakingConstraints()
     
     def __addObjective(self):
         def f(model):
@@ -80,178 +364,460 @@ class Problem:
 
     def __addChiIndexes(self, instance):
         def f(model):
-            return ((patient, exam, operator)
-                for patient in instance.patients
-                for exam in instance.exams
-                for operator in instance.operators
-                if (
-                    exam in instance.requests[patient] and
-                    exam in instance.operatorData[operator]['canDo'] and
-                    (instance.operatorData[operator]['endTime'] - instance.operatorData[operator]['startTime'] >= instance.requests[patient][exam])
-                ))
+            return instance.getMatrix().getChiIndexes()
         self.model.chiIndexes = Set(initialize=f, doc="indexes of the chi matrix")
 
-    def __addAux1Indexes(self, instance):
+    def __addPatientConflictIndexes(self, instance):
+        def f(model):
+            return instance.getMatrix().getPatientConflictIndexes()
+        self.model.patientConflictIndexes = Set(initialize=f, doc="pairs of assignments of the same patient that can overlap")
+
+    def __addOperatorConflictIndexes(self, instance):
+        def f(model):
+            return instance.getMatrix().getOperatorConflictIndexes()
+        self.model.operatorConflictIndexes = Set(initialize=f, doc="pairs of assignments of different patients on the same operator")
+
+    def __addAux1Indexes(self):
         def f(model):
-            return (
-                (instance.exams[exam1Index], instance.operators[operator1Index], instance.exams[exam2Index], instance.operators[operator2Index])
-                for exam1Index in range(len(instance.exams))
-                for operator1Index in range(len(instance.operators))
-                for exam2Index in range(len(instance.exams))
-                for operator2Index in range(len(instance.operators))
-                if exam1Index < exam2Index and
-                (instance.exams[exam1Index] in instance.operatorData[instance.operators[operator1Index]]['canDo']) and
-                (instance.exams[exam2Index] in instance.operatorData[instance.operators[operator2Index]]['canDo'])
+            return dict.fromkeys(
+                (patient, exam1, exam2)
+                for patient, exam1, operator1, exam2, operator2 in model.patientConflictIndexes
             )
         self.model.aux1Index = Set(initialize=f, doc="indexes of the aux1 variables")
 
-    def __addAux2Indexes(self, instance):
+    def __addAux2Indexes(self):
         def f(model):
-            return (
-                (instance.patients[patient1Index], instance.exams[exam1Index], instance.patients[patient2Index], instance.exams[exam2Index])
-                for patient1Index in range(len(instance.patients))
-                for exam1Index in range(len(instance.exams))
-                for patient2Index in range(len(instance.patients))
-                for exam2Index in range(len(instance.exams))
-                if patient1Index < patient2Index and
-                (instance.exams[exam1Index] in instance.requests[instance.patients[patient1Index]]) and
-                (instance.exams[exam2Index] in instance.requests[instance.patients[patient2Index]])
+            return dict.fromkeys(
+                (patient1, exam1, patient2, exam2)
+                for patient1, exam1, patient2, exam2, operator in model.operatorConflictIndexes
             )
         self.model.aux2Index = Set(initialize=f, doc="indexes of the aux2 variables")
 
+    def __addSymmetryIndexes(self):
+        def f(model):
+            return [(operators[k], operators[k + 1]) for operators in self.operatorClasses for k in range(len(operators) - 1)]
+        self.model.operatorSymmetryIndexes = Set(initialize=f, doc="pairs of consecutive identical operators")
+        def g(model):
+            return [(patients[k], patients[k + 1]) for patients in self.patientClasses for k in range(len(patients) - 1)]
+        self.model.patientSymmetryIndexes = Set(initialize=g, doc="pairs of consecutive identical patients")
+
     def __addMaxTimeParameter(self, instance):
-        self.model.maxTime = instance.options['maxTime']
+        # mutable, so that a change that needs a larger big-M does not rebuild every constraint
+        self.model.maxTime = Param(initialize=instance.options['maxTime'], within=NonNegativeIntegers, mutable=True, doc="maximum time, the big-M of the model")
     
     def __addRequestParameters(self, instance):
         def f(model, patient, exam):
             return instance.requests[patient][exam]
-        self.model.requests = Param(self.model.requestIndexes, initialize=f, doc='exam requests of patients', within=PositiveIntegers)
+        self.model.requests = Param(self.model.requestIndexes, initialize=f, doc='exam requests of patients', within=PositiveIntegers, mutable=True)
 
     def __addStartTimeParametrs(self, instance):
         def f(model, operator):
             return instance.operatorData[operator]['startTime']
-        self.model.startTimes = Param(self.model.operators, initialize=f, doc="start time of every operator", within=PositiveIntegers)
+        self.model.startTimes = Param(self.model.operators, initialize=f, doc="start time of every operator", within=PositiveIntegers, mutable=True)
 
     def __addEndTimeParameters(self, instance):
         def f(model, operator):
             return instance.operatorData[operator]['endTime']
-        self.model.endTimes = Param(self.model.operators, initialize=f, doc="end time of every operator", within=PositiveIntegers)
+        self.model.endTimes = Param(self.model.operators, initialize=f, doc="end time of every operator", within=PositiveIntegers, mutable=True)
 
     def __addVariables(self):
-        self.model.t = Var(self.model.requestIndexes, within=NonNegativeIntegers, bounds=(0, self.model.maxTime))
+        if self.timeBounds is None:
+            self.model.t = Var(self.model.requestIndexes, within=NonNegativeIntegers, bounds=(0, self.model.maxTime))
+        else:
+            # t is 0 when the request is not scheduled
+            def f(model, patient, exam):
+                return (0, self.timeBounds[patient, exam][1])
+            self.model.t = Var(self.model.requestIndexes, within=NonNegativeIntegers, bounds=f)
         self.model.x = Var(self.model.requestIndexes, within=Binary)
         self.model.chi = Var(self.model.chiIndexes, within=Binary)
         self.model.aux1 = Var(self.model.aux1Index, within=Binary)
         self.model.aux2 = Var(self.model.aux2Index, within=Binary)
 
     def __addXAndTConstraints(self):
-        def f1(model, patient, exam):
-            return model.t[patient, exam] >= model.x[patient, exam]
-        self.model.xAndT = Constraint(self.model.requestIndexes, rule=f1)
+        self.model.xAndT = Constraint(self.model.requestIndexes, rule=self.__xAndTRule)
+        self.model.tAndX = Constraint(self.model.requestIndexes, rule=self.__tAndXRule)
 
-        def f2(model, patient, exam):
-            return model.t[patient, exam] <= model.x[patient, exam] * model.maxTime
-        self.model.tAndX = Constraint(self.model.requestIndexes, rule=f2)
-    
-    def __addXAndChiConstraints(self, instance):
-        def f(model, patient, exam):
-            return sum(model.chi[patient, exam, operator]
-                for operator in model.operators
-                if exam in instance.operatorData[operator]['canDo'] and
-                (instance.operatorData[operator]['endTime'] - instance.operatorData[operator]['startTime'] >= instance.requests[patient][exam])
-            ) == model.x[patient, exam]
-        self.model.xAndChi = Constraint(self.model.requestIndexes, rule=f)
+    def __addXAndChiConstraints(self):
+        self.model.xAndChi = Constraint(self.model.requestIndexes, rule=self.__xAndChiRule)
 
     def __addRespectTimeConstraints(self):
-        def f1(model, patient, exam, operator):
-            return model.maxTime - model.chi[patient, exam, operator] * model.maxTime + model.t[patient, exam] >= model.startTimes[operator]
-        self.model.respectStart = Constraint(self.model.chiIndexes, rule=f1)
-        def f2(model, patient, exam, operator):
-            return model.t[patient, exam] + model.requests[patient, exam] <= model.endTimes[operator] + model.maxTime - model.chi[patient, exam, operator] * model.maxTime
-        self.model.respectEnd = Constraint(self.model.chiIndexes, rule=f2)
-
-    def __addNotOverlappingPatientConstraints(self, instance):
-        def f1(model, exam1, operator1, exam2, operator2, patient):
-            if exam1 not in instance.requests[patient] or exam2 not in instance.requests[patient]:
-                return Constraint.Skip
-            if instance.operatorData[operator1]['endTime'] - instance.operatorData[operator1]['startTime'] < instance.requests[patient][exam1]:
-                return Constraint.Skip
-            if instance.operatorData[operator2]['endTime'] - instance.operatorData[operator2]['startTime'] < instance.requests[patient][exam2]:
-                return Constraint.Skip
-            return model.t[patient, exam1] + model.requests[patient, exam1] <= model.t[patient, exam2] + 2 * model.maxTime - model.chi[patient, exam1, operator1] * model.maxTime - model.chi[patient, exam2, operator2] * model.maxTime + model.aux1[exam1, operator1, exam2, operator2] * model.maxTime
-        self.model.patientNotOverlap1 = Constraint(self.model.aux1Index, self.model.patients, rule=f1)
-
-        def f2(model, exam1, operator1, exam2, operator2, patient):
-            if exam1 not in instance.requests[patient] or exam2 not in instance.requests[patient]:
-                return Constraint.Skip
-            if instance.operatorData[operator1]['endTime'] - instance.operatorData[operator1]['startTime'] < instance.requests[patient][exam1]:
-                return Constraint.Skip
-            if instance.operatorData[operator2]['endTime'] - instance.operatorData[operator2]['startTime'] < instance.requests[patient][exam2]:
-                return Constraint.Skip
-            return model.t[patient, exam2] + model.requests[patient, exam2] <= model.t[patient, exam1] + 3 * model.maxTime - model.chi[patient, exam1, operator1] * model.maxTime - model.chi[patient, exam2, operator2] * model.maxTime - model.aux1[exam1, operator1, exam2, operator2] * model.maxTime
-        self.model.patientNotOverlap2 = Constraint(self.model.aux1Index, self.model.patients, rule=f2)
-
-    def __addNotOverlappingOperatorConstraints(self, instance):
-        def f1(model, patient1, exam1, patient2, exam2, operator):
-            if exam1 not in instance.operatorData[operator]['canDo'] or exam2 not in instance.operatorData[operator]['canDo']:
-                return Constraint.Skip
-            if instance.operatorData[operator]['endTime'] - instance.operatorData[operator]['startTime'] < instance.requests[patient1][exam1]:
-                return Constraint.Skip
-            if instance.operatorData[operator]['endTime'] - instance.operatorData[operator]['startTime'] < instance.requests[patient2][exam2]:
-                return Constraint.Skip
-            return model.t[patient1, exam1] + model.requests[patient1, exam1] <= model.t[patient2, exam2] + 2 * model.maxTime - model.chi[patient1, exam1, operator] * model.maxTime - model.chi[patient2, exam2, operator] * model.maxTime + model.aux2[patient1, exam1, patient2, exam2] * model.maxTime
-        self.model.operatorNotOverlap1 = Constraint(self.model.aux2Index, self.model.operators, rule=f1)
-
-        def f2(model, patient1, exam1, patient2, exam2, operator):
-            if exam1 not in instance.operatorData[operator]['canDo'] or exam2 not in instance.operatorData[operator]['canDo']:
-                return Constraint.Skip
-            if instance.operatorData[operator]['endTime'] - instance.operatorData[operator]['startTime'] < instance.requests[patient1][exam1]:
-                return Constraint.Skip
-            if instance.operatorData[operator]['endTime'] - instance.operatorData[operator]['startTime'] < instance.requests[patient2][exam2]:
-                return Constraint.Skip
-            return model.t[patient2, exam2] + model.requests[patient2, exam2] <= model.t[patient1, exam1] + 3 * model.maxTime - model.chi[patient1, exam1, operator] * model.maxTime - model.chi[patient2, exam2, operator] * model.maxTime - model.aux2[patient1, exam1, patient2, exam2] * model.maxTime
-        self.model.operatorNotOverlap2 = Constraint(self.model.aux2Index, self.model.operators, rule=f2)
-
-    def __addPacketConsistencyConstraints(self, instance):
-        def f(model, patient, exam):
-            packet = None
-            for p in instance.packets[patient]:
-                if exam in p:
-                    packet = p
-                    break
-            firstExam = packet[0]
-            if exam == firstExam:
-                return Constraint.Skip
-            return model.x[patient, exam] == model.x[patient, firstExam]
-        self.model.forcePacketExams = Constraint(self.model.requestIndexes, rule=f)
-
-    def __printRequestsDone(self):
+        self.model.respectStart = Constraint(self.model.chiIndexes, rule=self.__respectStartRule)
+        self.model.respectEnd = Constraint(self.model.chiIndexes, rule=self.__respectEndRule)
+
+    def __addNotOverlappingPatientConstraints(self):
+        self.model.patientNotOverlap1 = Constraint(self.model.patientConflictIndexes, rule=self.__patientNotOverlap1Rule)
+        self.model.patientNotOverlap2 = Constraint(self.model.patientConflictIndexes, rule=self.__patientNotOverlap2Rule)
+
+    def __addNotOverlappingOperatorConstraints(self):
+        self.model.operatorNotOverlap1 = Constraint(self.model.operatorConflictIndexes, rule=self.__operatorNotOverlap1Rule)
+        self.model.operatorNotOverlap2 = Constraint(self.model.operatorConflictIndexes, rule=self.__operatorNotOverlap2Rule)
+
+    def __addSymmetryBreakingConstraints(self):
+        self.model.operatorSymmetry = Constraint(self.model.operatorSymmetryIndexes, rule=self.__operatorSymmetryRule)
+        self.model.patientSymmetry = Constraint(self.model.patientSymmetryIndexes, rule=self.__patientSymmetryRule)
+
+    def __addPacketConsistencyConstraints(self):
+        self.model.forcePacketExams = Constraint(self.model.requestIndexes, rule=self.__forcePacketExamsRule)
+
+    def __xAndTRule(self, model, patient, exam):
+        if self.timeBounds is not None:
+            return model.t[patient, exam] >= model.x[patient, exam] * self.timeBounds[patient, exam][0]
+        return model.t[patient, exam] >= model.x[patient, exam]
+
+    def __tAndXRule(self, model, patient, exam):
+        if self.timeBounds is not None:
+            return model.t[patient, exam] <= model.x[patient, exam] * self.timeBounds[patient, exam][1]
+        return model.t[patient, exam] <= model.x[patient, exam] * model.maxTime
+
+    def __xAndChiRule(self, model, patient, exam):
+        return sum(model.chi[patient, exam, operator]
+            for operator in self.instance.index['eligibleOperators'][patient, exam]
+        ) == model.x[patient, exam]
+
+    # maxTime is a mutable parameter: it multiplies a single sum, so that every
+    # constraint has one parameter node instead of one for each variable
+    def __respectStartRule(self, model, patient, exam, operator):
+        return model.t[patient, exam] + model.maxTime * (1 - model.chi[patient, exam, operator]) >= model.startTimes[operator]
+
+    def __respectEndRule(self, model, patient, exam, operator):
+        return model.t[patient, exam] + model.requests[patient, exam] <= model.endTimes[operator] + model.maxTime * (1 - model.chi[patient, exam, operator])
+
+    def __patientNotOverlap1Rule(self, model, patient, exam1, operator1, exam2, operator2):
+        return model.t[patient, exam1] + model.requests[patient, exam1] - model.t[patient, exam2] <= model.maxTime * (2 - model.chi[patient, exam1, operator1] - model.chi[patient, exam2, operator2] + model.aux1[patient, exam1, exam2])
+
+    def __patientNotOverlap2Rule(self, model, patient, exam1, operator1, exam2, operator2):
+        return model.t[patient, exam2] + model.requests[patient, exam2] - model.t[patient, exam1] <= model.maxTime * (3 - model.chi[patient, exam1, operator1] - model.chi[patient, exam2, operator2] - model.aux1[patient, exam1, exam2])
+
+    def __operatorNotOverlap1Rule(self, model, patient1, exam1, patient2, exam2, operator):
+        return model.t[patient1, exam1] + model.requests[patient1, exam1] - model.t[patient2, exam2] <= model.maxTime * (2 - model.chi[patient1, exam1, operator] - model.chi[patient2, exam2, operator] + model.aux2[patient1, exam1, patient2, exam2])
+
+    def __operatorNotOverlap2Rule(self, model, patient1, exam1, patient2, exam2, operator):
+        return model.t[patient2, exam2] + model.requests[patient2, exam2] - model.t[patient1, exam1] <= model.maxTime * (3 - model.chi[patient1, exam1, operator] - model.chi[patient2, exam2, operator] - model.aux2[patient1, exam1, patient2, exam2])
+
+    def __forcePacketExamsRule(self, model, patient, exam):
+        firstExam = self.instance.index['packetLeaders'][patient, exam]
+        if exam == firstExam:
+            return Constraint.Skip
+        return model.x[patient, exam] == model.x[patient, firstExam]
+
+    def __operatorSymmetryRule(self, model, operator1, operator2):
+        # identical operators are ordered by decreasing workload, they can do the same requests
+        requests = self.operatorRequests[operator1]
+        return (sum(model.requests[patient, exam] * model.chi[patient, exam, operator1] for patient, exam in requests) >=
+            sum(model.requests[patient, exam] * model.chi[patient, exam, operator2] for patient, exam in requests))
+
+    def __patientSymmetryRule(self, model, patient1, patient2):
+        # identical patients are ordered by decreasing number of scheduled exams
+        exams = self.instance.requests[patient1]
+        return sum(model.x[patient1, exam] for exam in exams) >= sum(model.x[patient2, exam] for exam in exams)
+
+    def __findSymmetries(self, instance):
+        # Operators with the same window and the same requested exams can swap
+        # their whole timelines, and so can patients with the same requests and
+        # packets; both swaps keep the schedule valid and do not change the
+        # workload of the others, so the members of every class can be ordered.
+        examIds = instance.index['examIds']
+        operatorClasses = {}
+        for operator in instance.operators:
+            key = (instance.operatorData[operator]['startTime'], instance.operatorData[operator]['endTime'],
+                frozenset(exam for exam in instance.index['canDo'][operator] if exam in examIds))
+            operatorClasses.setdefault(key, []).append(operator)
+        self.operatorRequests = {}
+        for (patient, exam), operators in instance.index['eligibleOperators'].items():
+            for operator in operators:
+                self.operatorRequests.setdefault(operator, []).append((patient, exam))
+        # operators that can do nothing have no workload to order
+        self.operatorClasses = [operators for operators in operatorClasses.values() if len(operators) > 1 and operators[0] in self.operatorRequests]
+
+        patientClasses = {}
+        for patient in instance.patients:
+            packets = tuple(sorted(tuple(sorted(packet)) for packet in instance.packets.get(patient, [])))
+            key = (frozenset(instance.requests[patient].items()), packets)
+            patientClasses.setdefault(key, []).append(patient)
+        self.patientClasses = [patients for key, patients in patientClasses.items() if len(patients) > 1 and len(key[0]) > 0]
+
+    def __sortSymmetricSchedules(self, schedule):
+        # swaps the timelines of identical operators and patients so that the schedule respects their order
+        durations = self.instance.requests
+        operatorMap = {}
+        for operators in self.operatorClasses:
+            loads = {operator: 0 for operator in operators}
+            for (patient, exam), (operator, start) in schedule.items():
+                if operator in loads:
+                    loads[operator] += durations[patient][exam]
+            for operator, newOperator in zip(sorted(operators, key=lambda operator: -loads[operator]), operators):
+                operatorMap[operator] = newOperator
+        patientMap = {}
+        for patients in self.patientClasses:
+            counts = {patient: sum(1 for exam in durations[patient] if (patient, exam) in schedule) for patient in patients}
+            for patient, newPatient in zip(sorted(patients, key=lambda patient: -counts[patient]), patients):
+                patientMap[patient] = newPatient
+        return {(patientMap.get(patient, patient), exam): (operatorMap.get(operator, operator), start)
+            for (patient, exam), (operator, start) in schedule.items()}
+
+    def __startChange(self):
+        if self.timeBounds is not None:
+            raise Exception('the time bounds of the presolve would not follow the changes, the problem must be built again')
+        if self.symmetryBreaking:
+            raise Exception('the symmetry breaking constraints would not follow the changes, the problem must be built again')
+        if self.changeIndex is None:
+            # the copy shares the entries of the instance until they change; the matrix is rebuilt when needed
+            self.instance = self.instance.getCopy()
+            self.__buildChangeIndex()
+        if self.isSolved:
+            # the model keeps the values of the schedule until the next solve
+            self.isScheduleInModel = True
+            self.isSolved = False
+        self.isChanged = True
+
+    def __buildChangeIndex(self):
+        # reverse lookups from requests, operators and assignments to the model members that use them
+        requestOperators = {request: set() for request in self.model.requestIndexes}
+        operatorRequests = {operator: set() for operator in self.model.operators}
+        conflicts = {}
         for patient, exam, operator in self.model.chiIndexes:
-            if value(self.model.chi[patient, exam, operator]) <= 0:
+            requestOperators[patient, exam].add(operator)
+            operatorRequests[operator].add((patient, exam))
+            conflicts[patient, exam, operator] = set()
+        auxUses = {}
+        for index in self.model.patientConflictIndexes:
+            patient, exam1, operator1, exam2, operator2 = index
+            conflicts[patient, exam1, operator1].add(('patient', index))
+            conflicts[patient, exam2, operator2].add(('patient', index))
+            auxKey = ('patient', (patient, exam1, exam2))
+            auxUses[auxKey] = auxUses.get(auxKey, 0) + 1
+        for index in self.model.operatorConflictIndexes:
+            patient1, exam1, patient2, exam2, operator = index
+            conflicts[patient1, exam1, operator].add(('operator', index))
+            conflicts[patient2, exam2, operator].add(('operator', index))
+            auxKey = ('operator', (patient1, exam1, patient2, exam2))
+            auxUses[auxKey] = auxUses.get(auxKey, 0) + 1
+        # the objective becomes a sum over a list of terms, where a term is removed by moving the last one in its place
+        objectiveTerms = [self.model.x[request] for request in self.model.requestIndexes]
+        objectivePositions = {request: position for position, request in enumerate(self.model.requestIndexes)}
+        self.model.objective.set_value(SumExpression(objectiveTerms))
+        self.changeIndex = {
+            'requestOperators': requestOperators,
+            'operatorRequests': operatorRequests,
+            'conflicts': conflicts,
+            'auxUses': auxUses,
+            'objectiveTerms': objectiveTerms,
+            'objectivePositions': objectivePositions
+        }
+
+    def __addRequest(self, patient, exam):
+        model = self.model
+        model.requestIndexes.add((patient, exam))
+        model.requests[patient, exam] = self.instance.requests[patient][exam]
+        model.xAndT[patient, exam] = self.__xAndTRule(model, patient, exam)
+        model.tAndX[patient, exam] = self.__tAndXRule(model, patient, exam)
+        self.changeIndex['requestOperators'][patient, exam] = set()
+        self.__addObjectiveTerm(patient, exam)
+
+    def __removeRequest(self, patient, exam):
+        model = self.model
+        for constraint in [model.xAndT, model.tAndX, model.xAndChi]:
+            del constraint[patient, exam]
+        if self.instance.options['usePackets'] and (patient, exam) in model.forcePacketExams:
+            del model.forcePacketExams[patient, exam]
+        self.__removeObjectiveTerm(patient, exam)
+        del model.x[patient, exam]
+        del model.t[patient, exam]
+        del model.requests[patient, exam]
+        model.requestIndexes.remove((patient, exam))
+        del self.changeIndex['requestOperators'][patient, exam]
+
+    def __syncRequests(self, requests):
+        # makes the assignments of every request match its eligible operators
+        for patient, exam in requests:
+            current = self.changeIndex['requestOperators'].get((patient, exam), set())
+            eligibleOperators = self.instance.index['eligibleOperators'].get((patient, exam), [])
+            for operator in current - set(eligibleOperators):
+                self.__removeChi((patient, exam, operator))
+            for operator in eligibleOperators:
+                if operator not in current:
+                    self.__addChi((patient, exam, operator))
+            if (patient, exam) in self.instance.index['eligibleOperators']:
+                self.model.xAndChi[patient, exam] = self.__xAndChiRule(self.model, patient, exam)
+
+    def __syncPackets(self, patient):
+        if not self.instance.options['usePackets']:
+            return
+        for exam in self.instance.requests[patient]:
+            constraint = self.__forcePacketExamsRule(self.model, patient, exam)
+            if constraint is not Constraint.Skip:
+                self.model.forcePacketExams[patient, exam] = constraint
+            elif (patient, exam) in self.model.forcePacketExams:
+                del self.model.forcePacketExams[patient, exam]
+
+    def __addChi(self, chi):
+        model = self.model
+        patient, exam, operator = chi
+        model.chiIndexes.add(chi)
+        model.respectStart[chi] = self.__respectStartRule(model, *chi)
+        model.respectEnd[chi] = self.__respectEndRule(model, *chi)
+        self.changeIndex['requestOperators'][patient, exam].add(operator)
+        self.changeIndex['conflicts'][chi] = set()
+        self.__syncPatientConflicts(chi)
+
+        patientIds = self.instance.index['patientIds']
+        for otherPatient, otherExam in self.changeIndex['operatorRequests'][operator]:
+            if otherPatient == patient:
                 continue
-            t = value(self.model.t[patient, exam])
-            if t > 0:
-                print('\'' + patient + '\' do exam \'' + exam + '\' at operator \'' + operator +
-                    '\' from time ' + str(t) + ' to time ' + str(t + self.model.requests[patient, exam]))
-
-    def __printExamsNotDone(self):
-        for patient, exam in self.model.requestIndexes:
-            done = False
-            for operator in self.model.operators:
-                if (patient, exam, operator) in self.model.chiIndexes:
-                    if value(self.model.chi[patient, exam, operator]) > 0:
-                        done = True
-                        break
-            if not done:
-                print('patient \'' + patient + '\' do not make exam \'' + exam + '\'')
-    
-    def __printOperatorUnused(self):
-        for operator in self.model.operators:
-            used = False
-            for patient, exam in self.model.requestIndexes:
-                if (patient, exam, operator) in self.model.chiIndexes:
-                    if value(self.model.chi[patient, exam, operator]) > 0:
-                        used = True
-                        break
-            if not used:
-                print('operator \'' + operator + '\' is not utilized')
\ No newline at end of file
+            if patientIds[patient] < patientIds[otherPatient]:
+                self.__addConflict('operator', (patient, exam, otherPatient, otherExam, operator))
+            else:
+                self.__addConflict('operator', (otherPatient, otherExam, patient, exam, operator))
+        self.changeIndex['operatorRequests'][operator].add((patient, exam))
+
+    def __removeChi(self, chi):
+        model = self.model
+        patient, exam, operator = chi
+        for kind, index in list(self.changeIndex['conflicts'][chi]):
+            self.__removeConflict(kind, index)
+        del model.respectStart[chi]
+        del model.respectEnd[chi]
+        del model.chi[chi]
+        model.chiIndexes.remove(chi)
+        self.changeIndex['requestOperators'][patient, exam].remove(operator)
+        self.changeIndex['operatorRequests'][operator].remove((patient, exam))
+        del self.changeIndex['conflicts'][chi]
+
+    def __syncPatientConflicts(self, chi):
+        # pairs with the other assignments of the patient whose operator windows overlap
+        patient, exam, operator = chi
+        examIds = self.instance.index['examIds']
+        operatorData = self.instance.operatorData
+        target = set()
+        for otherExam in self.instance.requests[patient]:
+            if otherExam == exam:
+                continue
+            for otherOperator in self.changeIndex['requestOperators'].get((patient, otherExam), set()):
+                if (operatorData[operator]['startTime'] >= operatorData[otherOperator]['endTime'] or
+                    operatorData[otherOperator]['startTime'] >= operatorData[operator]['endTime']):
+                    continue
+                if examIds[exam] < examIds[otherExam]:
+                    target.add(('patient', (patient, exam, operator, otherExam, otherOperator)))
+                else:
+                    target.add(('patient', (patient, otherExam, otherOperator, exam, operator)))
+        current = set(conflict for conflict in self.changeIndex['conflicts'][chi] if conflict[0] == 'patient')
+        for kind, index in current - target:
+            self.__removeConflict(kind, index)
+        for kind, index in target - current:
+            self.__addConflict(kind, index)
+
+    def __addConflict(self, kind, index):
+        model = self.model
+        if kind == 'patient':
+            patient, exam1, operator1, exam2, operator2 = index
+            chis = [(patient, exam1, operator1), (patient, exam2, operator2)]
+            auxKey = (patient, exam1, exam2)
+            if (kind, auxKey) not in self.changeIndex['auxUses']:
+                model.aux1Index.add(auxKey)
+            model.patientConflictIndexes.add(index)
+            model.patientNotOverlap1[index] = self.__patientNotOverlap1Rule(model, *index)
+            model.patientNotOverlap2[index] = self.__patientNotOverlap2Rule(model, *index)
+        else:
+            patient1, exam1, patient2, exam2, operator = index
+            chis = [(patient1, exam1, operator), (patient2, exam2, operator)]
+            auxKey = (patient1, exam1, patient2, exam2)
+            if (kind, auxKey) not in self.changeIndex['auxUses']:
+                model.aux2Index.add(auxKey)
+            model.operatorConflictIndexes.add(index)
+            model.operatorNotOverlap1[index] = self.__operatorNotOverlap1Rule(model, *index)
+            model.operatorNotOverlap2[index] = self.__operatorNotOverlap2Rule(model, *index)
+        for chi in chis:
+            self.changeIndex['conflicts'][chi].add((kind, index))
+        self.changeIndex['auxUses'][kind, auxKey] = self.changeIndex['auxUses'].get((kind, auxKey), 0) + 1
+
+    def __removeConflict(self, kind, index):
+        model = self.model
+        if kind == 'patient':
+            patient, exam1, operator1, exam2, operator2 = index
+            chis = [(patient, exam1, operator1), (patient, exam2, operator2)]
+            auxKey = (patient, exam1, exam2)
+            auxVariable, auxIndex = model.aux1, model.aux1Index
+            del model.patientNotOverlap1[index]
+            del model.patientNotOverlap2[index]
+            model.patientConflictIndexes.remove(index)
+        else:
+            patient1, exam1, patient2, exam2, operator = index
+            chis = [(patient1, exam1, operator), (patient2, exam2, operator)]
+            auxKey = (patient1, exam1, patient2, exam2)
+            auxVariable, auxIndex = model.aux2, model.aux2Index
+            del model.operatorNotOverlap1[index]
+            del model.operatorNotOverlap2[index]
+            model.operatorConflictIndexes.remove(index)
+        for chi in chis:
+            self.changeIndex['conflicts'][chi].discard((kind, index))
+        self.changeIndex['auxUses'][kind, auxKey] -= 1
+        if self.changeIndex['auxUses'][kind, auxKey] == 0:
+            del self.changeIndex['auxUses'][kind, auxKey]
+            del auxVariable[auxKey]
+            auxIndex.remove(auxKey)
+
+    def __addObjectiveTerm(self, patient, exam):
+        terms = self.changeIndex['objectiveTerms']
+        self.changeIndex['objectivePositions'][patient, exam] = len(terms)
+        terms.append(self.model.x[patient, exam])
+        self.model.objective.set_value(SumExpression(terms))
+
+    def __removeObjectiveTerm(self, patient, exam):
+        terms = self.changeIndex['objectiveTerms']
+        position = self.changeIndex['objectivePositions'].pop((patient, exam))
+        last = terms.pop()
+        if position < len(terms):
+            terms[position] = last
+            self.changeIndex['objectivePositions'][last.index()] = position
+        self.model.objective.set_value(SumExpression(terms))
+
+    def __syncMaxTime(self):
+        # the big-M only grows: a larger one is still valid for the requests and windows that shrank
+        if self.instance.options['maxTime'] > value(self.model.maxTime):
+            self.model.maxTime = self.instance.options['maxTime']
+
+    def __keepValidSchedule(self):
+        # drops the assignments that the changes made invalid, and the rest of their packets
+        if self.initialSchedule is None:
+            return
+        schedule = {}
+        for (patient, exam), (operator, start) in self.initialSchedule.items():
+            if operator not in self.instance.index['eligibleOperators'].get((patient, exam), []):
+                continue
+            if start < self.instance.operatorData[operator]['startTime']:
+                continue
+            if start + self.instance.requests[patient][exam] > self.instance.operatorData[operator]['endTime']:
+                continue
+            schedule[patient, exam] = (operator, start)
+        if self.instance.options['usePackets']:
+            complete = set()
+            for patient in self.instance.packets:
+                for packet in self.instance.packets[patient]:
+                    if all((patient, exam) in schedule for exam in packet):
+                        complete.update((patient, exam) for exam in packet)
+            schedule = {request: assignment for request, assignment in schedule.items() if request in complete}
+        self.setInitialSchedule(schedule)
+
+    def __loadSchedule(self, schedule, onlyScheduled=False):
+        model = self.model
+        for patient, exam in model.requestIndexes:
+            if onlyScheduled and (patient, exam) not in schedule:
+                continue
+            model.x[patient, exam].set_value(1 if (patient, exam) in schedule else 0)
+            model.t[patient, exam].set_value(schedule[patient, exam][1] if (patient, exam) in schedule else 0)
+        for patient, exam, operator in model.chiIndexes:
+            if onlyScheduled and (patient, exam) not in schedule:
+                continue
+            model.chi[patient, exam, operator].set_value(1 if schedule.get((patient, exam), (None,))[0] == operator else 0)
+        if onlyScheduled:
+            return
+
+        # aux = 0 means that the first request of the pair comes first
+        def order(first, second):
+            if first not in schedule or second not in schedule:
+                return 0
+            return 0 if schedule[first][1] < schedule[second][1] else 1
+        for patient, exam1, exam2 in model.aux1Index:
+            model.aux1[patient, exam1, exam2].set_value(order((patient, exam1), (patient, exam2)))
+        for patient1, exam1, patient2, exam2 in model.aux2Index:
+            model.aux2[patient1, exam1, patient2, exam2].set_value(order((patient1, exam1), (patient2, exam2)))
\ No newline at end of file
@@ -0,0 +1,71 @@
+import json
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+if __name__ == '__main__':
+    exit(0)
+
+# Records wall time (and, if asked, peak traced memory) of named stages,
+# named counters and any other information worth reporting.
+# Stages can be nested: the peak of a stage includes its inner stages.
+class Profiler:
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.stages = []
+        self.stack = []
+        self.counters = {}
+        self.info = {}
+
+    @contextmanager
+    def stage(self, name):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        record = {'stage': name, 'parent': self.stack[-1]['name'] if len(self.stack) > 0 else None, 'time': None, 'peakMemory': None}
+        self.stages.append(record)
+        frame = {'name': name, 'peak': 0, 'current': 0}
+        if self.memory:
+            frame['current'], peak = tracemalloc.get_traced_memory()
+            if len(self.stack) > 0:
+                self.stack[-1]['peak'] = max(self.stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+        self.stack.append(frame)
+        startTime = perf_counter()
+        try:
+            yield record
+        finally:
+            record['time'] = perf_counter() - startTime
+            self.stack.pop()
+            if self.memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame['peak'])
+                record['peakMemory'] = peak - frame['current']
+                if len(self.stack) > 0:
+                    self.stack[-1]['peak'] = max(self.stack[-1]['peak'], peak)
+
+    def getStage(self, name):
+        for record in self.stages:
+            if record['stage'] == name:
+                return record
+        return None
+
+    def count(self, name, key, amount=1):
+        counter = self.counters.setdefault(name, {})
+        counter[key] = counter.get(key, 0) + amount
+
+    def setInfo(self, name, info):
+        self.info[name] = info
+
+    def toDict(self):
+        return {
+            'stages': self.stages,
+            'counters': self.counters,
+            'info': self.info
+        }
+
+    def printToJSONFile(self, fileName):
+        with open(fileName, 'w') as f:
+            f.write(json.dumps(self.toDict(), indent=4))
+
+    def stop(self):
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
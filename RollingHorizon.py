@@ -0,0 +1,155 @@
+from time import perf_counter
+from Heuristic import Heuristic
+from Presolve import Presolve
+from Problem import Problem
+from Solution import Solution
+
+if __name__ == '__main__':
+    exit(0)
+
+# Rolling horizon: the time span of the operators is split in overlapping
+# windows, solved in order with a Problem that has only the operators active
+# in the window and the pending requests they can do there. The assignments (whole
+# packets) that start before the next window are committed, the others are
+# released and planned again with the next window. Every window starts from
+# the heuristic schedule, and times are shifted to the window start, so the
+# big-M of every model is about the window length.
+class RollingHorizon:
+    def __init__(self, instance):
+        self.instance = instance
+        self.schedule = {}
+        self.statistics = []
+        self.objective = 0
+        self.isSolved = False
+        self.pending = set()
+        self.operatorBusy = {}
+        self.patientBusy = {}
+
+    def solve(self, solverName='glpk', windowLength=None, overlap=None, timeLimit=None):
+        # the defaults fit the longest operator window in every window, and overlap by half
+        operatorData = self.instance.operatorData
+        if windowLength is None:
+            windowLength = max((operatorData[operator]['endTime'] - operatorData[operator]['startTime'] for operator in self.instance.operators), default=1)
+        if overlap is None:
+            overlap = windowLength // 2
+        if windowLength <= 0 or overlap < 0 or overlap >= windowLength:
+            raise Exception('windows must be longer than their overlap')
+
+        self.schedule = {}
+        self.statistics = []
+        self.operatorBusy = {}
+        self.patientBusy = {}
+        # the presolve drops whole packets that cannot be done, so no window ever sees part of one
+        reduced = Presolve(self.instance).instance
+        self.pending = set((patient, exam) for patient in reduced.requests for exam in reduced.requests[patient])
+        horizonStart = min((operatorData[operator]['startTime'] for operator in self.instance.operators), default=0)
+        horizonEnd = max((operatorData[operator]['endTime'] for operator in self.instance.operators), default=0)
+
+        windowStart = horizonStart
+        while windowStart < horizonEnd and len(self.pending) > 0:
+            windowEnd = windowStart + windowLength
+            # the last window commits everything
+            commitEnd = windowEnd - overlap if windowEnd < horizonEnd else horizonEnd
+            self.__solveWindow(windowStart, windowEnd, commitEnd, solverName, timeLimit)
+            windowStart = commitEnd
+
+        self.objective = len(self.schedule)
+        self.isSolved = True
+
+    def getSolution(self):
+        return Solution(self.instance, self.schedule)
+
+    def printResults(self):
+        if not self.isSolved:
+            return
+        self.getSolution().printResults()
+
+    def printStatistics(self):
+        if not self.isSolved:
+            return
+        print('')
+        for statistics in self.statistics:
+            print('window [' + str(statistics['windowStart']) + ', ' + str(statistics['windowEnd']) + '): ' +
+                str(statistics['operators']) + ' operators, ' + str(statistics['requests']) + ' requests, ' +
+                str(statistics['scheduled']) + ' scheduled, ' + str(statistics['committed']) + ' committed (' +
+                str(statistics['termination']) + ' in ' + format(statistics['solveTime'], '.2f') + 's)')
+
+    def __solveWindow(self, windowStart, windowEnd, commitEnd, solverName, timeLimit):
+        startTime = perf_counter()
+        statistics = {'windowStart': windowStart, 'windowEnd': windowEnd, 'operators': 0, 'requests': 0,
+            'scheduled': 0, 'committed': 0, 'termination': None, 'solveTime': 0.0}
+        self.statistics.append(statistics)
+
+        # operators keep the part of their window inside this one, after their committed assignments;
+        # the operator windows must start from 1
+        offset = windowStart - 1
+        operatorWindows = {}
+        for operator in self.instance.operators:
+            start = max(self.instance.operatorData[operator]['startTime'], windowStart, self.operatorBusy.get(operator, 0))
+            end = min(self.instance.operatorData[operator]['endTime'], windowEnd)
+            if start < end:
+                operatorWindows[operator] = (start - offset, end - offset)
+        if len(operatorWindows) == 0:
+            return
+
+        subInstance = self.instance.getSubInstance(self.__getCandidates(operatorWindows), list(operatorWindows), operatorWindows)
+        presolve = Presolve(subInstance)
+        statistics['operators'] = len(presolve.instance.operators)
+        statistics['requests'] = len(presolve.instance.index['eligibleOperators'])
+        if statistics['requests'] == 0:
+            return
+
+        # exams of patients with a committed assignment that ends inside the window start after it
+        timeBounds = {(patient, exam): (max(earliest, self.patientBusy.get(patient, 0) - offset), latest)
+            for (patient, exam), (earliest, latest) in presolve.timeBounds.items()}
+        problem = Problem(presolve.instance, timeBounds=timeBounds)
+        problem.setInitialSchedule(self.__getInitialSchedule(presolve.instance, timeBounds))
+        problem.solve(solverName, timeLimit=timeLimit)
+        statistics['termination'] = problem.statistics['termination']
+        schedule = {request: (operator, start + offset) for request, (operator, start) in problem.getSchedule().items()}
+        statistics['scheduled'] = len(schedule)
+
+        # packets are committed whole, so that they are never split between windows
+        lastStarts = {}
+        for (patient, exam), (operator, start) in schedule.items():
+            unit = self.__getUnit(patient, exam)
+            lastStarts[unit] = max(lastStarts.get(unit, start), start)
+        for (patient, exam), (operator, start) in schedule.items():
+            if lastStarts[self.__getUnit(patient, exam)] >= commitEnd:
+                continue
+            end = start + self.instance.requests[patient][exam]
+            self.schedule[patient, exam] = (operator, start)
+            self.pending.discard((patient, exam))
+            self.operatorBusy[operator] = max(self.operatorBusy.get(operator, 0), end)
+            self.patientBusy[patient] = max(self.patientBusy.get(patient, 0), end)
+            statistics['committed'] += 1
+        statistics['solveTime'] = perf_counter() - startTime
+
+    def __getCandidates(self, operatorWindows):
+        # only the pending requests that an operator of the window can do in its part of the window,
+        # and only with their whole packet
+        windowLengths = {operator: end - start for operator, (start, end) in operatorWindows.items()}
+        eligibleOperators = self.instance.index['eligibleOperators']
+        candidates = set()
+        incompleteUnits = set()
+        for patient, exam in self.pending:
+            duration = self.instance.requests[patient][exam]
+            if any(windowLengths.get(operator, 0) >= duration for operator in eligibleOperators[patient, exam]):
+                candidates.add((patient, exam))
+            else:
+                incompleteUnits.add(self.__getUnit(patient, exam))
+        return [request for request in candidates if self.__getUnit(*request) not in incompleteUnits]
+
+    def __getInitialSchedule(self, instance, timeBounds):
+        # the heuristic gives every window a schedule even if the solver finds none in time;
+        # it does not know the committed assignments of the patients, so the packets that overlap them are left out
+        heuristic = Heuristic(instance)
+        heuristic.solve()
+        units = set(self.__getUnit(patient, exam) for (patient, exam), (operator, start) in heuristic.schedule.items()
+            if start < timeBounds[patient, exam][0])
+        return {request: assignment for request, assignment in heuristic.schedule.items() if self.__getUnit(*request) not in units}
+
+    def __getUnit(self, patient, exam):
+        if self.instance.options['usePackets']:
+            return (patient, self.instance.index['packetLeaders'][patient, exam])
+        return (patient, exam)
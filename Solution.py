@@ -0,0 +1,70 @@
+import json
+
+if __name__ == '__main__':
+    exit(0)
+
+# Read-only view of a schedule, built in a single pass over its assignments:
+# timelines of every operator and patient sorted by start time, the requests
+# left out, the utilization of every operator and the objective.
+class Solution:
+    def __init__(self, instance, schedule):
+        # schedule maps (patient, exam) to (operator, startTime)
+        self.instance = instance
+        self.schedule = dict(schedule)
+        self.objective = len(self.schedule)
+
+        self.operatorTimelines = {operator: [] for operator in instance.operators}
+        self.patientTimelines = {patient: [] for patient in instance.patients}
+        for (patient, exam), (operator, start) in self.schedule.items():
+            end = start + instance.requests[patient][exam]
+            self.operatorTimelines[operator].append((start, end, patient, exam))
+            self.patientTimelines[patient].append((start, end, exam, operator))
+        for timeline in self.operatorTimelines.values():
+            timeline.sort()
+        for timeline in self.patientTimelines.values():
+            timeline.sort()
+
+        self.unscheduled = [(patient, exam)
+            for patient in instance.patients
+            for exam in instance.requests[patient]
+            if (patient, exam) not in self.schedule]
+
+        self.utilization = {}
+        for operator, timeline in self.operatorTimelines.items():
+            windowLength = instance.operatorData[operator]['endTime'] - instance.operatorData[operator]['startTime']
+            self.utilization[operator] = sum(end - start for start, end, _, _ in timeline) / windowLength
+
+    def getUnusedOperators(self):
+        return [operator for operator in self.instance.operators if len(self.operatorTimelines[operator]) == 0]
+
+    def toDict(self):
+        return {
+            'objective': self.objective,
+            'operators': {operator: {
+                    'utilization': self.utilization[operator],
+                    'timeline': [{'patient': patient, 'exam': exam, 'start': start, 'end': end} for start, end, patient, exam in timeline]
+                } for operator, timeline in self.operatorTimelines.items()},
+            'patients': {patient: [{'exam': exam, 'operator': operator, 'start': start, 'end': end} for start, end, exam, operator in timeline]
+                for patient, timeline in self.patientTimelines.items()},
+            'unscheduled': [{'patient': patient, 'exam': exam} for patient, exam in self.unscheduled]
+        }
+
+    def printToJSONFile(self, fileName):
+        with open(fileName, 'w') as f:
+            f.write(json.dumps(self.toDict(), indent=4))
+
+    def printResults(self):
+        print('')
+        for patient in self.instance.patients:
+            for exam in self.instance.requests[patient]:
+                if (patient, exam) not in self.schedule:
+                    continue
+                operator, start = self.schedule[patient, exam]
+                print('\'' + patient + '\' do exam \'' + exam + '\' at operator \'' + operator +
+                    '\' from time ' + str(start) + ' to time ' + str(start + self.instance.requests[patient][exam]))
+        print('')
+        for patient, exam in self.unscheduled:
+            print('patient \'' + patient + '\' do not make exam \'' + exam + '\'')
+        print('')
+        for operator in self.getUnusedOperators():
+            print('operator \'' + operator + '\' is not utilized')
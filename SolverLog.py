@@ -0,0 +1,85 @@
+import re
+from math import isfinite
+from time import perf_counter
+
+if __name__ == '__main__':
+    exit(0)
+
+# incumbent lines of the solvers we know how to read:
+# GLPK   '+   300: >>>>>   1.000000000e+01 <=   1.200000000e+01  16.7% (10; 0)'
+# CBC    'Cbc0012I Integer solution of -10 found by DiveCoefficient after ...'
+# HiGHS  ' T     226      21        66  10.38%   14              8                 75.00% ...'
+incumbentPatterns = [
+    re.compile(r'^\+\s*\d+:\s*>>>>>\s+(?P<incumbent>\S+)\s+[<>]=\s+(?P<bound>\S+)'),
+    re.compile(r'^Cbc00(?:04|12)I Integer solution of\s+(?P<incumbent>\S+)'),
+    re.compile(r'^\s*[A-Za-z]\s+\d+\s+\d+\s+\d+\s+[\d.]+%\s+(?P<bound>\S+)\s+(?P<incumbent>\S+)'),
+]
+
+# phases timed by pyomo with report_timing, e.g. '        0.01 seconds required for presolve'
+timingPattern = re.compile(r'^\s*(?P<time>[\d.]+) seconds required (?:for|to) (?P<phase>.+?)\s*$')
+
+# File-like object that receives the solver output (through tee) and
+# records every improving incumbent with the time it was reported.
+# The callback receives every improving incumbent as soon as it is read,
+# returning True it asks to stop the solver.
+class SolverLog:
+    def __init__(self, callback=None):
+        self.startTime = perf_counter()
+        self.callback = callback
+        self.stopRequested = False
+        # set by the solvers that really stopped because of the request
+        self.isInterrupted = False
+        self.incumbents = []
+        self.lines = []
+        self.timings = {}
+        self.buffer = ''
+
+    def write(self, text):
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split('\n')
+        for line in lines:
+            self.__parseLine(line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def addIncumbent(self, incumbent, bound=None):
+        if len(self.incumbents) == 0 or incumbent > self.incumbents[-1][1]:
+            self.incumbents.append((perf_counter() - self.startTime, incumbent))
+            if self.callback is not None and self.callback(self.incumbents[-1][0], incumbent, bound):
+                self.stopRequested = True
+
+    def getFirstIncumbentTime(self):
+        # the empty schedule is always feasible, so it is not counted
+        for time, incumbent in self.incumbents:
+            if incumbent > 0:
+                return time
+        return None
+
+    def __parseLine(self, line):
+        self.lines.append(line)
+        match = timingPattern.match(line)
+        if match is not None:
+            self.timings[match.group('phase')] = float(match.group('time'))
+            return
+        for pattern in incumbentPatterns:
+            match = pattern.match(line)
+            if match is None:
+                continue
+            try:
+                # CBC minimizes the negated objective
+                incumbent = abs(float(match.group('incumbent')))
+            except ValueError:
+                return
+            if not isfinite(incumbent):
+                return
+            self.addIncumbent(incumbent, self.__parseBound(match))
+            return
+
+    def __parseBound(self, match):
+        try:
+            bound = abs(float(match.groupdict().get('bound')))
+        except (TypeError, ValueError):
+            return None
+        return bound if isfinite(bound) else None
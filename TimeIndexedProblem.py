@@ -0,0 +1,167 @@
+from bisect import bisect_left
+from pyomo.environ import ConcreteModel, Set, Param, Var, Constraint, Objective
+from pyomo.environ import PositiveIntegers, Binary
+from pyomo.environ import maximize, value
+from Problem import runSolver, getStatistics
+from Solution import Solution
+
+if __name__ == '__main__':
+    exit(0)
+
+# Time-indexed formulation: y[patient, exam, operator, start] is 1 when the
+# exam starts at that (integer) time with that operator. Only starts that
+# fit the operator window exist, and no big-M is needed: at every time at
+# most one exam can be running on each operator and for each patient.
+class TimeIndexedProblem:
+    def __init__(self, instance):
+        self.instance = instance
+        self.model = ConcreteModel()
+        self.__addIndexes(instance)
+        self.__addParameters(instance)
+        self.__addVariables()
+        self.__addConstraints(instance)
+        self.__addObjective()
+        self.initialSchedule = None
+        self.statistics = {}
+        self.isSolved = False
+
+    def setInitialSchedule(self, schedule):
+        # schedule maps (patient, exam) to (operator, startTime)
+        self.initialSchedule = dict(schedule)
+        self.__loadSchedule(self.initialSchedule)
+
+    def solve(self, solverName='glpk', timeLimit=None, mipGap=None, threads=None, callback=None):
+        results, log, warmStart, hasSolution = runSolver(self.model, solverName, timeLimit, self.initialSchedule, mipGap=mipGap, threads=threads, callback=callback)
+
+        objective = value(self.model.objective) if hasSolution else None
+        # solvers that cannot take a warm start must still not lose the initial schedule
+        if self.initialSchedule is not None and (objective is None or objective < len(self.initialSchedule)):
+            self.__loadSchedule(self.initialSchedule)
+            objective = len(self.initialSchedule)
+
+        self.statistics = getStatistics(solverName, results, log, warmStart, self.initialSchedule, objective)
+        # a solve that fails or stops before the first incumbent leaves no schedule
+        self.isSolved = objective is not None
+
+    def getSchedule(self):
+        schedule = {}
+        for (patient, exam, operator, start), y in self.model.y.items():
+            if y.value is not None and y.value > 0.5:
+                schedule[patient, exam] = (operator, start)
+        return schedule
+
+    def getSolution(self):
+        return Solution(self.instance, self.getSchedule())
+
+    def printResults(self):
+        if not self.isSolved:
+            return
+        self.getSolution().printResults()
+
+    def printStatistics(self):
+        if not self.isSolved:
+            return
+        print('')
+        for key in ['solver', 'termination', 'warmStart', 'initialObjective', 'objective', 'bound', 'gap', 'solveTime', 'timeToFirstIncumbent']:
+            print(key + ': ' + str(self.statistics[key]))
+
+    def __addIndexes(self, instance):
+        self.model.operators = Set(initialize=instance.operators, doc="operator indexes")
+        self.__addRequestIndexes(instance)
+        self.__addYIndexes(instance)
+        self.__addSlotIndexes(instance)
+
+    def __addParameters(self, instance):
+        def f(model, patient, exam):
+            return instance.requests[patient][exam]
+        self.model.requests = Param(self.model.requestIndexes, initialize=f, doc='exam requests of patients', within=PositiveIntegers)
+
+    def __addConstraints(self, instance):
+        self.__addXAndYConstraints()
+        self.__addOperatorCapacityConstraints()
+        self.__addPatientCapacityConstraints()
+        if instance.options['usePackets']:
+            self.__addPacketConsistencyConstraints(instance)
+
+    def __addObjective(self):
+        def f(model):
+            return sum(model.x[patient, exam] for patient, exam in model.requestIndexes)
+        self.model.objective = Objective(rule=f, sense=maximize)
+
+    def __addRequestIndexes(self, instance):
+        def f(model):
+            return ((patient, exam)
+                for patient in instance.patients
+                for exam in instance.exams
+                if exam in instance.requests[patient])
+        self.model.requestIndexes = Set(initialize=f, doc="indexes of the request matrix")
+
+    def __addYIndexes(self, instance):
+        def f(model):
+            for patient, exam in instance.index['eligibleOperators']:
+                duration = instance.requests[patient][exam]
+                for operator in instance.index['eligibleOperators'][patient, exam]:
+                    # the big-M model forces t >= 1 for every scheduled exam
+                    firstStart = max(instance.operatorData[operator]['startTime'], 1)
+                    lastStart = instance.operatorData[operator]['endTime'] - duration
+                    for start in range(firstStart, lastStart + 1):
+                        yield (patient, exam, operator, start)
+        self.model.yIndexes = Set(initialize=f, doc="indexes of the start time assignment variables")
+
+    def __addSlotIndexes(self, instance):
+        # the running exams of an interval graph form a maximal clique only at start times,
+        # so capacity rows are needed only where some exam can start
+        operatorStarts = {}
+        patientStarts = {}
+        for patient, exam, operator, start in self.model.yIndexes:
+            operatorStarts.setdefault(operator, set()).add(start)
+            patientStarts.setdefault(patient, set()).add(start)
+        operatorStarts = {operator: sorted(starts) for operator, starts in operatorStarts.items()}
+        patientStarts = {patient: sorted(starts) for patient, starts in patientStarts.items()}
+
+        self.operatorCover = {}
+        self.patientCover = {}
+        for patient, exam, operator, start in self.model.yIndexes:
+            end = start + instance.requests[patient][exam]
+            for cover, key, starts in [(self.operatorCover, operator, operatorStarts[operator]), (self.patientCover, patient, patientStarts[patient])]:
+                for time in starts[bisect_left(starts, start):bisect_left(starts, end)]:
+                    cover.setdefault((key, time), []).append((patient, exam, operator, start))
+
+        self.model.operatorSlotIndexes = Set(initialize=list(self.operatorCover), doc="operator and time of every operator capacity row")
+        self.model.patientSlotIndexes = Set(initialize=list(self.patientCover), doc="patient and time of every patient capacity row")
+
+    def __addVariables(self):
+        self.model.x = Var(self.model.requestIndexes, within=Binary)
+        self.model.y = Var(self.model.yIndexes, within=Binary)
+
+    def __addXAndYConstraints(self):
+        starts = {}
+        for patient, exam, operator, start in self.model.yIndexes:
+            starts.setdefault((patient, exam), []).append((patient, exam, operator, start))
+        def f(model, patient, exam):
+            return sum(model.y[index] for index in starts.get((patient, exam), [])) == model.x[patient, exam]
+        self.model.xAndY = Constraint(self.model.requestIndexes, rule=f)
+
+    def __addOperatorCapacityConstraints(self):
+        def f(model, operator, time):
+            return sum(model.y[index] for index in self.operatorCover[operator, time]) <= 1
+        self.model.operatorCapacity = Constraint(self.model.operatorSlotIndexes, rule=f)
+
+    def __addPatientCapacityConstraints(self):
+        def f(model, patient, time):
+            return sum(model.y[index] for index in self.patientCover[patient, time]) <= 1
+        self.model.patientCapacity = Constraint(self.model.patientSlotIndexes, rule=f)
+
+    def __addPacketConsistencyConstraints(self, instance):
+        def f(model, patient, exam):
+            firstExam = instance.index['packetLeaders'][patient, exam]
+            if exam == firstExam:
+                return Constraint.Skip
+            return model.x[patient, exam] == model.x[patient, firstExam]
+        self.model.forcePacketExams = Constraint(self.model.requestIndexes, rule=f)
+
+    def __loadSchedule(self, schedule):
+        for patient, exam in self.model.requestIndexes:
+            self.model.x[patient, exam].set_value(1 if (patient, exam) in schedule else 0)
+        for patient, exam, operator, start in self.model.yIndexes:
+            self.model.y[patient, exam, operator, start].set_value(1 if schedule.get((patient, exam)) == (operator, start) else 0)
@@ -0,0 +1,73 @@
+if __name__ == '__main__':
+    exit(0)
+
+# Checks a schedule against the instance alone, without trusting the model
+# that produced it. Overlaps are found by sorting the intervals of every
+# operator and patient by start and sweeping them once.
+class Validator:
+    def __init__(self, instance):
+        self.instance = instance
+        self.violations = []
+
+    def validate(self, schedule):
+        # schedule maps (patient, exam) to (operator, startTime)
+        self.violations = []
+        operatorIntervals = {}
+        patientIntervals = {}
+        for (patient, exam), (operator, start) in schedule.items():
+            if exam not in self.instance.requests.get(patient, {}):
+                self.violations.append('patient \'' + patient + '\' does not request exam \'' + exam + '\'')
+                continue
+            if operator not in self.instance.operatorData:
+                self.violations.append('exam \'' + exam + '\' of \'' + patient + '\' is assigned to the unknown operator \'' + operator + '\'')
+                continue
+            end = start + self.instance.requests[patient][exam]
+            self.__checkAssignment(patient, exam, operator, start, end)
+            operatorIntervals.setdefault(operator, []).append((start, end, patient, exam))
+            patientIntervals.setdefault(patient, []).append((start, end, patient, exam))
+
+        for operator, intervals in operatorIntervals.items():
+            self.__checkOverlaps('operator \'' + operator + '\'', intervals)
+        for patient, intervals in patientIntervals.items():
+            self.__checkOverlaps('patient \'' + patient + '\'', intervals)
+        if self.instance.options['usePackets']:
+            self.__checkPackets(schedule)
+        return len(self.violations) == 0
+
+    def printViolations(self):
+        print('')
+        if len(self.violations) == 0:
+            print('the schedule is valid')
+            return
+        for violation in self.violations:
+            print(violation)
+        print(str(len(self.violations)) + ' violations found')
+
+    def __checkAssignment(self, patient, exam, operator, start, end):
+        operatorData = self.instance.operatorData[operator]
+        if exam not in self.instance.index['canDo'][operator]:
+            self.violations.append('operator \'' + operator + '\' cannot do exam \'' + exam + '\' of \'' + patient + '\'')
+        if start < operatorData['startTime'] or end > operatorData['endTime']:
+            self.violations.append('exam \'' + exam + '\' of \'' + patient + '\' from time ' + str(start) + ' to time ' + str(end) +
+                ' is outside the window of operator \'' + operator + '\' (' + str(operatorData['startTime']) + ' to ' + str(operatorData['endTime']) + ')')
+
+    def __checkOverlaps(self, owner, intervals):
+        # every interval that starts before the furthest end seen so far overlaps that interval
+        intervals.sort()
+        furthest = None
+        for interval in intervals:
+            start, end, patient, exam = interval
+            if furthest is not None and start < furthest[1]:
+                self.violations.append(owner + ' has exam \'' + exam + '\' of \'' + patient + '\' from time ' + str(start) + ' to time ' + str(end) +
+                    ' overlapping exam \'' + furthest[3] + '\' of \'' + furthest[2] + '\' from time ' + str(furthest[0]) + ' to time ' + str(furthest[1]))
+            if furthest is None or end > furthest[1]:
+                furthest = interval
+
+    def __checkPackets(self, schedule):
+        for patient, packets in self.instance.packets.items():
+            for packet in packets:
+                scheduled = [exam for exam in packet if (patient, exam) in schedule]
+                if 0 < len(scheduled) < len(packet):
+                    missing = [exam for exam in packet if (patient, exam) not in schedule]
+                    self.violations.append('packet of \'' + patient + '\' is partially scheduled: ' +
+                        ', '.join('\'' + exam + '\'' for exam in scheduled) + ' without ' + ', '.join('\'' + exam + '\'' for exam in missing))
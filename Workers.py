@@ -0,0 +1,18 @@
+from multiprocessing import get_all_start_methods, get_context
+from Problem import Problem
+from TimeIndexedProblem import TimeIndexedProblem
+
+if __name__ == '__main__':
+    exit(0)
+
+formulations = {
+    'bigm': Problem,
+    'timeindexed': TimeIndexedProblem,
+}
+
+def getPoolContext():
+    # the scripts exit as soon as they are imported, so the workers must not
+    # re-import __main__ as the spawn and forkserver start methods do
+    if 'fork' in get_all_start_methods():
+        return get_context('fork')
+    return get_context()
@@ -0,0 +1,184 @@
+from argparse import ArgumentParser, ArgumentTypeError
+from contextlib import redirect_stdout
+from io import StringIO
+from itertools import product
+from os import path
+import csv
+import json
+import sys
+from pyomo.environ import Constraint, Var
+from Instance import Instance
+from Problem import Problem
+from Profiler import Profiler
+
+if __name__ != '__main__':
+    exit(0)
+
+def positiveInt(string):
+    i = int(string)
+    if i <= 0:
+        raise ArgumentTypeError(string + 'is not a valid positive integer')
+    return i
+
+def percentage(string):
+    f = float(string)
+    if f < 0.0 or f > 1.0:
+        raise ArgumentTypeError(string + 'must lie between 0.0 and 1.0')
+    return f
+
+default = {
+    'patientNumbers': [10, 20, 40],
+    'examNumbers': [6],
+    'operatorNumbers': [7],
+    'requestFullness': [0.5],
+    'operatorFullness': [0.5],
+    'seeds': [42],
+    'maxTime': 100,
+    'solver': 'glpk',
+    'timeLimit': 60,
+    'tolerance': 0.2,
+    'minimumTime': 0.05,
+    'minimumMemory': 1024 * 1024,
+}
+
+caseFields = ['patients', 'exams', 'operators', 'requestFullness', 'operatorFullness', 'seed']
+fields = caseFields + ['stage', 'time', 'peakMemory', 'variables', 'constraints', 'objective']
+buildStages = ['indexes', 'parameters', 'variables', 'constraints', 'objective']
+
+parser = ArgumentParser(description='Program that measures how model building, solving and result extraction scale with the instance size')
+parser.add_argument('-p', '--patients', metavar='P', type=positiveInt, nargs='+', default=default['patientNumbers'], help='numbers of patients')
+parser.add_argument('-e', '--exams', metavar='E', type=positiveInt, nargs='+', default=default['examNumbers'], help='numbers of exams')
+parser.add_argument('-o', '--operators', metavar='O', type=positiveInt, nargs='+', default=default['operatorNumbers'], help='numbers of operators')
+parser.add_argument('--req-fullness', metavar='F', type=percentage, nargs='+', default=default['requestFullness'], help='fullnesses of the request matrix')
+parser.add_argument('--op-fullness', metavar='G', type=percentage, nargs='+', default=default['operatorFullness'], help='fullnesses of the operator matrix')
+parser.add_argument('-s', '--seeds', metavar='S', type=int, nargs='+', default=default['seeds'], help='seeds of the instances')
+parser.add_argument('--solver', metavar='SOLVER', type=str, default=default['solver'], help='Pyomo solver name (defaults to ' + default['solver'] + ')')
+parser.add_argument('--time-limit', metavar='SECONDS', type=float, default=default['timeLimit'], help='time limit of every solve (defaults to ' + str(default['timeLimit']) + ')')
+parser.add_argument('--no-solve', action='store_true', help='measure only the model building')
+parser.add_argument('--no-memory', action='store_true', help='skip the second run that measures the peak memory with tracemalloc')
+parser.add_argument('--output', metavar='FILE', type=str, help='CSV or JSON file, chosen by the extension, with one row per case and stage')
+parser.add_argument('--baseline', metavar='FILE', type=str, help='CSV or JSON results of a previous run to compare with; exits with 1 on regressions')
+parser.add_argument('--tolerance', metavar='T', type=float, default=default['tolerance'], help='allowed relative increase of time and memory over the baseline (defaults to ' + str(default['tolerance']) + ')')
+
+args = vars(parser.parse_args())
+
+def isJSONFile(fileName):
+    return path.splitext(fileName)[1].lower() == '.json'
+
+def countComponents(model, componentType):
+    return sum(len(component) for component in model.component_objects(componentType, active=True))
+
+def runCase(instance, profiler):
+    # the solver output would hide the report
+    with redirect_stdout(StringIO()):
+        with profiler.stage('build'):
+            problem = Problem(instance, profiler)
+        objective = None
+        if not args['no_solve']:
+            with profiler.stage('solve'):
+                problem.solve(args['solver'], timeLimit=args['time_limit'])
+            with profiler.stage('extraction'):
+                objective = problem.getSolution().objective
+    profiler.stop()
+    return problem, objective
+
+def benchmarkCase(case):
+    instance = Instance()
+    instance.istantiateWithRandomValues({
+        'patientNumber': case['patients'],
+        'examNumber': case['exams'],
+        'operatorNumber': case['operators'],
+        'maxTime': default['maxTime'],
+        'usePackets': True,
+        'requestFullness': case['requestFullness'],
+        'operatorFullness': case['operatorFullness'],
+        'seed': case['seed']
+    })
+
+    # tracemalloc slows everything down, so times and memory come from different runs
+    timeProfiler = Profiler()
+    problem, objective = runCase(instance, timeProfiler)
+    memoryProfiler = None
+    if not args['no_memory']:
+        memoryProfiler = Profiler(memory=True)
+        runCase(instance, memoryProfiler)
+
+    variables = countComponents(problem.model, Var)
+    constraints = countComponents(problem.model, Constraint)
+    rows = []
+    for record in timeProfiler.stages:
+        row = dict(case)
+        row.update({key: None for key in fields if key not in case})
+        row['stage'] = record['stage']
+        row['time'] = record['time']
+        if memoryProfiler is not None:
+            row['peakMemory'] = memoryProfiler.getStage(record['stage'])['peakMemory']
+        if record['stage'] == 'build':
+            row.update({'variables': variables, 'constraints': constraints})
+        if record['stage'] == 'solve':
+            row['objective'] = objective
+        rows.append(row)
+    return rows
+
+def writeRows(fileName, rows):
+    with open(fileName, 'w', newline='') as f:
+        if isJSONFile(fileName):
+            json.dump(rows, f, indent=4)
+        else:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+def readRows(fileName):
+    with open(fileName, 'r', newline='') as f:
+        if isJSONFile(fileName):
+            return json.load(f)
+        # CSV values are strings, empty when missing
+        rows = []
+        for row in csv.DictReader(f):
+            rows.append({key: (None if value == '' else value if key == 'stage' else float(value)) for key, value in row.items()})
+        return rows
+
+def getKey(row):
+    return tuple(float(row[key]) for key in caseFields) + (row['stage'],)
+
+def formatCase(row):
+    return ' '.join(key + '=' + str(row[key]) for key in caseFields) + ' ' + row['stage']
+
+def compareRows(rows, baselineRows):
+    baseline = {getKey(row): row for row in baselineRows}
+    regressions = 0
+    for row in rows:
+        old = baseline.get(getKey(row))
+        if old is None:
+            continue
+        for key, minimum in [('time', default['minimumTime']), ('peakMemory', default['minimumMemory'])]:
+            if row[key] is None or old[key] is None:
+                continue
+            if row[key] > old[key] * (1 + args['tolerance']) and row[key] - old[key] > minimum:
+                regressions += 1
+                print('REGRESSION ' + formatCase(row) + ' ' + key + ': ' + str(old[key]) + ' -> ' + str(row[key]))
+        for key in ['variables', 'constraints', 'objective']:
+            if row[key] is not None and old[key] is not None and float(row[key]) != float(old[key]):
+                print('CHANGED ' + formatCase(row) + ' ' + key + ': ' + str(old[key]) + ' -> ' + str(row[key]))
+    return regressions
+
+rows = []
+for patients, exams, operators, requestFullness, operatorFullness, seed in product(args['patients'], args['exams'], args['operators'], args['req_fullness'], args['op_fullness'], args['seeds']):
+    case = {'patients': patients, 'exams': exams, 'operators': operators, 'requestFullness': requestFullness, 'operatorFullness': operatorFullness, 'seed': seed}
+    caseRows = benchmarkCase(case)
+    for row in caseRows:
+        if row['stage'] == 'build':
+            print(formatCase(row) + ': ' + str(row['variables']) + ' variables, ' + str(row['constraints']) + ' constraints')
+        print('    ' + row['stage'] + ': ' + format(row['time'], '.3f') + 's' +
+            ('' if row['peakMemory'] is None else ', ' + format(row['peakMemory'] / 1024 / 1024, '.1f') + 'MB'))
+    rows += caseRows
+
+if args['output'] is not None:
+    writeRows(args['output'], rows)
+
+if args['baseline'] is not None:
+    regressions = compareRows(rows, readRows(args['baseline']))
+    print(str(regressions) + ' regressions over the baseline')
+    if regressions > 0:
+        sys.exit(1)
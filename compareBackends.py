@@ -0,0 +1,61 @@
+from argparse import ArgumentParser
+from time import perf_counter
+from Instance import Instance
+from Problem import Problem
+from MatrixProblem import MatrixProblem
+from pyomo.environ import value
+
+if __name__ != '__main__':
+    exit(0)
+
+default = {
+    'patientNumber': 10,
+    'examNumber': 6,
+    'operatorNumber': 7,
+    'maxTime': 100,
+    'seeds': 5,
+    'solver': 'glpk',
+}
+
+parser = ArgumentParser(description='Program that checks that the pyomo and the matrix backends reach the same objective')
+parser.add_argument('-p', '--patients', metavar='P', type=int, default=default['patientNumber'], help='number of patients')
+parser.add_argument('-e', '--exams', metavar='E', type=int, default=default['examNumber'], help='number of exams')
+parser.add_argument('-o', '--operators', metavar='O', type=int, default=default['operatorNumber'], help='number of operators')
+parser.add_argument('-t', '--max-time', metavar='T', type=int, default=default['maxTime'], help='maximum time value for exams')
+parser.add_argument('-n', '--seeds', metavar='N', type=int, default=default['seeds'], help='number of generated instances (seeds 1 to N)')
+parser.add_argument('--solver', metavar='SOLVER', type=str, default=default['solver'], choices=['glpk', 'highs'], help='solver used by both backends (defaults to ' + default['solver'] + ')')
+
+args = vars(parser.parse_args())
+
+mismatches = 0
+for s in range(1, args['seeds'] + 1):
+    instance = Instance()
+    instance.istantiateWithRandomValues({
+        'patientNumber': args['patients'],
+        'examNumber': args['exams'],
+        'operatorNumber': args['operators'],
+        'maxTime': args['max_time'],
+        'usePackets': True,
+        'requestFullness': 0.5,
+        'operatorFullness': 0.5,
+        'seed': s
+    })
+
+    start = perf_counter()
+    problem = Problem(instance)
+    pyomoBuildTime = perf_counter() - start
+    problem.solve(args['solver'])
+    pyomoObjective = int(round(value(problem.model.objective)))
+
+    start = perf_counter()
+    matrixProblem = MatrixProblem(instance)
+    matrixBuildTime = perf_counter() - start
+    matrixProblem.solve(args['solver'])
+
+    result = 'ok' if pyomoObjective == matrixProblem.objective else 'MISMATCH'
+    if pyomoObjective != matrixProblem.objective:
+        mismatches += 1
+    print('seed ' + str(s) + ': pyomo ' + str(pyomoObjective) + ' (build ' + format(pyomoBuildTime, '.3f') + 's), matrix ' +
+        str(matrixProblem.objective) + ' (build ' + format(matrixBuildTime, '.3f') + 's) ' + result)
+
+exit(1 if mismatches > 0 else 0)
@@ -0,0 +1,60 @@
+from argparse import ArgumentParser
+from time import perf_counter
+from Instance import Instance
+from Problem import Problem
+from TimeIndexedProblem import TimeIndexedProblem
+from pyomo.environ import Var, Constraint
+
+if __name__ != '__main__':
+    exit(0)
+
+default = {
+    'patientNumber': 10,
+    'examNumber': 6,
+    'operatorNumber': 7,
+    'maxTime': 100,
+    'seeds': 5,
+    'solver': 'glpk',
+    'timeLimit': 60,
+}
+
+formulations = {
+    'bigm': Problem,
+    'timeindexed': TimeIndexedProblem,
+}
+
+parser = ArgumentParser(description='Program that compares the big-M and the time-indexed formulations on generated instances')
+parser.add_argument('-p', '--patients', metavar='P', type=int, default=default['patientNumber'], help='number of patients')
+parser.add_argument('-e', '--exams', metavar='E', type=int, default=default['examNumber'], help='number of exams')
+parser.add_argument('-o', '--operators', metavar='O', type=int, default=default['operatorNumber'], help='number of operators')
+parser.add_argument('-t', '--max-time', metavar='T', type=int, default=default['maxTime'], help='maximum time value for exams')
+parser.add_argument('-n', '--seeds', metavar='N', type=int, default=default['seeds'], help='number of generated instances (seeds 1 to N)')
+parser.add_argument('--solver', metavar='SOLVER', type=str, default=default['solver'], help='solver used by both formulations (defaults to ' + default['solver'] + ')')
+parser.add_argument('--time-limit', metavar='SECONDS', type=float, default=default['timeLimit'], help='time limit of every solve (defaults to ' + str(default['timeLimit']) + ')')
+
+args = vars(parser.parse_args())
+
+print('seed,formulation,variables,constraints,buildTime,solveTime,objective,bound,gap')
+for s in range(1, args['seeds'] + 1):
+    instance = Instance()
+    instance.istantiateWithRandomValues({
+        'patientNumber': args['patients'],
+        'examNumber': args['exams'],
+        'operatorNumber': args['operators'],
+        'maxTime': args['max_time'],
+        'usePackets': True,
+        'requestFullness': 0.5,
+        'operatorFullness': 0.5,
+        'seed': s
+    })
+
+    for name, formulation in formulations.items():
+        start = perf_counter()
+        problem = formulation(instance)
+        buildTime = perf_counter() - start
+        variables = sum(1 for _ in problem.model.component_data_objects(Var))
+        constraints = sum(1 for _ in problem.model.component_data_objects(Constraint))
+        problem.solve(args['solver'], timeLimit=args['time_limit'])
+        statistics = problem.statistics
+        print(','.join(str(field) for field in [s, name, variables, constraints, format(buildTime, '.3f'), format(statistics['solveTime'], '.3f'),
+            statistics['objective'], statistics['bound'], statistics['gap']]))
@@ -0,0 +1,23 @@
+from argparse import ArgumentParser
+from Instance import Instance
+
+if __name__ != '__main__':
+    exit(0)
+
+parser = ArgumentParser(description='Program that converts instances between the JSON and the binary (.bin) formats')
+parser.add_argument('input', metavar='INPUT', type=str, help='instance file to read, binary if it ends with .bin and JSON otherwise')
+parser.add_argument('output', metavar='OUTPUT', type=str, help='instance file to write, binary if it ends with .bin and JSON otherwise')
+parser.add_argument('--compact', action='store_true', help='write the JSON on a single line, without indentation')
+
+args = vars(parser.parse_args())
+
+instance = Instance()
+if args['input'].endswith('.bin'):
+    instance.loadFromBinaryFile(args['input'])
+else:
+    instance.loadFromJSONFile(args['input'])
+
+if args['output'].endswith('.bin'):
+    instance.printToBinaryFile(args['output'])
+else:
+    instance.printToJSONFile(args['output'], indent=None if args['compact'] else 4)
@@ -1,5 +1,6 @@
 from argparse import ArgumentParser, ArgumentTypeError
 from Instance import Instance
+from InstanceGenerator import InstanceGenerator
 
 if __name__ != '__main__':
     exit(0)
@@ -38,12 +39,13 @@ parser.add_argument('--use-no-packets', action='store_false', help='flag that re
 parser.add_argument('--req-fullness', metavar='F', type=percentage, default=default['requestFullness'], help='percentage of fullness of the request matrix')
 parser.add_argument('--op-fullness', metavar='G', type=percentage, default=default['operatorFullness'], help='percentage of fullness of the operator matrix')
 parser.add_argument('-s', '--seed', metavar='S', type=int, default=default['seed'], help='seed for the pseudo-random generator')
+parser.add_argument('--compact', action='store_true', help='write the JSON on a single line, without indentation')
+parser.add_argument('--stream', action='store_true', help='write the JSON one patient at a time, without keeping the instance in memory, for instances with many patients (the same file as without it)')
 parser.add_argument('-f', '--file', metavar='FILE', type=str, default=default['filename'], help='destination file for the output (defaults to ' + default['filename'] + ')')
 
 args = vars(parser.parse_args())
 
-instance = Instance()
-instance.istantiateWithRandomValues({
+options = {
     'patientNumber': args['patients'],
     'examNumber': args['exams'],
     'operatorNumber': args['operators'],
@@ -52,5 +54,11 @@ instance.istantiateWithRandomValues({
     'requestFullness': args['req_fullness'],
     'operatorFullness': args['op_fullness'],
     'seed': args['seed']
-})
-instance.printToJSONFile(args['file'])
\ No newline at end of file
+}
+
+if args['stream']:
+    InstanceGenerator(options).writeJSONFile(args['file'], indent=None if args['compact'] else 4)
+else:
+    instance = Instance()
+    instance.istantiateWithRandomValues(options)
+    instance.printToJSONFile(args['file'], indent=None if args['compact'] else 4)
\ No newline at end of file
@@ -1,26 +1,204 @@
 from argparse import ArgumentParser
+from contextlib import nullcontext
+import cProfile
+import os
 from Instance import Instance
 from Problem import Problem
+from MatrixProblem import MatrixProblem, matrixSolvers
+from TimeIndexedProblem import TimeIndexedProblem
+from Heuristic import Heuristic
+from NeighbourhoodSearch import NeighbourhoodSearch
+from Decomposition import Decomposition
+from Portfolio import Portfolio
+from Validator import Validator
+from Profiler import Profiler
+from Presolve import Presolve
+from RollingHorizon import RollingHorizon
 
 if __name__ != '__main__':
     exit(0)
 
 default = {
     'filename': 'instance.json',
+    'backend': 'pyomo',
+    'formulation': 'bigm',
+    'solver': 'glpk',
+    'neighbourhoodSize': 10,
+    'portfolioTimeLimit': 60,
 }
 
 parser = ArgumentParser(description='Program that solve instances of the problem')
 parser.add_argument('-v', '--version', action='version', version='%(prog)s 1.0')
-parser.add_argument('-f', '--file', metavar='FILE', type=str, default=default['filename'], help='file with the JSON instance (defaults to ' + default['filename'] + ')')
+parser.add_argument('-f', '--file', metavar='FILE', type=str, default=default['filename'], help='file with the JSON instance, or the binary one if it ends with .bin (defaults to ' + default['filename'] + ')')
+parser.add_argument('--backend', type=str, default=default['backend'], choices=['pyomo', 'matrix'], help='model builder: pyomo expressions or sparse matrices written as MPS (defaults to ' + default['backend'] + ')')
+parser.add_argument('--formulation', type=str, default=default['formulation'], choices=['bigm', 'timeindexed'], help='pyomo model: start times with big-M disjunctions or time-indexed start variables (defaults to ' + default['formulation'] + ')')
+parser.add_argument('--solver', metavar='SOLVER', type=str, default=default['solver'], help='Pyomo solver name (glpk, cbc, highs, appsi_highs, ...) or heuristic for the greedy list-scheduling heuristic (defaults to ' + default['solver'] + ')')
+parser.add_argument('--warm-start', action='store_true', help='start the MILP from the schedule found by the heuristic')
+parser.add_argument('--lns', metavar='SECONDS', type=float, help='improve the heuristic schedule with large neighbourhood search for the given time budget')
+parser.add_argument('--neighbourhood-size', metavar='N', type=int, default=default['neighbourhoodSize'], help='scheduled requests freed at every LNS round (defaults to ' + str(default['neighbourhoodSize']) + ')')
+parser.add_argument('--statistics', action='store_true', help='print solve time, time to the first incumbent and final gap')
+parser.add_argument('--decompose', action='store_true', help='solve every independent group of patients and operators as a separate model')
+parser.add_argument('--workers', metavar='N', type=int, help='processes solving the groups of --decompose at the same time (defaults to the number of CPUs)')
+parser.add_argument('--portfolio', metavar='CONFIG', type=str, nargs='*', help='race the given configurations (heuristic or FORMULATION:SOLVER, e.g. bigm:glpk timeindexed:appsi_highs) in separate processes and keep the best schedule (defaults to the heuristic and both formulations with every installed solver)')
+parser.add_argument('--solution', metavar='FILE', type=str, help='write the solution (timelines of operators and patients, unscheduled requests, utilization) to a JSON file')
+parser.add_argument('--validate', action='store_true', help='check the schedule against the instance and print every violation')
+parser.add_argument('--warnings', type=str, default='print', choices=['print', 'aggregate', 'skip'], help='how to report the exams that operators can do but nobody requests: one line each, one line in total or nothing (defaults to print)')
+parser.add_argument('--time-limit', metavar='SECONDS', type=float, help='time limit of the MILP solver (defaults to none, or to ' + str(default['portfolioTimeLimit']) + ' with --portfolio)')
+parser.add_argument('--presolve', action='store_true', help='drop the requests, packets, operators and exams that cannot be part of any schedule and tighten the start times before building the model')
+parser.add_argument('--symmetry-breaking', action='store_true', help='order the operators with the same window and exams by workload, and the patients with the same requests by scheduled exams')
+parser.add_argument('--rolling-horizon', action='store_true', help='solve the time span of the operators in overlapping windows, one model each, keeping the assignments that start before the next window')
+parser.add_argument('--window', metavar='LENGTH', type=int, help='length of the windows of --rolling-horizon (defaults to the longest operator window)')
+parser.add_argument('--overlap', metavar='LENGTH', type=int, help='overlap of consecutive windows of --rolling-horizon (defaults to half a window)')
+parser.add_argument('--mip-gap', metavar='GAP', type=float, help='relative gap at which the MILP solver stops (e.g. 0.05 for 5%%)')
+parser.add_argument('--threads', metavar='N', type=int, help='threads of the MILP solver (glpk has only one)')
+parser.add_argument('--progress', action='store_true', help='print every improving schedule found by the MILP solver as soon as it is found')
+parser.add_argument('--stop-at', metavar='N', type=int, help='stop the MILP solver as soon as it finds a schedule with at least N requests (only appsi_highs can be stopped)')
+parser.add_argument('--profile', metavar='FILE', type=str, help='write to a JSON file the time of every phase; with the big-M pyomo model also the time of every builder, the rows of every constraint grouped by index set and the status and timing of the solver')
+parser.add_argument('--cprofile', metavar='FILE', type=str, help='write cProfile statistics of the whole run to a file (readable with pstats)')
 
 args = vars(parser.parse_args())
 
-instance = Instance()
-instance.loadFromJSONFile(args['file'])
+# the solving modes are mutually exclusive and each one accepts only some of the options;
+# without any of them the pyomo model of --formulation is solved with --solver
+modes = {
+    'portfolio': ('--portfolio', args['portfolio'] is not None, ['statistics', 'time_limit']),
+    'heuristic': ('--solver heuristic', args['solver'] == 'heuristic', []),
+    'decompose': ('--decompose', args['decompose'], ['formulation', 'time_limit', 'workers']),
+    'lns': ('--lns', args['lns'] is not None, []),
+    'rollingHorizon': ('--rolling-horizon', args['rolling_horizon'], ['statistics', 'time_limit', 'window', 'overlap']),
+    'matrix': ('--backend matrix', args['backend'] == 'matrix', ['time_limit']),
+    'pyomo': (None, False, ['formulation', 'warm_start', 'statistics', 'time_limit', 'mip_gap', 'threads', 'progress', 'stop_at', 'presolve', 'symmetry_breaking']),
+}
+options = {
+    'formulation': ('--formulation timeindexed', args['formulation'] != 'bigm'),
+    'warm_start': ('--warm-start', args['warm_start']),
+    'statistics': ('--statistics', args['statistics']),
+    'time_limit': ('--time-limit', args['time_limit'] is not None),
+    'mip_gap': ('--mip-gap', args['mip_gap'] is not None),
+    'threads': ('--threads', args['threads'] is not None),
+    'progress': ('--progress', args['progress']),
+    'stop_at': ('--stop-at', args['stop_at'] is not None),
+    'presolve': ('--presolve', args['presolve']),
+    'symmetry_breaking': ('--symmetry-breaking', args['symmetry_breaking']),
+    'workers': ('--workers', args['workers'] is not None),
+    'window': ('--window', args['window'] is not None),
+    'overlap': ('--overlap', args['overlap'] is not None),
+}
+selected = [name for name, (flag, isSelected, accepted) in modes.items() if isSelected]
+if len(selected) > 1:
+    parser.error(' and '.join(modes[name][0] for name in selected) + ' cannot be used together')
+mode = selected[0] if len(selected) > 0 else 'pyomo'
+for name, (flag, isGiven) in options.items():
+    if isGiven and name not in modes[mode][2]:
+        if mode == 'pyomo':
+            parser.error(flag + ' needs ' + ' or '.join(modes[other][0] for other in modes if name in modes[other][2]))
+        parser.error(flag + ' cannot be used with ' + modes[mode][0])
+if mode == 'matrix' and args['solver'] not in matrixSolvers:
+    parser.error('--backend matrix needs --solver ' + ' or '.join(matrixSolvers))
+if args['symmetry_breaking'] and args['formulation'] != 'bigm':
+    parser.error('--symmetry-breaking needs the big-M model')
+if args['stop_at'] is not None and args['solver'] != 'appsi_highs':
+    parser.error('--stop-at needs the appsi_highs solver')
+
+# the solvers capture the standard error too, so the progress is written on a copy of it
+progressOutput = os.fdopen(os.dup(2), 'w') if args['progress'] else None
+def callback(time, incumbent, bound):
+    if progressOutput is not None:
+        print(format(time, '.2f') + 's: ' + str(int(incumbent)) + ' requests' + ('' if bound is None else ', bound ' + str(bound)), file=progressOutput, flush=True)
+    return args['stop_at'] is not None and incumbent >= args['stop_at']
+
+profiler = None if args['profile'] is None else Profiler()
+def stage(name):
+    # without --profile the stages cost nothing
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name)
+
+if args['cprofile'] is not None:
+    cProfiler = cProfile.Profile()
+    cProfiler.enable()
 
-problem = Problem(instance)
+with stage('load'):
+    instance = Instance()
+    if args['file'].endswith('.bin'):
+        instance.loadFromBinaryFile(args['file'], warnings=args['warnings'])
+    else:
+        instance.loadFromJSONFile(args['file'], warnings=args['warnings'])
+
+presolve = None
+with stage('build'):
+    if args['presolve']:
+        presolve = Presolve(instance)
+        presolve.printReductions()
+        instance = presolve.instance
+
+    if args['portfolio'] is not None:
+        problem = Portfolio(instance)
+    elif args['solver'] == 'heuristic':
+        problem = Heuristic(instance)
+    elif args['decompose']:
+        problem = Decomposition(instance)
+    elif args['lns'] is not None:
+        problem = NeighbourhoodSearch(instance)
+    elif args['rolling_horizon']:
+        problem = RollingHorizon(instance)
+    elif args['backend'] == 'matrix':
+        problem = MatrixProblem(instance)
+    elif args['formulation'] == 'timeindexed':
+        problem = TimeIndexedProblem(instance)
+    else:
+        problem = Problem(instance, profiler, None if presolve is None else presolve.timeBounds, args['symmetry_breaking'])
+
+    if args['warm_start']:
+        heuristic = Heuristic(instance)
+        heuristic.solve()
+        problem.setInitialSchedule(heuristic.schedule)
+        del heuristic
 
 del instance
 
-problem.solve()
-problem.printResults()
\ No newline at end of file
+with stage('solve'):
+    if args['portfolio'] is not None:
+        timeLimit = default['portfolioTimeLimit'] if args['time_limit'] is None else args['time_limit']
+        problem.solve(args['portfolio'] if len(args['portfolio']) > 0 else None, timeLimit=timeLimit)
+    elif args['solver'] == 'heuristic':
+        problem.solve()
+    elif args['decompose']:
+        problem.solve(args['solver'], formulation=args['formulation'], workers=args['workers'], timeLimit=args['time_limit'])
+    elif args['lns'] is not None:
+        problem.solve(args['solver'], timeBudget=args['lns'], neighbourhoodSize=args['neighbourhood_size'])
+    elif args['rolling_horizon']:
+        problem.solve(args['solver'], windowLength=args['window'], overlap=args['overlap'], timeLimit=args['time_limit'])
+    elif args['backend'] == 'matrix':
+        problem.solve(args['solver'], timeLimit=args['time_limit'])
+    else:
+        problem.solve(args['solver'], timeLimit=args['time_limit'], mipGap=args['mip_gap'], threads=args['threads'],
+            callback=callback if args['progress'] or args['stop_at'] is not None else None)
+
+with stage('output'):
+    if presolve is None:
+        problem.printResults()
+        getSolution = problem.getSolution
+    else:
+        # the schedule is shown on the original instance, together with the dropped requests
+        def getSolution():
+            return presolve.getSolution(problem.getSchedule())
+        if problem.isSolved:
+            getSolution().printResults()
+    if args['solution'] is not None:
+        getSolution().printToJSONFile(args['solution'])
+    if args['validate']:
+        solution = getSolution()
+        validator = Validator(solution.instance)
+        validator.validate(solution.schedule)
+        validator.printViolations()
+    # the portfolio always reports which configuration won
+    if args['portfolio'] is not None or args['statistics']:
+        problem.printStatistics()
+
+if args['cprofile'] is not None:
+    cProfiler.disable()
+    cProfiler.dump_stats(args['cprofile'])
+if profiler is not None:
+    profiler.setInfo('arguments', args)
+    profiler.printToJSONFile(args['profile'])
\ No newline at end of file
@@ -0,0 +1,51 @@
+from argparse import ArgumentParser
+from glob import glob
+from os import path
+import json
+import sys
+from Batch import solveFiles
+
+if __name__ != '__main__':
+    exit(0)
+
+default = {
+    'formulation': 'bigm',
+    'solver': 'glpk',
+}
+
+parser = ArgumentParser(description='Program that solves many instance files in parallel and writes one JSON line per instance')
+parser.add_argument('inputs', metavar='INPUT', type=str, nargs='+', help='instance JSON file, directory containing them or glob pattern')
+parser.add_argument('--output', metavar='FILE', type=str, help='JSONL file with the results (defaults to the standard output)')
+parser.add_argument('--workers', metavar='N', type=int, help='processes solving instances at the same time (defaults to the number of CPUs)')
+parser.add_argument('--formulation', type=str, default=default['formulation'], choices=['bigm', 'timeindexed'], help='pyomo model (defaults to ' + default['formulation'] + ')')
+parser.add_argument('--solver', metavar='SOLVER', type=str, default=default['solver'], help='Pyomo solver name or heuristic (defaults to ' + default['solver'] + ')')
+parser.add_argument('--time-limit', metavar='SECONDS', type=float, help='time limit of every solve')
+
+args = vars(parser.parse_args())
+
+fileNames = []
+for pattern in args['inputs']:
+    if path.isdir(pattern):
+        fileNames += sorted(glob(path.join(pattern, '*.json')))
+    elif path.isfile(pattern):
+        fileNames.append(pattern)
+    else:
+        fileNames += sorted(glob(pattern))
+if len(fileNames) == 0:
+    parser.error('no instance file found')
+
+output = sys.stdout if args['output'] is None else open(args['output'], 'w')
+
+failed = 0
+unsolved = 0
+for record in solveFiles(fileNames, args['solver'], args['formulation'], args['time_limit'], args['workers']):
+    if record['status'] == 'error':
+        failed += 1
+    elif record['status'] == 'nosolution':
+        unsolved += 1
+    output.write(json.dumps(record) + '\n')
+    output.flush()
+
+if output is not sys.stdout:
+    output.close()
+print(str(len(fileNames) - failed - unsolved) + ' instances solved, ' + str(unsolved) + ' without a schedule, ' + str(failed) + ' failed', file=sys.stderr)
@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+import pytest
+from pyomo.environ import SolverFactory
+
+# the modules of the repository are imported by name, as the scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Instance import Instance
+
+def getSolverName():
+    # the first MILP solver installed among the ones that both backends support
+    for solverName in ['glpk', 'highs']:
+        if SolverFactory(solverName).available(exception_flag=False):
+            return solverName
+    return None
+
+@pytest.fixture
+def solverName():
+    name = getSolverName()
+    if name is None:
+        pytest.skip('no MILP solver installed')
+    return name
+
+@pytest.fixture
+def randomInstance():
+    def f(seed, patientNumber=6, examNumber=4, operatorNumber=4, usePackets=True, maxTime=40):
+        instance = Instance()
+        instance.istantiateWithRandomValues({
+            'patientNumber': patientNumber,
+            'examNumber': examNumber,
+            'operatorNumber': operatorNumber,
+            'maxTime': maxTime,
+            'usePackets': usePackets,
+            'requestFullness': 0.5,
+            'operatorFullness': 0.5,
+            'seed': seed
+        })
+        return instance
+    return f
+
+@pytest.fixture
+def instanceFromData(tmp_path):
+    def f(data):
+        fileName = str(tmp_path / 'instance.json')
+        with open(fileName, 'w') as file:
+            json.dump(data, file)
+        instance = Instance()
+        instance.loadFromJSONFile(fileName, warnings='skip')
+        return instance
+    return f
+
+@pytest.fixture
+def smallInstance(instanceFromData):
+    # two patients, one of them with a packet of two exams on different operators
+    return instanceFromData({
+        'requests': {
+            'Aldo': {'alpha': 5, 'beta': 5},
+            'Barbara': {'alpha': 5}
+        },
+        'operatorData': {
+            'A': {'startTime': 1, 'endTime': 20, 'canDo': ['alpha']},
+            'B': {'startTime': 10, 'endTime': 30, 'canDo': ['beta']}
+        },
+        'packets': {
+            'Aldo': [['alpha', 'beta']],
+            'Barbara': [['alpha']]
+        }
+    })
@@ -0,0 +1,55 @@
+import shutil
+import pytest
+from pyomo.environ import value
+from MatrixProblem import MatrixProblem
+from Problem import Problem
+from Validator import Validator
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_matrix_backend_reaches_the_pyomo_optimum(seed, solverName, randomInstance):
+    instance = randomInstance(seed)
+    problem = Problem(instance)
+    problem.solve(solverName)
+    matrixProblem = MatrixProblem(instance)
+    matrixProblem.solve(solverName)
+
+    assert problem.statistics['termination'] == 'optimal'
+    assert matrixProblem.objective == int(round(value(problem.model.objective)))
+    assert matrixProblem.objective == len(matrixProblem.getSchedule())
+    validator = Validator(instance)
+    assert validator.validate(matrixProblem.getSchedule()), validator.violations
+    assert validator.validate(problem.getSchedule()), validator.violations
+
+def test_matrix_backend_without_packets(solverName, randomInstance):
+    instance = randomInstance(4, usePackets=False)
+    problem = Problem(instance)
+    problem.solve(solverName)
+    matrixProblem = MatrixProblem(instance)
+    matrixProblem.solve(solverName)
+    assert matrixProblem.objective == problem.statistics['objective']
+
+def test_mps_file_has_the_pyomo_optimum(tmp_path, solverName, randomInstance):
+    highspy = pytest.importorskip('highspy')
+    instance = randomInstance(2)
+    problem = Problem(instance)
+    problem.solve(solverName)
+    fileName = str(tmp_path / 'model.mps')
+    MatrixProblem(instance).writeMPSFile(fileName)
+    highs = highspy.Highs()
+    highs.setOptionValue('output_flag', False)
+    highs.readModel(fileName)
+    highs.run()
+    # the MPS objective is a minimization of -sum(x)
+    assert -highs.getInfo().objective_function_value == problem.statistics['objective']
+
+def test_missing_glpsol_is_reported(monkeypatch, randomInstance):
+    monkeypatch.setattr(shutil, 'which', lambda name: None)
+    with pytest.raises(Exception, match='glpsol not found'):
+        MatrixProblem(randomInstance(1)).solve('glpk')
+
+def test_highs_reports_the_termination(randomInstance):
+    pytest.importorskip('scipy')
+    matrixProblem = MatrixProblem(randomInstance(1))
+    matrixProblem.solve('highs', timeLimit=60)
+    assert matrixProblem.termination == 'optimal'
+    assert matrixProblem.isSolved
@@ -0,0 +1,61 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+import Batch
+from Batch import getErrorRecord, getStatus, solveFile, solveFiles
+
+def test_solved_file(tmp_path, solverName, randomInstance):
+    fileName = str(tmp_path / 'instance.json')
+    randomInstance(2).printToJSONFile(fileName)
+    record = solveFile(fileName, solverName)
+    assert record['error'] is None
+    assert record['status'] == 'optimal'
+    assert record['termination'] == 'optimal'
+    assert record['objective'] == len(record['schedule'])
+
+def test_heuristic_file(tmp_path, randomInstance):
+    fileName = str(tmp_path / 'instance.json')
+    randomInstance(2).printToJSONFile(fileName)
+    record = solveFile(fileName, 'heuristic')
+    assert record['status'] == 'feasible'
+    assert record['objective'] == len(record['schedule'])
+
+def test_missing_file(tmp_path):
+    record = solveFile(str(tmp_path / 'missing.json'))
+    assert record['status'] == 'error'
+    assert record['error'].startswith('FileNotFoundError')
+
+def test_status():
+    # a solve without a schedule is not a feasible schedule with no exams
+    assert getStatus(False, 'maxTimeLimit', None, 10) == 'nosolution'
+    assert getStatus(True, 'maxTimeLimit', 5, 10) == 'feasible'
+    assert getStatus(True, 'maxTimeLimit', 5, 5.0) == 'optimal'
+    assert getStatus(True, 'optimal', 5, None) == 'optimal'
+    assert getStatus(True, None, 5, None) == 'feasible'
+
+def test_error_record_of_a_dead_worker():
+    record = getErrorRecord('instance.json', BrokenProcessPool('a child process terminated abruptly'))
+    assert record['file'] == 'instance.json'
+    assert record['status'] == 'error'
+    assert record['error'] == 'BrokenProcessPool: a child process terminated abruptly'
+
+def test_a_dying_process_loses_only_its_file(tmp_path, monkeypatch, randomInstance):
+    fileNames = []
+    for seed in range(7):
+        fileName = str(tmp_path / ('instance' + str(seed) + '.json'))
+        randomInstance(seed).printToJSONFile(fileName)
+        fileNames.append(fileName)
+    crashing = fileNames[3]
+    def solveOrCrash(fileName, *args):
+        if fileName == crashing:
+            os._exit(1)
+        return solveFile(fileName, *args)
+    monkeypatch.setattr(Batch, 'solveFile', solveOrCrash)
+
+    records = {record['file']: record for record in solveFiles(fileNames, 'heuristic', workers=3)}
+    assert sorted(records) == sorted(fileNames)
+    assert records[crashing]['status'] == 'error'
+    assert records[crashing]['error'] == 'ChildProcessError: the process solving the file exited with code 1'
+    for fileName in fileNames:
+        if fileName != crashing:
+            assert records[fileName]['status'] == 'feasible'
+            assert records[fileName]['objective'] > 0
@@ -0,0 +1,75 @@
+import pytest
+from Instance import Instance
+from InstanceMatrix import InstanceMatrix
+
+@pytest.mark.parametrize('usePackets', [True, False])
+def test_binary_round_trip_equals_json_load(usePackets, tmp_path, randomInstance):
+    instance = randomInstance(5, patientNumber=15, examNumber=8, operatorNumber=6, usePackets=usePackets)
+    jsonFile = str(tmp_path / 'instance.json')
+    binaryFile = str(tmp_path / 'instance.bin')
+    instance.printToJSONFile(jsonFile)
+    instance.printToBinaryFile(binaryFile)
+
+    fromJSON = Instance()
+    fromJSON.loadFromJSONFile(jsonFile, warnings='skip')
+    fromBinary = Instance()
+    fromBinary.loadFromBinaryFile(binaryFile, warnings='skip')
+
+    assert fromBinary.patients == fromJSON.patients
+    assert fromBinary.exams == fromJSON.exams
+    assert fromBinary.operators == fromJSON.operators
+    assert fromBinary.requests == fromJSON.requests
+    assert fromBinary.operatorData == fromJSON.operatorData
+    assert fromBinary.packets == fromJSON.packets
+    assert fromBinary.options == fromJSON.options
+    assert fromBinary.index == fromJSON.index
+
+def test_exams_nobody_requests_survive(tmp_path, instanceFromData):
+    instance = instanceFromData({
+        'requests': {'Aldo': {'alpha': 3}},
+        'operatorData': {'A': {'startTime': 1, 'endTime': 10, 'canDo': ['omega', 'alpha']}},
+        'packets': {}
+    })
+    binaryFile = str(tmp_path / 'instance.bin')
+    instance.printToBinaryFile(binaryFile)
+    fromBinary = Instance()
+    fromBinary.loadFromBinaryFile(binaryFile, warnings='skip')
+    assert sorted(fromBinary.operatorData['A']['canDo']) == ['alpha', 'omega']
+    assert fromBinary.warnings == instance.warnings
+
+def test_not_a_binary_instance(tmp_path):
+    fileName = str(tmp_path / 'instance.bin')
+    with open(fileName, 'wb') as f:
+        f.write(bytes(64))
+    with pytest.raises(Exception):
+        Instance().loadFromBinaryFile(fileName)
+
+def test_the_loaded_matrix_is_kept(tmp_path, randomInstance):
+    instance = randomInstance(2, patientNumber=10, examNumber=6)
+    binaryFile = str(tmp_path / 'instance.bin')
+    instance.printToBinaryFile(binaryFile)
+    fromBinary = Instance()
+    fromBinary.loadFromBinaryFile(binaryFile, warnings='skip')
+    matrix = fromBinary.matrix
+    assert fromBinary.getMatrix() is matrix
+    # one entry per request, not per patient and exam
+    assert len(matrix.requestDurations) == sum(len(exams) for exams in instance.requests.values())
+    assert matrix.getChiIndexes() == instance.getMatrix().getChiIndexes()
+
+def test_arrays_are_views_on_the_mapped_file(tmp_path, randomInstance):
+    instance = randomInstance(3, patientNumber=10, examNumber=6)
+    binaryFile = str(tmp_path / 'instance.bin')
+    instance.printToBinaryFile(binaryFile)
+    with InstanceMatrix() as matrix:
+        matrix.loadFromBinaryFile(binaryFile)
+        assert not matrix.requestDurations.flags.owndata
+        assert not matrix.requestDurations.flags.writeable
+        assert matrix.toDicts()['requests'] == instance.requests
+        # writing over the mapped file reads the arrays first
+        matrix.printToBinaryFile(binaryFile)
+        assert matrix.getChiIndexes() == instance.getMatrix().getChiIndexes()
+    assert matrix.buffer is None
+    assert len(matrix.requestDurations) == 0
+    fromBinary = Instance()
+    fromBinary.loadFromBinaryFile(binaryFile, warnings='skip')
+    assert fromBinary.requests == instance.requests
@@ -0,0 +1,28 @@
+import pytest
+from pyomo.environ import SolverFactory
+from Problem import Problem, subscribeInterrupt
+from SolverLog import SolverLog
+from Validator import Validator
+
+def test_callback_stops_highs(randomInstance):
+    if not SolverFactory('appsi_highs').available(exception_flag=False):
+        pytest.skip('appsi_highs not installed')
+    instance = randomInstance(1, patientNumber=10, examNumber=6, operatorNumber=6, maxTime=60)
+    problem = Problem(instance)
+    problem.solve('appsi_highs', callback=lambda time, incumbent, bound: incumbent >= 1)
+    assert problem.statistics['termination'] == 'userInterrupt'
+    assert problem.isSolved
+    assert problem.statistics['objective'] >= 1
+    validator = Validator(instance)
+    assert validator.validate(problem.getSchedule()), validator.violations
+
+class SolverWithoutHighs:
+    def set_instance(self, model):
+        pass
+
+def test_missing_interrupt_hook_only_warns(randomInstance):
+    log = SolverLog(lambda time, incumbent, bound: True)
+    with pytest.warns(UserWarning):
+        assert not subscribeInterrupt(SolverWithoutHighs(), Problem(randomInstance(1)).model, log)
+    log.addIncumbent(3)
+    assert log.stopRequested and not log.isInterrupted
@@ -0,0 +1,63 @@
+import os
+import pytest
+import Decomposition
+from Decomposition import Decomposition as DecompositionSolver
+from Problem import Problem
+from Validator import Validator
+
+# the workers receive the functions by name, so the replacements live at module level
+parentProcess = os.getpid()
+solveComponent = Decomposition.solveComponent
+
+def failInWorkers(*args):
+    if os.getpid() != parentProcess:
+        raise RuntimeError('worker failed')
+    return solveComponent(*args)
+
+def findNoSchedule(*args):
+    return None, {'termination': 'maxTimeLimit'}
+
+@pytest.fixture
+def separateInstance(randomInstance, instanceFromData):
+    # two random instances with different names, so that nothing links them
+    data = {'requests': {}, 'operatorData': {}, 'packets': {}}
+    for seed, prefix in [(1, 'first'), (2, 'second')]:
+        instance = randomInstance(seed)
+        for patient, exams in instance.requests.items():
+            data['requests'][prefix + patient] = {prefix + exam: duration for exam, duration in exams.items()}
+        for operator, operatorData in instance.operatorData.items():
+            data['operatorData'][prefix + operator] = dict(operatorData, canDo=[prefix + exam for exam in operatorData['canDo']])
+        for patient, packets in instance.packets.items():
+            data['packets'][prefix + patient] = [[prefix + exam for exam in packet] for packet in packets]
+    return instanceFromData(data)
+
+def test_merged_schedule_reaches_the_monolithic_optimum(solverName, separateInstance):
+    problem = Problem(separateInstance)
+    problem.solve(solverName)
+    decomposition = DecompositionSolver(separateInstance)
+    decomposition.solve(solverName, workers=2)
+
+    assert len(decomposition.components) >= 2
+    assert decomposition.failures == []
+    assert decomposition.objective == problem.statistics['objective']
+    validator = Validator(separateInstance)
+    assert validator.validate(decomposition.schedule), validator.violations
+
+def test_a_failed_worker_is_solved_again(solverName, monkeypatch, separateInstance):
+    monkeypatch.setattr(Decomposition, 'solveComponent', failInWorkers)
+    decomposition = DecompositionSolver(separateInstance)
+    with pytest.warns(UserWarning, match='worker failed'):
+        decomposition.solve(solverName, workers=2)
+    assert len(decomposition.failures) == len(decomposition.statistics)
+    problem = Problem(separateInstance)
+    problem.solve(solverName)
+    assert decomposition.objective == problem.statistics['objective']
+
+def test_a_component_without_schedule_is_reported(solverName, monkeypatch, separateInstance):
+    monkeypatch.setattr(Decomposition, 'solveComponent', findNoSchedule)
+    decomposition = DecompositionSolver(separateInstance)
+    with pytest.warns(UserWarning, match='no schedule found'):
+        decomposition.solve(solverName, workers=2)
+    assert decomposition.schedule == {}
+    assert len(decomposition.failures) == len(decomposition.statistics)
+    assert all('maxTimeLimit' in failure['reason'] for failure in decomposition.failures)
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+import pytest
+from Instance import Instance
+
+repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def generate(fileName, *arguments):
+    subprocess.run([sys.executable, os.path.join(repository, 'generateInstance.py'), '--file', fileName, *arguments], check=True)
+    with open(fileName, 'rb') as f:
+        return f.read()
+
+@pytest.mark.parametrize('arguments', [
+    [],
+    ['--compact'],
+    ['--use-no-packets', '--compact'],
+    ['--patients', '40', '--exams', '30', '--operators', '30', '--seed', '-3'],
+])
+def test_stream_writes_the_same_file(tmp_path, arguments):
+    streamed = generate(str(tmp_path / 'streamed.json'), '--stream', *arguments)
+    assert streamed == generate(str(tmp_path / 'instance.json'), *arguments)
+
+def test_streamed_file_loads(tmp_path):
+    fileName = str(tmp_path / 'streamed.json')
+    generate(fileName, '--stream', '--patients', '40', '--max-time', '60', '--seed', '5')
+    instance = Instance()
+    instance.loadFromJSONFile(fileName, warnings='skip')
+    generated = Instance()
+    generated.istantiateWithRandomValues({'patientNumber': 40, 'examNumber': 6, 'operatorNumber': 7, 'maxTime': 60,
+        'usePackets': True, 'requestFullness': 0.5, 'operatorFullness': 0.5, 'seed': 5})
+    assert instance.patients[0] == 'patient0'
+    assert instance.requests == generated.requests
+    assert instance.operatorData == generated.operatorData
+    assert instance.packets == generated.packets
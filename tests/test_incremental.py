@@ -0,0 +1,84 @@
+import pytest
+from copy import deepcopy
+from Problem import Problem
+from Validator import Validator
+
+def solveFromScratch(instance, solverName):
+    problem = Problem(instance)
+    problem.solve(solverName)
+    return problem.statistics['objective']
+
+def checkIncremental(problem, solverName):
+    problem.solve(solverName)
+    validator = Validator(problem.instance)
+    assert validator.validate(problem.getSchedule()), validator.violations
+    assert problem.statistics['objective'] == solveFromScratch(problem.instance, solverName)
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_changes_match_a_new_problem(seed, solverName, randomInstance):
+    instance = randomInstance(seed)
+    problem = Problem(instance)
+    problem.solve(solverName)
+    operator = instance.operators[0]
+    exam = instance.exams[0]
+    patient = instance.patients[0]
+
+    problem.addRequest('Newcomer', exam, 3)
+    checkIncremental(problem, solverName)
+
+    removed = next(iter(instance.requests[patient]))
+    problem.removeRequest(patient, removed)
+    checkIncremental(problem, solverName)
+
+    startTime = instance.operatorData[operator]['startTime']
+    problem.setOperatorWindow(operator, startTime, startTime + 10)
+    checkIncremental(problem, solverName)
+
+    if exam in instance.index['canDo'][operator]:
+        problem.removeCanDo(operator, exam)
+    else:
+        problem.addCanDo(operator, exam)
+    checkIncremental(problem, solverName)
+
+def test_changes_past_the_maximum_time(solverName, randomInstance):
+    instance = randomInstance(3)
+    problem = Problem(instance)
+    problem.solve(solverName)
+    maxTime = instance.options['maxTime']
+
+    # the big-M grows with the horizon instead of requiring a new problem
+    operator = instance.operators[0]
+    problem.setOperatorWindow(operator, maxTime - 5, maxTime + 60)
+    problem.addRequest('Newcomer', instance.exams[0], maxTime + 10)
+    assert problem.model.maxTime.value == maxTime + 60
+    checkIncremental(problem, solverName)
+
+def test_the_instance_of_the_caller_is_not_changed(solverName, randomInstance):
+    instance = randomInstance(1)
+    original = deepcopy((instance.patients, instance.exams, instance.requests, instance.operatorData, instance.packets, instance.index))
+    problem = Problem(instance)
+    patient = instance.patients[0]
+    operator = instance.operators[1]
+    problem.addRequest('Newcomer', instance.exams[0], 3)
+    problem.addRequest(patient, next(exam for exam in instance.exams if exam not in instance.requests[patient]), 4)
+    problem.removeRequest(patient, next(iter(instance.requests[patient])))
+    problem.setOperatorWindow(instance.operators[0], 1, 10)
+    problem.removeCanDo(operator, instance.operatorData[operator]['canDo'][0])
+    problem.addCanDo(operator, next(exam for exam in instance.exams if exam not in instance.index['canDo'][operator]))
+
+    assert (instance.patients, instance.exams, instance.requests, instance.operatorData, instance.packets, instance.index) == original
+    assert problem.instance is not instance
+    assert 'Newcomer' in problem.instance.requests
+    # only the entries that changed are copied
+    assert problem.instance.requests[instance.patients[1]] is instance.requests[instance.patients[1]]
+    checkIncremental(problem, solverName)
+
+def test_objective_follows_the_requests(randomInstance):
+    instance = randomInstance(2)
+    problem = Problem(instance)
+    problem.addRequest('Newcomer', instance.exams[0], 3)
+    patient = instance.patients[0]
+    for exam in list(instance.requests[patient]):
+        problem.removeRequest(patient, exam)
+    terms = set(str(term) for term in problem.model.objective.expr.args)
+    assert terms == set(str(problem.model.x[request]) for request in problem.model.requestIndexes)
@@ -0,0 +1,18 @@
+import json
+from Instance import Instance
+
+def test_aggregate_warnings_count_distinct_exams(tmp_path, capsys):
+    fileName = str(tmp_path / 'instance.json')
+    with open(fileName, 'w') as f:
+        json.dump({
+            'requests': {'Aldo': {'alpha': 3}},
+            'operatorData': {
+                'A': {'startTime': 1, 'endTime': 10, 'canDo': ['alpha', 'omega', 'omega', 'psi']},
+                'B': {'startTime': 1, 'endTime': 10, 'canDo': ['omega']}
+            },
+            'packets': {}
+        }, f)
+    instance = Instance()
+    instance.loadFromJSONFile(fileName, warnings='aggregate')
+    assert len(instance.warnings) == 4
+    assert capsys.readouterr().out == 'found 2 exams done by operators, but non requested by anyone (3 operator and exam pairs)\n'
@@ -0,0 +1,39 @@
+import pytest
+from itertools import combinations
+
+def windowsOverlap(instance, operator1, operator2):
+    operatorData = instance.operatorData
+    return (operatorData[operator1]['startTime'] < operatorData[operator2]['endTime'] and
+        operatorData[operator2]['startTime'] < operatorData[operator1]['endTime'])
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_indexes_match_the_instance(seed, randomInstance):
+    instance = randomInstance(seed, patientNumber=12, examNumber=6, operatorNumber=6)
+    matrix = instance.getMatrix()
+    chiIndexes = matrix.getChiIndexes()
+    examIds = instance.index['examIds']
+    patientIds = instance.index['patientIds']
+
+    assert chiIndexes == [(patient, exam, operator)
+        for (patient, exam), operators in sorted(instance.index['eligibleOperators'].items(), key=lambda item: (patientIds[item[0][0]], examIds[item[0][1]]))
+        for operator in operators]
+    assert set(matrix.getPatientConflictIndexes()) == set(
+        (patient1, exam1, operator1, exam2, operator2) if examIds[exam1] < examIds[exam2] else (patient1, exam2, operator2, exam1, operator1)
+        for (patient1, exam1, operator1), (patient2, exam2, operator2) in combinations(chiIndexes, 2)
+        if patient1 == patient2 and exam1 != exam2 and windowsOverlap(instance, operator1, operator2))
+    assert set(matrix.getOperatorConflictIndexes()) == set(
+        (patient1, exam1, patient2, exam2, operator1)
+        for (patient1, exam1, operator1), (patient2, exam2, operator2) in combinations(chiIndexes, 2)
+        if operator1 == operator2 and patient1 != patient2)
+
+def test_chi_ids_are_computed_once(randomInstance):
+    matrix = randomInstance(1).getMatrix()
+    assert matrix.getChiIds() is matrix.getChiIds()
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_to_dicts_keeps_the_instance(seed, randomInstance):
+    instance = randomInstance(seed, patientNumber=10, examNumber=6)
+    data = instance.getMatrix().toDicts()
+    assert data['requests'] == instance.requests
+    assert data['operatorData'] == instance.operatorData
+    assert data['packets'] == instance.packets
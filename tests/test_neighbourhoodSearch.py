@@ -0,0 +1,26 @@
+from time import perf_counter
+from Heuristic import Heuristic
+from NeighbourhoodSearch import NeighbourhoodSearch
+from Validator import Validator
+
+def test_search_never_worsens_the_start(solverName, randomInstance):
+    instance = randomInstance(3, patientNumber=12, examNumber=5, operatorNumber=4)
+    heuristic = Heuristic(instance)
+    heuristic.solve()
+    search = NeighbourhoodSearch(instance)
+    search.solve(solverName, timeBudget=3, neighbourhoodSize=4, roundTimeLimit=1, initialSchedule=heuristic.schedule, verbose=False)
+
+    assert search.history[0][1] == len(heuristic.schedule)
+    objectives = [objective for _, objective in search.history]
+    assert objectives == sorted(objectives)
+    assert search.objective >= len(heuristic.schedule)
+    validator = Validator(instance)
+    assert validator.validate(search.schedule), validator.violations
+
+def test_search_stops_when_the_budget_is_spent(solverName, randomInstance):
+    instance = randomInstance(3, patientNumber=12, examNumber=5, operatorNumber=4)
+    search = NeighbourhoodSearch(instance)
+    startTime = perf_counter()
+    search.solve(solverName, timeBudget=0, verbose=False)
+    assert perf_counter() - startTime < 1
+    assert search.objective == search.history[0][1]
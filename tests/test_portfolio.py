@@ -0,0 +1,56 @@
+import os
+import subprocess
+import time
+import pytest
+from Portfolio import Portfolio, startProcessGroup, terminateProcessGroup
+from Validator import Validator
+from Workers import getPoolContext
+
+def startSolverProgram(queue):
+    # stands for a worker waiting on glpsol or cbc
+    startProcessGroup()
+    child = subprocess.Popen(['sleep', '60'])
+    queue.put(child.pid)
+    child.wait()
+
+def isRunning(pid):
+    try:
+        with open('/proc/' + str(pid) + '/stat') as f:
+            # zombies are dead, they only wait for their parent
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+@pytest.mark.skipif(not hasattr(os, 'killpg') or not os.path.isdir('/proc'), reason='needs process groups and /proc')
+def test_terminate_stops_the_programs_of_the_worker():
+    context = getPoolContext()
+    queue = context.Queue()
+    process = context.Process(target=startSolverProgram, args=(queue,), daemon=True)
+    process.start()
+    childPid = queue.get(timeout=10)
+    assert isRunning(childPid)
+
+    terminateProcessGroup(process)
+    process.join(timeout=10)
+    assert not process.is_alive()
+    deadline = time.time() + 10
+    while isRunning(childPid) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not isRunning(childPid)
+
+def test_terminate_before_the_group_exists():
+    context = getPoolContext()
+    process = context.Process(target=time.sleep, args=(60,), daemon=True)
+    process.start()
+    terminateProcessGroup(process)
+    process.join(timeout=10)
+    assert not process.is_alive()
+
+def test_portfolio_keeps_the_best_schedule(solverName, randomInstance):
+    instance = randomInstance(3)
+    portfolio = Portfolio(instance)
+    portfolio.solve(['heuristic', 'bigm:' + solverName], timeLimit=30)
+    assert len(portfolio.results) >= 1
+    assert portfolio.objective == max(result['objective'] for result in portfolio.results if result['error'] is None)
+    validator = Validator(instance)
+    assert validator.validate(portfolio.schedule), validator.violations
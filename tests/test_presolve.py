@@ -0,0 +1,44 @@
+import pytest
+from Presolve import Presolve
+from Problem import Problem
+from Validator import Validator
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_presolve_keeps_the_optimum(seed, solverName, randomInstance):
+    instance = randomInstance(seed, patientNumber=8, operatorNumber=5)
+    problem = Problem(instance)
+    problem.solve(solverName)
+
+    presolve = Presolve(instance)
+    reduced = Problem(presolve.instance, timeBounds=presolve.timeBounds)
+    reduced.solve(solverName)
+
+    assert reduced.statistics['objective'] == problem.statistics['objective']
+    solution = presolve.getSolution(reduced.getSchedule())
+    assert solution.instance is instance
+    validator = Validator(instance)
+    assert validator.validate(solution.schedule), validator.violations
+
+def test_presolve_drops_infeasible_packets(instanceFromData):
+    instance = instanceFromData({
+        'requests': {
+            'Aldo': {'alpha': 5, 'beta': 5},
+            'Barbara': {'alpha': 5, 'gamma': 30}
+        },
+        'operatorData': {
+            'A': {'startTime': 1, 'endTime': 20, 'canDo': ['alpha', 'beta']},
+            'B': {'startTime': 1, 'endTime': 20, 'canDo': ['gamma']}
+        },
+        'packets': {
+            'Aldo': [['alpha'], ['beta']],
+            'Barbara': [['alpha', 'gamma']]
+        }
+    })
+    presolve = Presolve(instance)
+    # gamma is longer than every window, and takes alpha with it
+    assert presolve.droppedRequests == [('Barbara', 'alpha'), ('Barbara', 'gamma')]
+    assert presolve.droppedOperators == ['B']
+    assert presolve.instance.patients == ['Aldo']
+    assert presolve.reductions['requests nobody can do'] == 1
+    assert presolve.reductions['requests dropped with their packet'] == 1
+    assert presolve.timeBounds[('Aldo', 'alpha')] == (1, 15)
@@ -0,0 +1,14 @@
+from Problem import Problem
+from Profiler import Profiler
+
+def test_rows_are_counted_per_index_set(randomInstance):
+    instance = randomInstance(1)
+    profiler = Profiler()
+    problem = Problem(instance, profiler)
+    model = problem.model
+    assert profiler.counters['requestIndexes']['xAndT'] == len(model.requestIndexes)
+    assert profiler.counters['chiIndexes']['respectStart'] == len(model.chiIndexes)
+    assert profiler.counters['operatorConflictIndexes']['operatorNotOverlap1'] == len(model.operatorConflictIndexes)
+    # only the exams after the first of their packet are tied to it
+    assert profiler.counters['requestIndexes']['forcePacketExams'] == len(model.forcePacketExams)
+    assert len(model.forcePacketExams) < len(model.requestIndexes)
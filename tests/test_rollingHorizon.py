@@ -0,0 +1,27 @@
+import pytest
+from RollingHorizon import RollingHorizon
+from Validator import Validator
+
+def validate(instance, schedule):
+    validator = Validator(instance)
+    assert validator.validate(schedule), validator.violations
+
+def test_packets_with_an_impossible_exam_are_left_out(solverName, instanceFromData):
+    # nobody can do omega, so alpha cannot be scheduled without it
+    instance = instanceFromData({
+        'requests': {'Aldo': {'alpha': 5, 'omega': 5}, 'Barbara': {'alpha': 5}},
+        'operatorData': {'A': {'startTime': 1, 'endTime': 30, 'canDo': ['alpha']}},
+        'packets': {'Aldo': [['alpha', 'omega']], 'Barbara': [['alpha']]}
+    })
+    rollingHorizon = RollingHorizon(instance)
+    rollingHorizon.solve(solverName, windowLength=10, overlap=5)
+    assert rollingHorizon.schedule == {('Barbara', 'alpha'): ('A', 1)}
+    validate(instance, rollingHorizon.schedule)
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_schedule_is_valid(seed, solverName, randomInstance):
+    instance = randomInstance(seed, patientNumber=12, examNumber=6, operatorNumber=6, maxTime=60)
+    rollingHorizon = RollingHorizon(instance)
+    rollingHorizon.solve(solverName, windowLength=20, overlap=8)
+    assert rollingHorizon.objective > 0
+    validate(instance, rollingHorizon.schedule)
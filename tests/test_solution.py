@@ -0,0 +1,18 @@
+from Solution import Solution
+
+def test_timelines_unscheduled_and_utilization(smallInstance):
+    solution = Solution(smallInstance, {('Barbara', 'alpha'): ('A', 6), ('Aldo', 'alpha'): ('A', 1)})
+    assert solution.objective == 2
+    assert solution.operatorTimelines['A'] == [(1, 6, 'Aldo', 'alpha'), (6, 11, 'Barbara', 'alpha')]
+    assert solution.patientTimelines['Aldo'] == [(1, 6, 'alpha', 'A')]
+    assert solution.unscheduled == [('Aldo', 'beta')]
+    assert solution.utilization == {'A': 10 / 19, 'B': 0.0}
+    assert solution.getUnusedOperators() == ['B']
+
+def test_to_dict(smallInstance):
+    solution = Solution(smallInstance, {('Aldo', 'alpha'): ('A', 1), ('Aldo', 'beta'): ('B', 10)})
+    result = solution.toDict()
+    assert result['objective'] == 2
+    assert result['operators']['B']['timeline'] == [{'patient': 'Aldo', 'exam': 'beta', 'start': 10, 'end': 15}]
+    assert result['patients']['Barbara'] == []
+    assert result['unscheduled'] == [{'patient': 'Barbara', 'exam': 'alpha'}]
@@ -0,0 +1,48 @@
+import pytest
+from Heuristic import Heuristic
+from Problem import Problem
+from Validator import Validator
+
+@pytest.fixture
+def symmetricInstance(instanceFromData):
+    # two identical operators and three identical patients
+    return instanceFromData({
+        'requests': {patient: {'alpha': 5, 'beta': 6} for patient in ['P1', 'P2', 'P3']},
+        'operatorData': {operator: {'startTime': 1, 'endTime': 20, 'canDo': ['alpha', 'beta']} for operator in ['A', 'B']},
+        'packets': {patient: [['alpha'], ['beta']] for patient in ['P1', 'P2', 'P3']}
+    })
+
+def test_symmetry_breaking_keeps_the_optimum(solverName, symmetricInstance):
+    problem = Problem(symmetricInstance)
+    problem.solve(solverName)
+    broken = Problem(symmetricInstance, symmetryBreaking=True)
+    broken.solve(solverName)
+
+    assert len(broken.model.operatorSymmetryIndexes) == 1
+    assert len(broken.model.patientSymmetryIndexes) == 2
+    assert broken.statistics['objective'] == problem.statistics['objective']
+    validator = Validator(symmetricInstance)
+    assert validator.validate(broken.getSchedule()), validator.violations
+
+def test_warm_start_in_any_order_is_accepted(solverName, symmetricInstance):
+    heuristic = Heuristic(symmetricInstance)
+    heuristic.solve()
+    # the busiest operator and patient last, against the order of the constraints
+    operators = sorted(symmetricInstance.operators, key=lambda operator: sum(1 for assignment in heuristic.schedule.values() if assignment[0] == operator))
+    patients = sorted(symmetricInstance.patients, key=lambda patient: sum(1 for request in heuristic.schedule if request[0] == patient))
+    operatorMap = dict(zip(sorted(operators), operators))
+    patientMap = dict(zip(sorted(patients), patients))
+    schedule = {(patientMap[patient], exam): (operatorMap[operator], start) for (patient, exam), (operator, start) in heuristic.schedule.items()}
+    validator = Validator(symmetricInstance)
+    assert validator.validate(schedule), validator.violations
+
+    problem = Problem(symmetricInstance, symmetryBreaking=True)
+    problem.setInitialSchedule(schedule)
+    assert problem.initialSchedule != schedule
+    assert len(problem.initialSchedule) == len(schedule)
+    assert validator.validate(problem.initialSchedule), validator.violations
+    problem.solve(solverName)
+
+    assert problem.statistics['initialObjective'] == len(schedule)
+    assert problem.statistics['objective'] >= len(schedule)
+    assert validator.validate(problem.getSchedule()), validator.violations
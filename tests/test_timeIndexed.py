@@ -0,0 +1,19 @@
+import pytest
+from Problem import Problem
+from TimeIndexedProblem import TimeIndexedProblem
+from Validator import Validator
+
+@pytest.mark.parametrize('seed, usePackets', [(1, True), (2, True), (3, False)])
+def test_time_indexed_reaches_the_big_m_optimum(seed, usePackets, solverName, randomInstance):
+    instance = randomInstance(seed, usePackets=usePackets)
+    problem = Problem(instance)
+    problem.solve(solverName)
+    timeIndexed = TimeIndexedProblem(instance)
+    timeIndexed.solve(solverName)
+
+    assert timeIndexed.statistics['termination'] == 'optimal'
+    assert timeIndexed.statistics['objective'] == problem.statistics['objective']
+    schedule = timeIndexed.getSchedule()
+    assert len(schedule) == timeIndexed.statistics['objective']
+    validator = Validator(instance)
+    assert validator.validate(schedule), validator.violations
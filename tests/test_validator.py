@@ -0,0 +1,45 @@
+from Heuristic import Heuristic
+from Validator import Validator
+
+def test_valid_schedule(smallInstance):
+    validator = Validator(smallInstance)
+    assert validator.validate({('Aldo', 'alpha'): ('A', 1), ('Aldo', 'beta'): ('B', 10), ('Barbara', 'alpha'): ('A', 6)})
+    assert validator.violations == []
+
+def test_heuristic_schedule_is_valid(randomInstance):
+    instance = randomInstance(7, patientNumber=12, examNumber=6, operatorNumber=5)
+    heuristic = Heuristic(instance)
+    heuristic.solve()
+    validator = Validator(instance)
+    assert validator.validate(heuristic.schedule), validator.violations
+
+def test_partially_scheduled_packet(smallInstance):
+    validator = Validator(smallInstance)
+    assert not validator.validate({('Aldo', 'beta'): ('B', 10)})
+    assert validator.violations == ['packet of \'Aldo\' is partially scheduled: \'beta\' without \'alpha\'']
+
+def test_operator_overlap(smallInstance):
+    validator = Validator(smallInstance)
+    assert not validator.validate({('Barbara', 'alpha'): ('A', 1), ('Aldo', 'alpha'): ('A', 3), ('Aldo', 'beta'): ('B', 10)})
+    assert len(validator.violations) == 1
+    assert validator.violations[0].startswith('operator \'A\' has exam \'alpha\' of \'Aldo\'')
+
+def test_patient_overlap(smallInstance):
+    validator = Validator(smallInstance)
+    assert not validator.validate({('Aldo', 'alpha'): ('A', 10), ('Aldo', 'beta'): ('B', 12)})
+    assert len(validator.violations) == 1
+    assert validator.violations[0].startswith('patient \'Aldo\'')
+
+def test_assignment_outside_window_and_competence(smallInstance):
+    validator = Validator(smallInstance)
+    assert not validator.validate({('Barbara', 'alpha'): ('A', 18)})
+    assert len(validator.violations) == 1
+    assert 'outside the window of operator \'A\'' in validator.violations[0]
+    assert not validator.validate({('Barbara', 'alpha'): ('B', 10)})
+    assert validator.violations == ['operator \'B\' cannot do exam \'alpha\' of \'Barbara\'']
+
+def test_unknown_request_and_operator(smallInstance):
+    validator = Validator(smallInstance)
+    assert not validator.validate({('Barbara', 'beta'): ('B', 10), ('Aldo', 'alpha'): ('Z', 1), ('Aldo', 'beta'): ('B', 10)})
+    assert validator.violations[:2] == ['patient \'Barbara\' does not request exam \'beta\'',
+        'exam \'alpha\' of \'Aldo\' is assigned to the unknown operator \'Z\'']
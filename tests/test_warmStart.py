@@ -0,0 +1,47 @@
+import pytest
+from pyomo.environ import SolverFactory
+from Heuristic import Heuristic
+from Problem import Problem
+from Validator import Validator
+
+@pytest.fixture
+def warmStartSolverName():
+    # the plain highs interface does not take a warm start
+    if not SolverFactory('appsi_highs').available(exception_flag=False):
+        pytest.skip('no MILP solver with warm start installed')
+    return 'appsi_highs'
+
+def solveFromHeuristic(instance, solverName):
+    heuristic = Heuristic(instance)
+    heuristic.solve()
+    problem = Problem(instance)
+    problem.setInitialSchedule(heuristic.schedule)
+    problem.solve(solverName)
+    return heuristic, problem
+
+def test_heuristic_is_the_warm_start(warmStartSolverName, randomInstance, capsys):
+    instance = randomInstance(5, patientNumber=10, examNumber=5, operatorNumber=4)
+    heuristic, problem = solveFromHeuristic(instance, warmStartSolverName)
+
+    assert problem.statistics['warmStart']
+    assert problem.statistics['initialObjective'] == len(heuristic.schedule)
+    # the warm start is the first incumbent of the solve
+    assert problem.statistics['incumbents'][0][1] == len(heuristic.schedule)
+    assert problem.statistics['objective'] >= len(heuristic.schedule)
+    validator = Validator(instance)
+    assert validator.validate(problem.getSchedule()), validator.violations
+
+    problem.printStatistics()
+    output = capsys.readouterr().out
+    assert 'warmStart: True' in output
+    assert 'initialObjective: ' + str(len(heuristic.schedule)) in output
+
+def test_solver_without_warm_start_keeps_the_heuristic(randomInstance):
+    if not SolverFactory('highs').available(exception_flag=False):
+        pytest.skip('highs not installed')
+    instance = randomInstance(5, patientNumber=10, examNumber=5, operatorNumber=4)
+    heuristic, problem = solveFromHeuristic(instance, 'highs')
+
+    assert not problem.statistics['warmStart']
+    assert problem.statistics['initialObjective'] == len(heuristic.schedule)
+    assert problem.statistics['objective'] >= len(heuristic.schedule)
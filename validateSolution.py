@@ -0,0 +1,32 @@
+from argparse import ArgumentParser
+import json
+from Instance import Instance
+from Validator import Validator
+
+if __name__ != '__main__':
+    exit(0)
+
+default = {
+    'filename': 'instance.json',
+}
+
+parser = ArgumentParser(description='Program that checks a solution file against its instance')
+parser.add_argument('-f', '--file', metavar='FILE', type=str, default=default['filename'], help='file with the JSON instance (defaults to ' + default['filename'] + ')')
+parser.add_argument('-s', '--solution', metavar='FILE', type=str, required=True, help='file with the JSON solution, as written by solve.py --solution')
+
+args = vars(parser.parse_args())
+
+instance = Instance()
+instance.loadFromJSONFile(args['file'])
+
+with open(args['solution'], 'r') as f:
+    data = json.loads(f.read())
+schedule = {}
+for patient, timeline in data['patients'].items():
+    for assignment in timeline:
+        schedule[patient, assignment['exam']] = (assignment['operator'], assignment['start'])
+
+validator = Validator(instance)
+isValid = validator.validate(schedule)
+validator.printViolations()
+exit(0 if isValid else 1)